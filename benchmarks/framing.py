@@ -0,0 +1,96 @@
+"""Compare StreamReader.readline framing with JsonRpcLineProtocol.
+
+Sends multi-megabyte JSON-RPC responses over a socketpair and measures how
+long each receiving side takes to frame and decode them.
+
+Usage: python benchmarks/framing.py [--size-mb 4] [--count 20]
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+from galaxy_swift.api.protocols import JsonRpcLineProtocol
+from galaxy_swift.jsonrpc.codecs import get_codec
+
+
+def build_message(codec, size):
+    games = []
+    message = {'jsonrpc': '2.0', 'id': 1, 'result': {'owned_games': games}}
+    game_size = len(codec.encode(
+        {'game_id': '0' * 10, 'game_title': 'x' * 40, 'dlcs': []}))
+    for i in range(size // game_size):
+        games.append(
+            {'game_id': '%010d' % i, 'game_title': 'x' * 40, 'dlcs': []})
+    return codec.encode_line(message)
+
+
+async def send(sock, data, count):
+    loop = asyncio.get_running_loop()
+    for _ in range(count):
+        await loop.sock_sendall(sock, data)
+    sock.shutdown(socket.SHUT_WR)
+
+
+async def bench_readline(codec, data, count):
+    rsock, wsock = socket.socketpair()
+    rsock.setblocking(False)
+    wsock.setblocking(False)
+    # default 64 KiB limit raises LimitOverrunError on these frames
+    reader, writer = await asyncio.open_connection(
+        sock=rsock, limit=len(data) * 2)
+    sender = asyncio.create_task(send(wsock, data, count))
+
+    start = time.perf_counter()
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        codec.decode(line.strip().decode('utf-8'))
+    elapsed = time.perf_counter() - start
+
+    await sender
+    writer.close()
+    wsock.close()
+    return elapsed
+
+
+async def bench_protocol(codec, data, count):
+    loop = asyncio.get_running_loop()
+    rsock, wsock = socket.socketpair()
+    rsock.setblocking(False)
+    wsock.setblocking(False)
+    protocol = JsonRpcLineProtocol(codec.decode)
+    await loop.connect_accepted_socket(lambda: protocol, rsock)
+    sender = asyncio.create_task(send(wsock, data, count))
+
+    start = time.perf_counter()
+    await protocol.wait_closed()
+    elapsed = time.perf_counter() - start
+
+    await sender
+    wsock.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=float, default=4)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--codec', default=None)
+    args = parser.parse_args()
+
+    codec = get_codec(args.codec)
+    data = build_message(codec, int(args.size_mb * 1024 * 1024))
+    total_mb = len(data) * args.count / 1024 / 1024
+    print(f'codec: {codec.name}, frame: {len(data)} bytes, '
+          f'frames: {args.count}')
+
+    for name, bench in (
+            ('readline', bench_readline), ('protocol', bench_protocol)):
+        elapsed = asyncio.run(bench(codec, data, args.count))
+        print(f'{name:>10}: {elapsed:8.3f}s {total_mb / elapsed:10.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,11 @@ setup(
         "galaxy.plugin.api",
         "ipython",
     ],
+    extras_require={
+        "orjson": ["orjson"],
+        "msgspec": ["msgspec"],
+        "ujson": ["ujson"],
+    },
     entry_points={
         'console_scripts': [
             'galaxy = galaxy_swift.__main__:main'
@@ -3,6 +3,8 @@ import logging
 from galaxy_swift.cli.commands import BaseCommand
 from galaxy_swift.cli.parsers import RootParser, CommandParser
 from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.jsonrpc.codecs import set_default_codec
+from galaxy_swift.jsonrpc.loggers import ProtocolLogger
 
 prog_name = 'galaxy_swift'
 log = logging.getLogger(prog_name)
@@ -19,6 +21,11 @@ def main(args=None):
     root_namespace = root_parser.parse_args(args)
 
     setup_logging(root_namespace.log_level.value)
+    set_default_codec(root_namespace.json_codec)
+    ProtocolLogger.set_defaults(
+        preview_size=root_namespace.log_preview_size,
+        sample_rate=root_namespace.log_sample_rate,
+    )
 
     log.debug("Parsing sub command")
     command = BaseCommand.create(root_namespace.command)
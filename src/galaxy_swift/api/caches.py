@@ -0,0 +1,117 @@
+import collections
+import json
+import logging
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+# seconds responses of idempotent methods stay valid
+DEFAULT_TTLS = {
+    'get_capabilities': 300.0,
+    'import_owned_games': 60.0,
+}
+
+# notifications invalidating cached methods responses (None for all)
+INVALIDATIONS = {
+    'owned_game_added': ['import_owned_games'],
+    'owned_game_removed': ['import_owned_games'],
+    'owned_game_updated': ['import_owned_games'],
+    'add_game': ['import_owned_games'],
+    'remove_game': ['import_owned_games'],
+    'update_game': ['import_owned_games'],
+    'authentication_lost': None,
+}
+
+
+def get_cache_key(method, params):
+    return method, json.dumps(
+        params, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class ResponseCache:
+    """LRU cache of successful responses with per method TTLs.
+
+    Only methods with a TTL are cached. ``generation`` changes on every
+    invalidation so responses to calls sent before it can be dropped.
+    """
+
+    def __init__(self, ttls=None, maxsize=256, invalidations=None):
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.maxsize = maxsize
+        self.invalidations = (
+            INVALIDATIONS if invalidations is None else invalidations)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_cacheable(self, method):
+        return bool(self.ttls.get(method))
+
+    def get(self, method, params):
+        """Return cached response or None."""
+        if not self.is_cacheable(method):
+            return None
+
+        key = get_cache_key(method, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, method, params, response, generation=None):
+        if not self.is_cacheable(method) or response.error:
+            return
+
+        key = get_cache_key(method, params)
+        expires = time.monotonic() + self.ttls[method]
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                # invalidated while in flight
+                return
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *methods):
+        """Drop cached responses of methods (all when none given)."""
+        with self._lock:
+            self.generation += 1
+            if not methods:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0] in methods:
+                    del self._entries[key]
+
+    def handle_notification(self, notification):
+        if notification.method not in self.invalidations:
+            return
+
+        methods = self.invalidations[notification.method] or ()
+        log.debug(
+            "Invalidating %s on %s", methods or 'all', notification.method)
+        self.invalidate(*methods)
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
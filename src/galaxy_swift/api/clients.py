@@ -1,35 +1,69 @@
 import asyncio
-import json
+import concurrent.futures
+import functools
 import logging
 import pathlib
 import queue
 import socketserver
+import threading
+import time
 
+from galaxy_swift.api.dispatchers import NotificationDispatcher
+from galaxy_swift.api.enums import ScheduleMode
 from galaxy_swift.api.exceptions import ClientError
 from galaxy_swift.api.handlers import GalaxyTCPHandler
-from galaxy_swift.api.models import Response
-from galaxy_swift.jsonrpc.exceptions import JsonRpcError
+from galaxy_swift.api.methods import GalaxyMethods, AsyncGalaxyMethods
+from galaxy_swift.api.metrics import MetricsRegistry
+from galaxy_swift.api.models import Notification, Response
+from galaxy_swift.api.protocols import JsonRpcLineProtocol
+from galaxy_swift.api.schedulers import TickScheduler
+from galaxy_swift.jsonrpc.codecs import get_codec
+from galaxy_swift.jsonrpc.exceptions import (
+    InvalidRequest, JsonRpcError, ParseError, RequestTimeout,
+)
 from galaxy_swift.jsonrpc.generators import SeqIdGenerator
+from galaxy_swift.jsonrpc.loggers import ProtocolLogger
 from galaxy_swift.jsonrpc.parsers import JsonRpcParser
+from galaxy_swift.jsonrpc.registries import PendingRequestRegistry
 from galaxy_swift.paths import PluginPath
 from galaxy_swift.tokens.generators import UUIDTokenGenerator
 
 log = logging.getLogger(__name__)
 
 
-class BaseGalaxyClientStub:
+class BaseGalaxyClientStub(GalaxyMethods):
 
     host = '127.0.0.1'
+    # Galaxy plugin API server does not understand batch arrays
+    supports_batch = False
 
-    def __init__(self, token, port):
+    def __init__(
+            self, token, port, codec=None, protocol_logger=None,
+            recorder=None, cache=None,
+    ):
         self.token = token
         self.port = port
-        self.parser = JsonRpcParser()
+        self.protocol_logger = protocol_logger or ProtocolLogger(log)
+        self.codec = codec or get_codec()
+        self.parser = JsonRpcParser(self.codec)
         self.request_id_generator = SeqIdGenerator()
 
         self.reader = None
         self.writer = None
+        self.pending = PendingRequestRegistry()
+        # seconds per call and monotonic session deadline
+        self.call_timeout = None
+        self.deadline = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.metrics = MetricsRegistry()
+        self.recorder = recorder
+        self._response_sizes = {}
+        self.notifications = NotificationDispatcher()
         self.responses = queue.Queue()
+        self.cache = cache
+        if cache is not None:
+            self.notifications.subscribe(None, cache.handle_notification)
 
     def is_connected(self):
         raise NotImplementedError
@@ -40,84 +74,237 @@ class BaseGalaxyClientStub:
     def disconnect(self):
         raise NotImplementedError
 
+    def write(self, data_bytes):
+        raise NotImplementedError
+
     def receive(self):
+        """Return next message that did not match any pending request."""
         log.info("Receiving data")
-        try:
-            data = self.responses.get()
-            addr = self.get_peername()
-            log.info("Received %d bytes of data from %s", len(data), addr)
+        return self.responses.get()
 
-            if not data:
-                raise Exception("No data")
-        except Exception as exc:
-            log.error(exc)
+    def dispatch(self, data):
+        if not data:
+            log.info("Received EOF")
             self.disconnect()
-            return
+            return False
 
-        data_stripped = data.strip()
-        return self._handle_input(data_stripped)
+        if not data.isspace():
+            self.handle_frame(data)
+        return True
 
-    def send(self, method, **params):
-        if not self.is_connected():
-            raise ClientError("No plugin connected")
+    def handle_frame(self, frame):
+        self.bytes_received += len(frame)
+        messages = self._handle_input(frame)
+        for message in messages:
+            self._dispatch_message(message, len(frame) // len(messages))
+
+    def stats(self):
+        """Per method call and notification metrics snapshot."""
+        return self.metrics.snapshot()
 
+    def send(self, method, **params):
         request_id = next(self.request_id_generator)
-        data_dict = {
-            'jsonrpc': '2.0',
-            'id': request_id,
-            'method': method,
-            'params': params,
-        }
-        log.info("Sent data: %s", data_dict)
-        data = json.dumps(data_dict)
-        data_bytes = (data + "\n").encode("utf-8")
-        addr = self.get_peername()
-        log.info("Sent %d bytes of data to %s", len(data_bytes), addr)
-        self.writer.write(data_bytes)
-
-    def call(self, method, **params):
+        self._send_requests([(request_id, method, params)])
+        return request_id
+
+    def set_session_timeout(self, timeout):
+        if timeout is None:
+            self.deadline = None
+        else:
+            self.deadline = time.monotonic() + timeout
+
+    def get_call_deadline(self, timeout=None):
+        if timeout is None:
+            timeout = self.call_timeout
+        deadline = self.pending.get_deadline(timeout, self.deadline)
+        if deadline is not None and deadline <= time.monotonic():
+            raise RequestTimeout("Session deadline exceeded")
+        return deadline
+
+    def submit(self, method, *, timeout=None, **params):
+        return self.submit_many([(method, params)], timeout=timeout)[0]
+
+    def submit_many(self, calls, batch=None, timeout=None):
+        """Send (method, params) calls with a single write.
+
+        Calls are serialized into one JSON-RPC batch array when ``batch``
+        (or ``supports_batch`` if not given) is set, otherwise as pipelined
+        lines. Returns futures in calls order which fail with RequestTimeout
+        when not answered within ``timeout`` (or ``call_timeout``) seconds
+        or by the session deadline. Calls answered from ``cache`` are not
+        sent and get already resolved futures.
+        """
+        futures = [None] * len(calls)
+        if self.cache is not None:
+            calls = self._get_cached(calls, futures)
+            if not calls:
+                return futures
+
+        deadline = self.get_call_deadline(timeout)
+        requests = [
+            (next(self.request_id_generator), method, params)
+            for method, params in calls
+        ]
+        sent_futures = [
+            self.pending.register(request_id, deadline=deadline)
+            for request_id, _, _ in requests
+        ]
+        start = time.monotonic()
+        try:
+            size = self._send_requests(requests, batch=batch)
+        except Exception:
+            for request_id, _, _ in requests:
+                self.pending.discard(request_id)
+            raise
+
+        request_size = size // len(requests)
+        free = (
+            index for index, future in enumerate(futures) if future is None)
+        sent = zip(requests, sent_futures)
+        for (request_id, method, params), future in sent:
+            future.add_done_callback(functools.partial(
+                self._record_call, request_id, method, start, request_size))
+            if self.cache is not None and self.cache.is_cacheable(method):
+                future.add_done_callback(functools.partial(
+                    self._cache_response, method, params,
+                    self.cache.generation,
+                ))
+            futures[next(free)] = future
+        return futures
+
+    def call(self, method, *, timeout=None, **params):
         log.info("Call %s", method)
-        self.send(method, **params)
-        return self.receive()
+        return self.submit(method, timeout=timeout, **params).result()
 
-    # internal
-    def shutdown(self):
-        return self.call('shutdown')
+    def call_many(self, calls, batch=None, timeout=None):
+        log.info("Call many")
+        futures = self.submit_many(calls, batch=batch, timeout=timeout)
+        return [future.result() for future in futures]
 
-    def get_capabilities(self):
-        return self.call('get_capabilities')
-
-    def initialize_cache(self, data: dict):
-        return self.call('initialize_cache', data=data)
+    def _send_requests(self, requests, batch=None):
+        if not self.is_connected():
+            raise ClientError("No plugin connected")
 
-    def ping(self):
-        return self.call('ping')
+        if batch is None:
+            batch = self.supports_batch
+
+        data_dicts = [
+            {
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': method,
+                'params': params,
+            }
+            for request_id, method, params in requests
+        ]
+        if self.protocol_logger.is_enabled():
+            peer = self.get_peername()
+            for data_dict in data_dicts:
+                self.protocol_logger.sent(data_dict, peer)
+
+        if batch and len(data_dicts) > 1:
+            data_bytes = self.codec.encode_line(data_dicts)
+        else:
+            data_bytes = b"".join(map(self.codec.encode_line, data_dicts))
+        self.bytes_sent += len(data_bytes)
+        if self.recorder is not None:
+            self.recorder.record_out(data_bytes)
+        self.write(data_bytes)
+        return len(data_bytes)
+
+    def _dispatch_message(self, message, size=0):
+        if isinstance(message, Notification):
+            self.metrics.record_notification(message.method, size)
+            self.notifications.dispatch(message)
+            return
 
-    # external
-    def init_authentication(self):
-        return self.call('init_authentication')
+        # read by _record_call callback while the future resolves
+        self._response_sizes[message.id] = size
+        try:
+            resolved = self.pending.resolve(message.id, message)
+        finally:
+            # late and duplicate responses have no callback to pop it
+            self._response_sizes.pop(message.id, None)
+        if not resolved:
+            log.warning("Received message with unknown id %s", message.id)
+            self.responses.put(message)
+
+    def _get_cached(self, calls, futures):
+        """Resolve futures of cached calls, return calls left to send."""
+        uncached = []
+        for index, (method, params) in enumerate(calls):
+            response = self.cache.get(method, params)
+            if response is None:
+                uncached.append((method, params))
+                continue
+            log.debug("Cache hit for %s", method)
+            future = concurrent.futures.Future()
+            future.set_result(response)
+            futures[index] = future
+        return uncached
+
+    def _cache_response(self, method, params, generation, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache.put(method, params, future.result(), generation=generation)
 
-    def pass_login_credentials(self, step, credentials, cookies):
-        return self.call(
-            'pass_login_credentials',
-            step=step, credentials=credentials, cookies=cookies,
+    def _record_call(self, request_id, method, start, request_size, future):
+        response_size = self._response_sizes.pop(request_id, 0)
+        if future.cancelled():
+            return
+        exc = future.exception()
+        self.metrics.record_call(
+            method, time.monotonic() - start,
+            request_size=request_size, response_size=response_size,
+            error=exc is not None or bool(future.result().error),
+            timeout=isinstance(exc, RequestTimeout),
         )
 
-    def import_owned_games(self):
-        return self.call('import_owned_games')
-
     def _handle_input(self, data):
+        # recorded once parsed, the parser tells whether it is valid JSON
         try:
-            parsed_data =self.parser.parse(data)
-            log.info("Received data: %s", parsed_data)
-            response = Response(**parsed_data)
+            parsed_data = self.parser.parse(data)
         except JsonRpcError as exc:
             log.error(exc)
-            return
-        except TypeError as exc:
-            log.error(exc)
-            return
-
+            self._record_in(data, valid=not isinstance(exc, ParseError))
+            return []
+        self._record_in(data)
+
+        if not isinstance(parsed_data, list):
+            parsed_data = [parsed_data]
+
+        peer = None
+        if self.protocol_logger.is_enabled():
+            peer = self.get_peername()
+
+        messages = []
+        for message_data in parsed_data:
+            if isinstance(message_data, InvalidRequest):
+                self._reject_invalid(message_data.data, message_data)
+                continue
+            self.protocol_logger.received(message_data, peer)
+            try:
+                messages.append(self._build_message(message_data))
+            except TypeError as exc:
+                self._reject_invalid(message_data.get('id'), exc)
+        return messages
+
+    def _record_in(self, data, valid=True):
+        if self.recorder is not None:
+            self.recorder.record_in(data, valid=valid)
+
+    def _reject_invalid(self, request_id, exc):
+        """Reject only the request answered by malformed batch element."""
+        log.error("Invalid message %s: %s", request_id, exc)
+        if request_id is not None:
+            self.pending.reject(
+                request_id, ClientError(f'Invalid response: {exc}'))
+
+    def _build_message(self, message_data):
+        if 'method' in message_data and 'id' not in message_data:
+            return Notification(**message_data)
+
+        response = Response(**message_data)
         return self._handle_response(response)
 
     def _handle_response(self, response):
@@ -126,11 +313,24 @@ class BaseGalaxyClientStub:
 
 class GalaxyClientStub(socketserver.TCPServer, BaseGalaxyClientStub):
 
-    def __init__(self, token, port):
-        BaseGalaxyClientStub.__init__(self, token, port)
+    def __init__(
+            self, token, port, codec=None, protocol_logger=None,
+            recorder=None, cache=None, high_water=1024 * 1024,
+    ):
+        BaseGalaxyClientStub.__init__(
+            self, token, port,
+            codec=codec, protocol_logger=protocol_logger, recorder=recorder,
+            cache=cache,
+        )
         socketserver.TCPServer.__init__(
             self, self.address, GalaxyTCPHandler, bind_and_activate=False)
 
+        self.high_water = high_water
+        self._outgoing = []
+        self._outgoing_size = 0
+        self._flushing = False
+        self._outgoing_cond = threading.Condition()
+
     @property
     def address(self):
         return (self.host, self.port)
@@ -139,6 +339,7 @@ class GalaxyClientStub(socketserver.TCPServer, BaseGalaxyClientStub):
         log.info("Running client")
         log.info("Binding client on %s", self.server_address)
         self.server_bind()
+        self.port = self.server_address[1]
         log.info("Activating client")
         self.server_activate()
         log.info("Serving client")
@@ -152,9 +353,54 @@ class GalaxyClientStub(socketserver.TCPServer, BaseGalaxyClientStub):
     def is_connected(self):
         return bool(self.writer)
 
+    def disconnect(self):
+        log.info("Plugin disconnected from server")
+        self.reader = None
+        self.writer = None
+        self.pending.reject_all(ClientError("Plugin disconnected"))
+
     def read(self):
         data = self.reader.readline()
-        self.responses.put(data)
+        return self.dispatch(data)
+
+    @property
+    def buffered_bytes(self):
+        return self._outgoing_size
+
+    def write(self, data_bytes):
+        # Messages queued by other threads while one of them is writing
+        # are flushed together by that thread in a single write
+        with self._outgoing_cond:
+            while self._outgoing_size >= self.high_water:
+                self._outgoing_cond.wait()
+            self._outgoing.append(data_bytes)
+            self._outgoing_size += len(data_bytes)
+            if self._flushing:
+                return
+            self._flushing = True
+
+        try:
+            self._flush()
+        except BaseException:
+            with self._outgoing_cond:
+                self._flushing = False
+                self._outgoing_cond.notify_all()
+            raise
+
+    def _flush(self):
+        while True:
+            with self._outgoing_cond:
+                if not self._outgoing:
+                    # cleared with the emptiness check, so a message queued
+                    # right after is flushed by its own writer
+                    self._flushing = False
+                    self._outgoing_cond.notify_all()
+                    return
+                outgoing = self._outgoing
+                self._outgoing = []
+                self._outgoing_size = 0
+                self._outgoing_cond.notify_all()
+            self.writer.write(b"".join(outgoing))
 
     def get_peername(self):
         return self.writer._sock.getpeername()
@@ -162,84 +408,239 @@ class GalaxyClientStub(socketserver.TCPServer, BaseGalaxyClientStub):
 
 class GalaxyAsyncClientStub(BaseGalaxyClientStub):
 
-    def __init__(self, token, port, loop=None, connected_cb=None):
-        super().__init__(token, port)
+    def __init__(
+            self, token, port, loop=None, connected_cb=None, codec=None,
+            max_frame_size=None, high_water=None, low_water=None,
+            path=None, sock=None, listening_cb=None, protocol_logger=None,
+            tick_interval=1.0, tick_mode=ScheduleMode.FIXED_RATE,
+            recorder=None, cache=None,
+    ):
+        super().__init__(
+            token, port, codec=codec, protocol_logger=protocol_logger,
+            recorder=recorder, cache=cache,
+        )
+        self.path = path
+        self.sock = sock
+        self.server = None
+        self.max_frame_size = max_frame_size
+        self.high_water = high_water
+        self.low_water = low_water
+
+        self.scheduler = TickScheduler(mode=tick_mode)
+        if tick_interval:
+            self.scheduler.add_job(self.tick, tick_interval, name='tick')
 
         self._active = False
         self._connected = False
         self._loop = loop
+        self.notifications.loop = loop
 
         self._connected_cb = connected_cb
+        self._listening_cb = listening_cb
+        self._connect_waiters = []
+        self._disconnect_waiters = []
+
+    @property
+    def aio(self):
+        return AsyncGalaxyMethods(self)
+
+    @property
+    def loop(self):
+        return self._loop
 
     async def run(self):
         log.info("Running client")
         self._active = True
+        self._loop = asyncio.get_running_loop()
+        self.notifications.loop = self._loop
         await asyncio.gather(
             self.pass_control(),
-            self.start_server(loop=self._loop),
-            loop=self._loop,
+            self.start_server(),
         )
 
     def stop(self):
         log.info("Stopping client")
         self._active = False
+        self.scheduler.stop()
 
     def disconnect(self):
+        if not self._connected:
+            return
         log.info("Plugin disconnected from server")
         self._connected = False
 
         self.reader = None
         self.writer = None
+        self.pending.reject_all(ClientError("Plugin disconnected"))
+        waiters, self._disconnect_waiters = self._disconnect_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
 
-    async def start_server(self, loop=None):
-        log.info("Starting server on %s", self.port)
-        server = await asyncio.start_server(
-            self.on_plugin_connected,
-            host=self.host, port=self.port, loop=loop,
-        )
-        log.info('Server running: %s', server)
+    @property
+    def address(self):
+        if self.sock is not None:
+            return self.sock.getsockname()
+        if self.path is not None:
+            return self.path
+        return (self.host, self.port)
+
+    async def start_server(self):
+        log.info("Starting server on %s", self.address)
+        if self.sock is not None:
+            # pre-connected socket (socketpair), nothing to listen on
+            await self._loop.connect_accepted_socket(
+                self.create_protocol, self.sock)
+            if self._listening_cb is not None:
+                self._listening_cb()
+            return
+
+        if self.path is not None:
+            self.server = await self._loop.create_unix_server(
+                self.create_protocol, path=self.path,
+            )
+        else:
+            self.server = await self._loop.create_server(
+                self.create_protocol,
+                host=self.host, port=self.port,
+            )
+            # port 0 binds any free port
+            self.port = self.server.sockets[0].getsockname()[1]
+        log.info('Server running: %s', self.server)
+        if self._listening_cb is not None:
+            self._listening_cb()
 
     async def pass_control(self):
-        while self._active:
-            try:
-                self.tick()
-            except Exception:
-                log.exception("Unexpected exception raised in plugin tick")
-            await asyncio.sleep(1)
+        if self._active:
+            await self.scheduler.run()
 
     def tick(self):
         # log.info("tick")
         return
 
-    async def on_plugin_connected(self, reader, writer):
+    def add_periodic_job(self, callback, interval, mode=None, name=None):
+        """Run callback (plain or coroutine function) every interval
+        seconds while the client is running."""
+        return self.scheduler.add_job(
+            callback, interval, mode=mode, name=name)
+
+    def create_protocol(self):
+        return JsonRpcLineProtocol(
+            self.handle_frame,
+            connection_made_cb=self.on_plugin_connected,
+            connection_lost_cb=self.on_plugin_disconnected,
+            max_frame_size=self.max_frame_size,
+            high_water=self.high_water, low_water=self.low_water,
+        )
+
+    def on_plugin_connected(self, protocol):
         log.info("Plugin connected to server")
+        self.writer = protocol
+
         self._connected = True
         if self._connected_cb is not None:
             self._connected_cb()
+        waiters, self._connect_waiters = self._connect_waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def on_plugin_disconnected(self, exc):
+        if self.writer is not None and not self.writer.is_closing():
+            # late notice of connection already replaced by restarted plugin
+            return
+        self.disconnect()
+
+    async def wait_connected(self):
+        if self._connected:
+            return
+        waiter = self._loop.create_future()
+        self._connect_waiters.append(waiter)
+        await waiter
+
+    async def wait_disconnected(self):
+        if not self._connected:
+            return
+        waiter = self._loop.create_future()
+        self._disconnect_waiters.append(waiter)
+        await waiter
+
+    def call(self, method, *, timeout=None, **params):
+        if self._in_loop_thread():
+            raise ClientError(
+                "Blocking call from the client event loop, use acall()")
 
-        self.reader = reader
-        self.writer = writer
+        future = asyncio.run_coroutine_threadsafe(
+            self.acall(method, timeout=timeout, **params), self._loop)
+        return future.result()
 
-        while self._connected:
-            await self.read()
+    def call_many(self, calls, batch=None, timeout=None):
+        if self._in_loop_thread():
+            raise ClientError(
+                "Blocking call from the client event loop, use acall_many()")
 
-            # log.info("Send: %r" % message)
-            # writer.write(data)
-            # await writer.drain()
+        future = asyncio.run_coroutine_threadsafe(
+            self.acall_many(calls, batch=batch, timeout=timeout), self._loop)
+        return future.result()
 
-            # log.info('Close the client socket')
-            # writer.close()
+    async def asend(self, method, **params):
+        request_id = next(self.request_id_generator)
+        self._send_requests([(request_id, method, params)])
+        await self.writer.drain()
+        return request_id
+
+    async def acall(self, method, *, timeout=None, **params):
+        log.info("Call %s", method)
+        responses = await self._acall_many(
+            [(method, params)], timeout=timeout)
+        return responses[0]
+
+    async def acall_many(self, calls, batch=None, timeout=None):
+        log.info("Call many")
+        return await self._acall_many(calls, batch=batch, timeout=timeout)
 
-    async def read(self):
-        data = await self.reader.readline()
-        self.responses.put(data)
+    async def _acall_many(self, calls, batch=None, timeout=None):
+        futures = self.submit_many(calls, batch=batch, timeout=timeout)
+        try:
+            await self.writer.drain()
+            return await asyncio.gather(*map(asyncio.wrap_future, futures))
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def write(self, data_bytes):
+        if self._in_loop_thread():
+            self.writer.write(data_bytes)
+        else:
+            self._loop.call_soon_threadsafe(self.writer.write, data_bytes)
+
+    def _in_loop_thread(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
 
     def get_peername(self):
         return self.writer.get_extra_info('peername')
 
+    @property
+    def buffered_bytes(self):
+        if self.writer is None:
+            return 0
+        return self.writer.buffered_bytes
+
     def is_connected(self):
         return self._connected
 
     def terminate(self):
         log.info("Shutting down server")
         self._active = False
+        self.scheduler.stop()
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        if self.server is not None:
+            self.server.close()
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class NotificationStream:
+    """Bounded async iterator over plugin notifications.
+
+    When the buffer is full the oldest notification is dropped and
+    counted in ``overflows`` so a slow consumer never blocks the reader.
+    Without ``loop`` the running loop is used.
+    """
+
+    def __init__(self, dispatcher, methods, maxsize=1000, loop=None):
+        self.dispatcher = dispatcher
+        self.methods = frozenset(methods)
+        self.maxsize = maxsize
+        self.overflows = 0
+        self.received = 0
+
+        self._loop = loop or asyncio.get_running_loop()
+        self._buffer = collections.deque()
+        self._waiter = None
+        self._closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._buffer:
+            if self._closed:
+                raise StopAsyncIteration
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._buffer.popleft()
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def accepts(self, method):
+        return not self.methods or method in self.methods
+
+    def push(self, notification):
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+
+        if in_loop:
+            self._push(notification)
+        else:
+            self._loop.call_soon_threadsafe(self._push, notification)
+
+    def close(self):
+        self.dispatcher.remove_stream(self)
+        if self._loop.is_closed():
+            self._closed = True
+            return
+        self._loop.call_soon_threadsafe(self._close)
+
+    def _push(self, notification):
+        if self._closed:
+            return
+        self.received += 1
+        if len(self._buffer) >= self.maxsize:
+            self._buffer.popleft()
+            self.overflows += 1
+        self._buffer.append(notification)
+        self._wakeup()
+
+    def _close(self):
+        self._closed = True
+        self._wakeup()
+
+    def _wakeup(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class NotificationDispatcher:
+    """Routes plugin notifications to callbacks and streams by method."""
+
+    def __init__(self, loop=None):
+        # loop of the client owning the dispatcher, streams wake up there
+        self.loop = loop
+        self.counts = collections.Counter()
+
+        self._callbacks = collections.defaultdict(list)
+        self._streams = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, method, callback):
+        """Register callback for method notifications (None for all)."""
+        with self._lock:
+            self._callbacks[method].append(callback)
+
+    def unsubscribe(self, method, callback):
+        with self._lock:
+            self._callbacks[method].remove(callback)
+
+    def stream(self, *methods, maxsize=1000, loop=None):
+        stream = NotificationStream(
+            self, methods, maxsize=maxsize, loop=loop or self.loop)
+        with self._lock:
+            self._streams.append(stream)
+        return stream
+
+    def remove_stream(self, stream):
+        with self._lock:
+            if stream in self._streams:
+                self._streams.remove(stream)
+
+    def close(self):
+        with self._lock:
+            streams = list(self._streams)
+        for stream in streams:
+            stream.close()
+
+    def dispatch(self, notification):
+        self.counts[notification.method] += 1
+        with self._lock:
+            callbacks = (
+                self._callbacks.get(notification.method, []) +
+                self._callbacks.get(None, [])
+            )
+            streams = [
+                stream for stream in self._streams
+                if stream.accepts(notification.method)
+            ]
+
+        for callback in callbacks:
+            try:
+                callback(notification)
+            except Exception:
+                log.exception(
+                    "Unexpected exception raised in %s notification callback",
+                    notification.method,
+                )
+        for stream in streams:
+            stream.push(notification)
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class ScheduleMode(Enum):
+
+    # next run counted from previous scheduled time
+    FIXED_RATE = 'fixed-rate'
+    # next run counted from previous run end
+    FIXED_DELAY = 'fixed-delay'
+
+    @classmethod
+    def get_modes(cls):
+        return [mode.value for mode in cls]
@@ -6,4 +6,5 @@ class GalaxyTCPHandler(socketserver.StreamRequestHandler):
     def handle(self):
         self.server.reader = self.rfile
         self.server.writer = self.wfile
-        self.server.read()
+        while self.server.read():
+            pass
@@ -0,0 +1,45 @@
+class GalaxyMethods:
+    """Galaxy API client methods built on top of ``call``.
+
+    Methods return whatever ``call`` returns, so the same definitions serve
+    blocking clients and awaitable wrappers alike.
+    """
+
+    def call(self, method, **params):
+        raise NotImplementedError
+
+    # internal
+    def shutdown(self):
+        return self.call('shutdown')
+
+    def get_capabilities(self):
+        return self.call('get_capabilities')
+
+    def initialize_cache(self, data: dict):
+        return self.call('initialize_cache', data=data)
+
+    def ping(self):
+        return self.call('ping')
+
+    # external
+    def init_authentication(self):
+        return self.call('init_authentication')
+
+    def pass_login_credentials(self, step, credentials, cookies):
+        return self.call(
+            'pass_login_credentials',
+            step=step, credentials=credentials, cookies=cookies,
+        )
+
+    def import_owned_games(self):
+        return self.call('import_owned_games')
+
+
+class AsyncGalaxyMethods(GalaxyMethods):
+    """Awaitable Galaxy API client methods of an async client stub."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def call(self, method, **params):
+        return self.client.acall(method, **params)
@@ -0,0 +1,166 @@
+import collections
+import threading
+import time
+
+
+class LatencyHistogram:
+    """Fixed memory log-linear histogram of durations.
+
+    Values are recorded in microseconds into ``2 ** precision`` linear
+    sub-buckets per power of two (HDR histogram layout), so the relative
+    error stays under ``2 ** (1 - precision)`` for every recorded value up
+    to ``max_value`` seconds. Larger values are clamped.
+    """
+
+    def __init__(self, precision=7, max_value=3600):
+        self.sub_bucket_bits = precision
+        self.sub_bucket_half = 1 << (precision - 1)
+        self.max_value = int(max_value * 1000000)
+        self.counts = [0] * (self._index(self.max_value) + 1)
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def _index(self, value):
+        shift = max(value.bit_length() - self.sub_bucket_bits, 0)
+        sub_bucket = value >> shift
+        if shift == 0:
+            return sub_bucket
+        return (shift + 1) * self.sub_bucket_half + (
+            sub_bucket - self.sub_bucket_half)
+
+    def _value(self, index):
+        if index < 2 * self.sub_bucket_half:
+            return index
+        shift = index // self.sub_bucket_half - 1
+        sub_bucket = index % self.sub_bucket_half + self.sub_bucket_half
+        # middle of the bucket range
+        return (sub_bucket << shift) + ((1 << shift) >> 1)
+
+    def record(self, seconds):
+        value = min(int(seconds * 1000000), self.max_value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent):
+        if not self.total:
+            return 0.0
+        threshold = percent / 100 * self.total
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= threshold:
+                return min(self._value(index), self.max) / 1000000
+        return self.max / 1000000
+
+    @property
+    def mean(self):
+        if not self.total:
+            return 0.0
+        return self.sum / self.total / 1000000
+
+
+class MethodStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self):
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'latency_mean': self.latency.mean,
+            'latency_p50': self.latency.percentile(50),
+            'latency_p90': self.latency.percentile(90),
+            'latency_p99': self.latency.percentile(99),
+            'latency_max': self.latency.max / 1000000,
+        }
+
+
+class MetricsRegistry:
+    """Per JSON-RPC method call and notification metrics of a client."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.methods = collections.defaultdict(MethodStats)
+        self.notifications = collections.Counter()
+        self.notification_bytes = collections.Counter()
+
+        self._lock = threading.Lock()
+
+    def record_call(
+            self, method, latency, request_size=0, response_size=0,
+            error=False, timeout=False,
+    ):
+        with self._lock:
+            stats = self.methods[method]
+            stats.calls += 1
+            stats.errors += bool(error or timeout)
+            stats.timeouts += bool(timeout)
+            stats.request_bytes += request_size
+            stats.response_bytes += response_size
+            stats.latency.record(latency)
+
+    def record_notification(self, method, size=0):
+        with self._lock:
+            self.notifications[method] += 1
+            self.notification_bytes[method] += size
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                'elapsed': elapsed,
+                'methods': {
+                    method: stats.snapshot()
+                    for method, stats in self.methods.items()
+                },
+                'notifications': {
+                    method: {
+                        'count': count,
+                        'bytes': self.notification_bytes[method],
+                        'rate': count / elapsed if elapsed else 0.0,
+                    }
+                    for method, count in self.notifications.items()
+                },
+            }
+
+    def format(self):
+        snapshot = self.snapshot()
+        ms = 1000
+        lines = [
+            f'Stats after {snapshot["elapsed"]:.3f}s:\n',
+            f' {"method":<32} {"calls":>7} {"errors":>7} {"p50 ms":>9} '
+            f'{"p90 ms":>9} {"p99 ms":>9} {"max ms":>9} {"req B":>10} '
+            f'{"resp B":>12}\n',
+        ]
+        methods = sorted(
+            snapshot['methods'].items(),
+            key=lambda item: item[1]['calls'] * item[1]['latency_mean'],
+            reverse=True,
+        )
+        for method, stats in methods:
+            lines.append(
+                f' {method:<32} {stats["calls"]:>7} {stats["errors"]:>7} '
+                f'{stats["latency_p50"] * ms:>9.3f} '
+                f'{stats["latency_p90"] * ms:>9.3f} '
+                f'{stats["latency_p99"] * ms:>9.3f} '
+                f'{stats["latency_max"] * ms:>9.3f} '
+                f'{stats["request_bytes"]:>10} {stats["response_bytes"]:>12}\n'
+            )
+        for method, stats in sorted(snapshot['notifications'].items()):
+            lines.append(
+                f' notification {method:<19} {stats["count"]:>7} '
+                f'{stats["rate"]:>9.2f}/s {stats["bytes"]:>10} B\n'
+            )
+        return ''.join(lines)
@@ -3,5 +3,6 @@ from collections import namedtuple
 
 Request = namedtuple("Request", ["method", "params", "id"], defaults=[{}, None])
 Response = namedtuple("Response", ["result", "id", "error"], defaults=[{}, None, {}])
+Notification = namedtuple("Notification", ["method", "params"], defaults=[{}])
 Error = namedtuple("Error", ["error", "id"], defaults=[{}, None])
 Method = namedtuple("Method", ["callback", "signature", "internal", "sensitive_params"])
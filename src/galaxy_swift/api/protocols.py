@@ -0,0 +1,228 @@
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class JsonRpcLineProtocol(asyncio.BufferedProtocol):
+    """Newline framed stream protocol with a growable receive buffer.
+
+    The transport reads straight into free space of a single bytearray and
+    every complete frame is handed to ``frame_cb`` as a memoryview slice of
+    it (without the trailing newline). The view is only valid during the
+    callback. Frames are not limited in size unless ``max_frame_size`` is
+    given, in which case the connection is closed on overrun.
+
+    The protocol also acts as the connection writer, providing the subset
+    of ``asyncio.StreamWriter`` interface used by client stubs. Writes made
+    within one loop iteration are coalesced into a single ``writelines``
+    call and ``drain`` blocks producers while the transport buffer is above
+    its high water mark.
+    """
+
+    initial_buffer_size = 64 * 1024
+    min_free_size = 16 * 1024
+
+    def __init__(
+            self, frame_cb, connection_made_cb=None, connection_lost_cb=None,
+            max_frame_size=None, buffer_size=None,
+            high_water=None, low_water=None,
+    ):
+        self.frame_cb = frame_cb
+        self.connection_made_cb = connection_made_cb
+        self.connection_lost_cb = connection_lost_cb
+        self.max_frame_size = max_frame_size
+        self.high_water = high_water
+        self.low_water = low_water
+
+        self.transport = None
+        self.writes = 0
+        self.flushes = 0
+
+        self._buffer = bytearray(buffer_size or self.initial_buffer_size)
+        self._start = 0
+        self._end = 0
+        self._scanned = 0
+
+        self._outgoing = []
+        self._outgoing_size = 0
+        self._flush_handle = None
+
+        self._paused = False
+        self._drain_waiters = []
+        self._closed = None
+
+    # reading
+
+    def get_buffer(self, sizehint):
+        free = len(self._buffer) - self._end
+        if free < self.min_free_size:
+            self._make_room(max(sizehint, self.min_free_size))
+        return memoryview(self._buffer)[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+
+        buffer = self._buffer
+        while True:
+            pos = buffer.find(b"\n", self._scanned, self._end)
+            if pos == -1:
+                break
+
+            with memoryview(buffer) as view, view[self._start:pos] as frame:
+                self._handle_frame(frame)
+            self._start = self._scanned = pos + 1
+
+        if self._start == self._end:
+            self._start = self._end = self._scanned = 0
+            return
+
+        self._scanned = self._end
+        pending_size = self._end - self._start
+        if self.max_frame_size is not None and \
+                pending_size > self.max_frame_size:
+            self._frame_overrun(pending_size)
+
+    def eof_received(self):
+        log.info("Received EOF")
+        # close transport
+        return False
+
+    def _make_room(self, size):
+        pending_size = self._end - self._start
+        if self._start:
+            # move partial frame to the beginning of the buffer
+            self._buffer[:pending_size] = self._buffer[self._start:self._end]
+            self._scanned -= self._start
+            self._start = 0
+            self._end = pending_size
+
+        free = len(self._buffer) - self._end
+        if free < size:
+            grow = max(size - free, len(self._buffer))
+            self._buffer.extend(bytes(grow))
+
+    def _handle_frame(self, frame):
+        try:
+            self.frame_cb(frame)
+        except Exception:
+            log.exception("Unexpected exception raised in frame callback")
+
+    def _frame_overrun(self, size):
+        log.error(
+            "Frame of %d bytes exceeds %d bytes limit, closing connection",
+            size, self.max_frame_size,
+        )
+        self._start = self._end = self._scanned = 0
+        self.transport.close()
+
+    # connection
+
+    def connection_made(self, transport):
+        self.transport = transport
+        if self.high_water is not None or self.low_water is not None:
+            transport.set_write_buffer_limits(
+                high=self.high_water, low=self.low_water)
+        self.low_water, self.high_water = \
+            transport.get_write_buffer_limits()
+        self._closed = asyncio.get_running_loop().create_future()
+        if self.connection_made_cb is not None:
+            self.connection_made_cb(self)
+
+    def connection_lost(self, exc):
+        if exc is not None:
+            log.warning("Connection lost: %s", exc)
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._outgoing.clear()
+        self._outgoing_size = 0
+
+        self._wakeup_drain_waiters(exc)
+        if not self._closed.done():
+            self._closed.set_result(None)
+        if self.connection_lost_cb is not None:
+            self.connection_lost_cb(exc)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._wakeup_drain_waiters()
+
+    def _wakeup_drain_waiters(self, exc=None):
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            if waiter.done():
+                continue
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    # writing
+
+    @property
+    def buffered_bytes(self):
+        """Bytes queued for writing, including transport buffer."""
+        transport_size = 0
+        if self.transport is not None:
+            transport_size = self.transport.get_write_buffer_size()
+        return self._outgoing_size + transport_size
+
+    def write(self, data):
+        self.writes += 1
+        self._outgoing.append(data)
+        self._outgoing_size += len(data)
+
+        if self._outgoing_size >= self.high_water:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(
+                self.flush)
+
+    def writelines(self, data):
+        for chunk in data:
+            self.write(chunk)
+
+    def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._outgoing or self.transport.is_closing():
+            return
+
+        outgoing = self._outgoing
+        self._outgoing = []
+        self._outgoing_size = 0
+        self.flushes += 1
+        if len(outgoing) == 1:
+            self.transport.write(outgoing[0])
+        else:
+            self.transport.writelines(outgoing)
+
+    async def drain(self):
+        if self.transport.is_closing():
+            # give connection_lost a chance to run
+            await asyncio.sleep(0)
+            raise ConnectionResetError('Connection lost')
+        if not self._paused:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+    def get_extra_info(self, name, default=None):
+        return self.transport.get_extra_info(name, default)
+
+    def is_closing(self):
+        return self.transport.is_closing()
+
+    def close(self):
+        self.flush()
+        self.transport.close()
+
+    async def wait_closed(self):
+        await asyncio.shield(self._closed)
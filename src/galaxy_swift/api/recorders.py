@@ -0,0 +1,112 @@
+import json
+import logging
+import threading
+import time
+
+from galaxy_swift.api.metrics import MetricsRegistry
+
+log = logging.getLogger(__name__)
+
+IN = 'in'
+OUT = 'out'
+
+
+class SessionRecorder:
+    """Records JSON-RPC frames to an NDJSON file.
+
+    Each line holds monotonic seconds since the recording started (``t``),
+    direction relative to the client (``d``: ``out`` for frames sent to the
+    plugin, ``in`` for received ones), frame size in bytes (``s``) and the
+    frame itself (``m``), copied verbatim without re-encoding. Frames the
+    client failed to decode are stored as a string (``r``) instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.started = time.monotonic()
+        self.records = 0
+
+        self._file = open(path, 'wb')
+        self._lock = threading.Lock()
+
+    def record(self, direction, data, valid=True):
+        """Record frames of data, ``valid`` when the caller decoded them."""
+        offset = time.monotonic() - self.started
+        prefix = b'{"t":%.6f,"d":"%s",' % (offset, direction.encode())
+        lines = []
+        for line in bytes(data).splitlines():
+            if not line.strip():
+                continue
+            if valid:
+                frame = b'"m":' + line
+            else:
+                # embedded verbatim it would break the NDJSON line
+                frame = b'"r":' + json.dumps(
+                    line.decode('utf-8', errors='replace')).encode('utf-8')
+            lines.append(prefix + b'"s":%d,' % len(line) + frame + b'}\n')
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.writelines(lines)
+            self.records += len(lines)
+
+    def record_out(self, data):
+        self.record(OUT, data)
+
+    def record_in(self, data, valid=True):
+        self.record(IN, data, valid=valid)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def read_recording(path):
+    """Yield (offset, direction, message, size) recording entries.
+
+    Frames that were not valid JSON are skipped.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if 'm' not in record:
+                log.debug("Skipping invalid %s frame", record['d'])
+                continue
+            yield record['t'], record['d'], record['m'], record['s']
+
+
+def analyze_recording(entries):
+    """Rebuild call and notification metrics from recording entries."""
+    metrics = MetricsRegistry()
+    requests = {}
+    last_offset = 0.0
+
+    def messages(message):
+        return message if isinstance(message, list) else [message]
+
+    for offset, direction, message, size in entries:
+        last_offset = offset
+        items = messages(message)
+        item_size = size // max(len(items), 1)
+        for item in items:
+            if direction == OUT and 'id' in item:
+                requests[item['id']] = (item['method'], offset, item_size)
+            elif 'id' not in item:
+                metrics.record_notification(item.get('method'), item_size)
+            elif item['id'] in requests:
+                method, start, request_size = requests.pop(item['id'])
+                metrics.record_call(
+                    method, offset - start,
+                    request_size=request_size, response_size=item_size,
+                    error='error' in item,
+                )
+
+    for method, _, request_size in requests.values():
+        # never answered
+        metrics.record_call(
+            method, 0, request_size=request_size, error=True, timeout=True)
+
+    metrics.started = time.monotonic() - last_offset
+    return metrics
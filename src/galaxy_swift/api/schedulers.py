@@ -0,0 +1,164 @@
+import asyncio
+import inspect
+import logging
+import time
+
+from galaxy_swift.api.enums import ScheduleMode
+
+log = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+
+    def __init__(self, callback, interval, mode, name=None):
+        self.callback = callback
+        self.interval = interval
+        self.mode = mode
+        self.name = name or getattr(callback, '__name__', repr(callback))
+
+        self.runs = 0
+        self.overruns = 0
+        self.last_start = None
+        self.last_duration = None
+        self.next_run = time.monotonic() + interval
+
+        self._task = None
+
+    def __repr__(self):
+        return (
+            f'<{self.__class__.__name__} {self.name} every {self.interval}s '
+            f'{self.mode.value} runs={self.runs} overruns={self.overruns}>'
+        )
+
+    def is_running(self):
+        return self._task is not None and not self._task.done()
+
+    def schedule_next(self, scheduled, finished):
+        if self.mode is ScheduleMode.FIXED_DELAY:
+            self.next_run = finished + self.interval
+            return
+
+        self.next_run = scheduled + self.interval
+        if self.next_run <= finished:
+            # skip missed runs instead of bursting to catch up
+            missed = int((finished - scheduled) // self.interval)
+            self.next_run = scheduled + (missed + 1) * self.interval
+
+
+class TickScheduler:
+    """Runs periodic client jobs from a single coroutine.
+
+    The coroutine sleeps until the nearest job is due and does not wake up
+    at all while there are no jobs. Coroutine function jobs run as tasks;
+    a job still running (or a plain callback taking longer than its
+    interval) when the next run is due counts as an overrun.
+    """
+
+    def __init__(self, mode=ScheduleMode.FIXED_RATE):
+        self.mode = mode
+        self.jobs = []
+
+        self._stopped = False
+        self._loop = None
+        self._wakeup = None
+
+    def add_job(self, callback, interval, mode=None, name=None):
+        if interval <= 0:
+            raise ValueError('Job interval must be positive')
+        job = PeriodicJob(callback, interval, mode or self.mode, name=name)
+        self.jobs.append(job)
+        self._notify()
+        return job
+
+    def remove_job(self, job):
+        self.jobs.remove(job)
+        if job._task is not None:
+            job._task.cancel()
+        self._notify()
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+
+        while not self._stopped:
+            timeout = None
+            now = time.monotonic()
+            for job in list(self.jobs):
+                if job.next_run <= now:
+                    # fixed rate runs stay on the grid despite late wake-ups
+                    await self._run_job(job, job.next_run)
+                    now = time.monotonic()
+                if timeout is None or job.next_run - now < timeout:
+                    timeout = max(job.next_run - now, 0)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+        for job in self.jobs:
+            if job.is_running():
+                job._task.cancel()
+
+    def stop(self):
+        self._stopped = True
+        self._notify()
+
+    def _notify(self):
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run_job(self, job, scheduled):
+        if job.is_running():
+            self._overrun(job, time.monotonic() - job.last_start)
+            job.schedule_next(scheduled, time.monotonic())
+            return
+
+        start = job.last_start = time.monotonic()
+        if inspect.iscoroutinefunction(job.callback):
+            job._task = asyncio.create_task(self._run_task(job))
+            job.runs += 1
+            finished = start
+            if job.mode is ScheduleMode.FIXED_DELAY:
+                # next run is scheduled when the task ends
+                job.next_run = float('inf')
+                return
+        else:
+            try:
+                job.callback()
+            except Exception:
+                log.exception(
+                    "Unexpected exception raised in %s job", job.name)
+            job.runs += 1
+            finished = time.monotonic()
+            job.last_duration = finished - start
+            if job.last_duration > job.interval:
+                self._overrun(job, job.last_duration)
+
+        job.schedule_next(scheduled, finished)
+
+    async def _run_task(self, job):
+        start = time.monotonic()
+        try:
+            await job.callback()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Unexpected exception raised in %s job", job.name)
+        finished = time.monotonic()
+        job.last_duration = finished - start
+        if job.mode is ScheduleMode.FIXED_DELAY:
+            # fixed rate overruns are detected when the next run is due
+            if job.last_duration > job.interval:
+                self._overrun(job, job.last_duration)
+            job.schedule_next(start, finished)
+            self._notify()
+
+    def _overrun(self, job, duration):
+        job.overruns += 1
+        log.warning(
+            "Job %s took %.3fs, longer than its %.3fs interval",
+            job.name, duration, job.interval,
+        )
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import math
+import time
+
+from galaxy_swift.types import BenchmarkResult
+
+log = logging.getLogger(__name__)
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class MethodBenchmark:
+    """Measures latency and throughput of a client method.
+
+    Runs ``warmup`` unmeasured calls and then ``iterations`` measured ones,
+    keeping ``concurrency`` calls in flight on the client connection.
+    """
+
+    def __init__(
+            self, client, method, params=None, iterations=100, warmup=10,
+            concurrency=1,
+    ):
+        self.client = client
+        self.method = method
+        self.params = params or {}
+        self.iterations = iterations
+        self.warmup = warmup
+        self.concurrency = concurrency
+
+    def run(self):
+        """Run benchmark on a client served from another thread loop."""
+        future = asyncio.run_coroutine_threadsafe(
+            self.arun(), self.client.loop)
+        return future.result()
+
+    async def arun(self):
+        log.info("Warming up %s with %d calls", self.method, self.warmup)
+        await self._run_calls(self.warmup, [])
+
+        bytes_sent = self.client.bytes_sent
+        bytes_received = self.client.bytes_received
+        latencies = []
+        log.info("Measuring %s with %d calls", self.method, self.iterations)
+        start = time.perf_counter()
+        errors = await self._run_calls(self.iterations, latencies)
+        total_time = time.perf_counter() - start
+
+        latencies.sort()
+        iterations = max(self.iterations, 1)
+        return BenchmarkResult(
+            method=self.method,
+            iterations=self.iterations,
+            concurrency=self.concurrency,
+            errors=errors,
+            total_time=total_time,
+            throughput=self.iterations / total_time if total_time else 0.0,
+            latency_mean=sum(latencies) / iterations,
+            latency_p50=percentile(latencies, 50),
+            latency_p90=percentile(latencies, 90),
+            latency_p99=percentile(latencies, 99),
+            latency_max=latencies[-1] if latencies else 0.0,
+            request_bytes=(self.client.bytes_sent - bytes_sent) / iterations,
+            response_bytes=(
+                self.client.bytes_received - bytes_received) / iterations,
+        )
+
+    async def _run_calls(self, count, latencies):
+        remaining = iter(range(count))
+        errors = 0
+
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await self.client.acall(
+                        self.method, **self.params)
+                except Exception:
+                    log.exception("Benchmark call failed")
+                    errors += 1
+                else:
+                    errors += bool(response.error)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return errors
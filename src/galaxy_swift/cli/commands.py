@@ -1,15 +1,26 @@
 import abc
-import asyncio
+import dataclasses
+import json
 import os
 import sys
+import time
 from functools import lru_cache
 
-from galaxy_swift.cli.shells import GalaxyInteractiveShellEmbed
+# keep this module light, command modules are imported in handle methods
+from galaxy_swift.api.enums import ScheduleMode
+from galaxy_swift.cli.enums import OutputFormat
+from galaxy_swift.exceptions import GalaxySwiftError
 from galaxy_swift.paths import PluginPath
-from galaxy_swift.runners import (
-    PluginSubprocessRunner, ClientStubRunner, AsyncClientStubRunner,
-)
-from galaxy_swift.tokens.generators import UUIDTokenGenerator
+
+
+def parse_port(value):
+    """Parse port argument, ``auto`` means any free port."""
+    if value == 'auto':
+        return 0
+    port = int(value)
+    if not 0 <= port <= 65535:
+        raise ValueError(value)
+    return port
 
 
 class BaseCommand(abc.ABC):
@@ -21,7 +32,9 @@ class BaseCommand(abc.ABC):
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        cls.commands[cls.command] = cls  # pylint: disable=no-member
+        # abstract bases do not define command
+        if 'command' in cls.__dict__:
+            cls.commands[cls.command] = cls
 
     def __init__(self, plugin_dir=None, stdout=None, stderr=None):
         self.plugin_dir = plugin_dir or os.getcwd()
@@ -65,17 +78,27 @@ class InfoCommand(BaseCommand):
         ])
 
 
-class ShellCommand(BaseCommand):
+class PluginSessionCommand(BaseCommand):
+    """Base for commands running a plugin connected to the client stub."""
 
-    help = 'Run interactive shell'
-    command = 'shell'
+    # use plugin daemon session when running
+    reuses_daemon = False
+    # run plugin in a thread of this process
+    in_process = False
+    # plugin profiler stats path
+    profile = None
+    # restarts crashed or hung plugin when set
+    supervisor = None
+    # forks plugin from a warm interpreter when set
+    zygote = None
 
     def add_arguments(self, parser):
         parser.add_argument(
             '-p', '--port',
-            help=f'client-plugin connection port (default: 5431).',
+            help=f'client-plugin connection port (default: 0, any free port).',
             metavar='port',
-            default='5431',
+            type=parse_port,
+            default='0',
         )
         parser.add_argument(
             '-t', '--token',
@@ -83,93 +106,755 @@ class ShellCommand(BaseCommand):
             metavar='token',
             default=None,
         )
+        parser.add_argument(
+            '-u', '--unix-socket',
+            help=f'client-plugin connection unix socket path '
+                 f'(overrides port).',
+            metavar='path',
+            dest='unix_socket',
+            default=None,
+        )
+        parser.add_argument(
+            '--in-process',
+            help=f'run plugin in this process connected through a socketpair.',
+            dest='in_process',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--profile',
+            help=f'dump plugin cProfile stats to file (implies --in-process).',
+            metavar='path',
+            default=None,
+        )
+        parser.add_argument(
+            '--zygote',
+            help=f'fork plugin from a warm interpreter with plugin imports '
+                 f'already done.',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--supervise',
+            help=f'restart plugin when it exits or stops answering pings.',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--max-restarts',
+            help=f'give up supervising after that many restarts '
+                 f'(default: no limit).',
+            metavar='count',
+            dest='max_restarts',
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            '--timeout',
+            help=f'plugin connection and per call timeout in seconds '
+                 f'(default: no timeout).',
+            metavar='seconds',
+            type=float,
+            default=None,
+        )
+        parser.add_argument(
+            '--teardown-timeout',
+            help=f'seconds plugin gets to stop at each teardown stage '
+                 f'(shutdown, EOF, SIGTERM) before SIGKILL (default: 1).',
+            metavar='seconds',
+            dest='teardown_timeout',
+            type=float,
+            default=None,
+        )
+        parser.add_argument(
+            '--session-timeout',
+            help=f'deadline for all calls of the session in seconds '
+                 f'(default: no timeout).',
+            metavar='seconds',
+            dest='session_timeout',
+            type=float,
+            default=None,
+        )
+        modes_list = tuple(ScheduleMode.get_modes())
+        parser.add_argument(
+            '--tick-interval',
+            help=f'client tick interval in seconds, 0 disables ticks '
+                 f'(default: 1).',
+            metavar='seconds',
+            dest='tick_interval',
+            type=float,
+            default=1.0,
+        )
+        parser.add_argument(
+            '--tick-mode',
+            help=f'client tick scheduling mode {modes_list}.',
+            metavar='mode',
+            dest='tick_mode',
+            type=ScheduleMode,
+            choices=list(ScheduleMode),
+            default=ScheduleMode.FIXED_RATE,
+        )
+        parser.add_argument(
+            '--stats',
+            help=f'print client call metrics to stderr at exit.',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--cache',
+            help=f'cache responses of idempotent client methods.',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--no-cache-store',
+            help=f'do not persist plugin pushed cache between sessions.',
+            dest='cache_store',
+            action='store_false',
+        )
+        parser.add_argument(
+            '--cache-dir',
+            help=f'plugin cache store directory '
+                 f'(default: ~/.cache/galaxy-swift).',
+            metavar='path',
+            dest='cache_dir',
+            default=None,
+        )
+        parser.add_argument(
+            '--record',
+            help=f'record client-plugin messages to NDJSON file.',
+            metavar='path',
+            default=None,
+        )
+        if self.reuses_daemon:
+            parser.add_argument(
+                '--no-daemon',
+                help=f'start new session even if plugin daemon is running.',
+                dest='daemon',
+                action='store_false',
+            )
 
     @property
     @lru_cache(1)
     def plugin_runner(self):
-        return PluginSubprocessRunner(
-            stdout=self.stdout, stderr=self.stderr)
+        if self.in_process:
+            from galaxy_swift.runners import InProcessPluginRunner
+            return InProcessPluginRunner(profile=self.profile is not None)
+
+        from galaxy_swift.runners import AsyncPluginRunner
+        return AsyncPluginRunner(
+            self.client_runner, stdout=self.stdout, stderr=self.stderr,
+            zygote=self.zygote,
+        )
 
     @property
     @lru_cache(1)
     def client_runner(self):
+        from galaxy_swift.runners import AsyncClientStubRunner
         return AsyncClientStubRunner()
 
-    def handle(self, namespace, **options):
+    def get_client_kwargs(self, namespace):
+        from galaxy_swift.api.caches import ResponseCache
+        from galaxy_swift.api.recorders import SessionRecorder
+
+        recorder = None
+        if namespace.record is not None:
+            recorder = SessionRecorder(namespace.record)
+        return {
+            'tick_interval': namespace.tick_interval,
+            'tick_mode': namespace.tick_mode,
+            'recorder': recorder,
+            'cache': ResponseCache() if namespace.cache else None,
+        }
+
+    def start_session(self, namespace):
+        from galaxy_swift.tokens.generators import UUIDTokenGenerator
+
         if namespace.token is None:
             namespace.token = UUIDTokenGenerator().generate()
-
+        self.profile = namespace.profile
+        self.in_process = namespace.in_process or self.profile is not None
+        if self.in_process and namespace.supervise:
+            raise GalaxySwiftError(
+                'Plugin running in process can not be supervised')
+        if self.in_process and namespace.zygote:
+            raise GalaxySwiftError(
+                'Plugin running in process can not be forked by zygote')
+        if namespace.zygote:
+            self.start_zygote()
+
+        sock = path = None
+        if self.in_process:
+            sock = self.plugin_runner.client_sock
+        else:
+            path = namespace.unix_socket
         self.client_runner.bind(
-            namespace.token, namespace.port)
+            namespace.token, namespace.port, path=path, sock=sock,
+            **self.get_client_kwargs(namespace),
+        )
         self.client_runner.start()
+        # port is known only once the client listens
+        try:
+            listening = self.client_runner.wait_listening(namespace.timeout)
+        except OSError as exc:
+            raise GalaxySwiftError(f'Client stub failed to listen: {exc}')
+        if not listening:
+            raise GalaxySwiftError('Client stub failed to start listening')
+
+        client = self.client_runner.client
+        client.call_timeout = namespace.timeout
+        client.set_session_timeout(namespace.session_timeout)
+
+        if namespace.supervise:
+            self.start_supervisor(namespace)
+            return
+
         self.plugin_runner.bind(
-            self.plugin_path, namespace.token, namespace.port)
+            self.plugin_path, namespace.token, self.client_runner.port,
+            path=namespace.unix_socket,
+        )
         self.plugin_runner.start()
-        self.client_runner.wait()
+        if not self.client_runner.wait(namespace.timeout):
+            self.stop_session()
+            raise GalaxySwiftError(
+                f'Plugin did not connect within {namespace.timeout} seconds')
+
+        if namespace.cache_store:
+            self.restore_cache(namespace)
+
+    def start_zygote(self):
+        from galaxy_swift.zygotes import PluginZygote
+
+        # forked plugins write to inherited stdout and stderr
+        self.zygote = PluginZygote(self.plugin_path)
+        self.zygote.start()
+
+    def start_supervisor(self, namespace):
+        import asyncio
+        from galaxy_swift.stores import PluginCacheStore
+        from galaxy_swift.supervisors import PluginSupervisor
+
+        store = None
+        if namespace.cache_store:
+            store = PluginCacheStore.for_plugin(
+                self.plugin_path, cache_dir=namespace.cache_dir)
+        client = self.client_runner.client
+        self.supervisor = PluginSupervisor(
+            client, self.plugin_path, path=namespace.unix_socket,
+            max_restarts=namespace.max_restarts,
+            connect_timeout=namespace.timeout or 30.0,
+            cache_store=store, output_cb=self.write_plugin_output,
+            zygote=self.zygote,
+        )
+        # supervisor handshake replaces restore_cache
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self.supervisor.start(), client.loop).result()
+        except GalaxySwiftError:
+            self.stop_session()
+            raise
+
+    def write_plugin_output(self, name, line):
+        stream = self.stdout if name == 'stdout' else self.stderr
+        stream.write(line)
+
+    def open_session(self, namespace):
+        """Return running daemon client or start new session client."""
+        from galaxy_swift.daemons import DaemonClient
+
+        if namespace.daemon and self.plugin_path.manifest_file.is_file():
+            daemon = DaemonClient.for_plugin(
+                self.plugin_path, timeout=namespace.timeout)
+            if daemon.is_running():
+                return daemon
+
+        self.start_session(namespace)
+        return self.client_runner.client
+
+    def close_session(self, client, namespace):
+        from galaxy_swift.daemons import DaemonClient
+
+        if isinstance(client, DaemonClient):
+            client.close()
+            return
+        self.stop_session(namespace)
+
+    def restore_cache(self, namespace):
+        from galaxy_swift.stores import PluginCacheStore
+
+        store = PluginCacheStore.for_plugin(
+            self.plugin_path, cache_dir=namespace.cache_dir)
+        client = self.client_runner.client
+        client.notifications.subscribe('push_cache', store.handle_notification)
+        client.initialize_cache(store.load())
+
+    def teardown_session(self, namespace=None):
+        """Stop plugin: shutdown RPC, EOF, SIGTERM then SIGKILL."""
+        import asyncio
+        from galaxy_swift.teardowns import PluginTeardown
+
+        timeout = namespace.teardown_timeout if namespace else None
+        client = self.client_runner.client
+        if self.supervisor is not None:
+            teardown = self.supervisor.stop(timeout=timeout)
+        else:
+            # in process plugin can not be signaled
+            process = None if self.in_process else self.plugin_runner.process
+            teardown = PluginTeardown(client, process, timeout=timeout).run()
+        result = asyncio.run_coroutine_threadsafe(
+            teardown, client.loop).result()
+        if self.in_process:
+            self.plugin_runner.terminate()
+        return result
+
+    def stop_session(self, namespace=None):
+        from galaxy_swift.teardowns import format_teardown
+
+        teardown = self.teardown_session(namespace)
+        self.client_runner.terminate()
+        if self.zygote is not None:
+            self.zygote.close()
+        if self.profile is not None:
+            self.plugin_runner.join(5)
+            self.plugin_runner.dump_stats(self.profile)
+
+        client = self.client_runner.client
+        if client.recorder is not None:
+            client.recorder.close()
+        if namespace is not None and namespace.stats:
+            self.stderr.write(client.metrics.format())
+            if client.cache is not None:
+                self.stderr.write(
+                    'Cache: {hits} hits, {misses} misses, '
+                    '{evictions} evictions\n'.format(**client.cache.stats()))
+            self.stderr.write(format_teardown(teardown))
+
+
+class ShellCommand(PluginSessionCommand):
+
+    help = 'Run interactive shell'
+    command = 'shell'
+    reuses_daemon = True
+
+    def handle(self, namespace, **options):
+        # IPython import takes most of the startup time
+        from galaxy_swift.cli.shells import GalaxyInteractiveShellEmbed
+
+        client = self.open_session(namespace)
 
         shell = GalaxyInteractiveShellEmbed(exit_msg='Goodbye!')
-        shell(self.client_runner.client)
+        shell(client)
 
-        self.plugin_runner.terminate()
-        self.client_runner.terminate()
+        self.close_session(client, namespace)
 
 
-class RunCommand(BaseCommand):
+class RunCommand(PluginSessionCommand):
 
     help = 'Run one-off client method'
     command = 'run'
+    reuses_daemon = True
     methods = [
         'get_capabilities', 'ping', 'import_user_infos',
     ]
 
     def add_arguments(self, parser):
+        super().add_arguments(parser)
+        methods_list = tuple(self.methods)
         parser.add_argument(
-            '-p', '--port',
-            help=f'client-plugin connection port.',
-            metavar='port',
-            default='5431',
+            'method',
+            choices=self.methods,
+            help=f'the client method to run {methods_list}.',
+            metavar='method',
         )
+
+    def handle(self, namespace, **options):
+        from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+
+        client = self.open_session(namespace)
+
+        try:
+            ret = client.call(namespace.method)
+        except RequestTimeout as exc:
+            raise GalaxySwiftError(f'{namespace.method}: {exc}')
+        finally:
+            self.close_session(client, namespace)
+
+        self.stdout.write(f'{ret}\n')
+
+
+class DaemonCommand(PluginSessionCommand):
+
+    help = 'Keep plugin session running for run and shell commands'
+    command = 'daemon'
+    actions = ['start', 'stop', 'status']
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        actions_list = tuple(self.actions)
         parser.add_argument(
-            '-t', '--token',
-            help=f'client-plugin connection token (default: random token).',
-            metavar='token',
+            'action',
+            nargs='?',
+            choices=self.actions,
+            default='start',
+            help=f'daemon action {actions_list} (default: start).',
+            metavar='action',
+        )
+        parser.add_argument(
+            '--idle-timeout',
+            help=f'stop after seconds without requests, 0 disables '
+                 f'(default: 900).',
+            metavar='seconds',
+            dest='idle_timeout',
+            type=float,
+            default=900.0,
+        )
+
+    def handle(self, namespace, **options):
+        import asyncio
+        from galaxy_swift.daemons import DaemonClient, SessionDaemon
+
+        control = DaemonClient.for_plugin(self.plugin_path)
+        running = control.is_running()
+
+        if namespace.action == 'status':
+            if not running:
+                self.stdout.write('Daemon not running\n')
+                return
+            status = control.status()
+            self.stdout.write(
+                f'Daemon running: pid {status["pid"]}, '
+                f'{status["calls"]} calls, uptime {status["uptime"]:.0f}s\n')
+            return
+
+        if namespace.action == 'stop':
+            if not running:
+                raise GalaxySwiftError('Daemon not running')
+            control.stop()
+            self.stdout.write('Daemon stopped\n')
+            return
+
+        if running:
+            raise GalaxySwiftError(f'Daemon already running on {control.path}')
+
+        self.start_session(namespace)
+        client = self.client_runner.client
+        daemon = SessionDaemon(
+            client, control.path, idle_timeout=namespace.idle_timeout or None)
+        asyncio.run_coroutine_threadsafe(daemon.start(), client.loop).result()
+        self.stdout.write(f'Daemon listening on {control.path}\n')
+        self.stdout.flush()
+
+        try:
+            daemon.stopped.wait()
+        except KeyboardInterrupt:
+            client.loop.call_soon_threadsafe(daemon.stop)
+        finally:
+            self.stop_session(namespace)
+
+
+class MultiRunCommand(BaseCommand):
+
+    help = 'Run client methods against many plugins at once'
+    command = 'multi-run'
+    default_methods = ['get_capabilities', 'ping']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'plugin_dirs',
+            nargs='+',
+            help=f'plugin directories.',
+            metavar='plugin_dir',
+        )
+        parser.add_argument(
+            '-m', '--method',
+            help=f'client method to run, can be repeated '
+                 f'(default: {" ".join(self.default_methods)}).',
+            metavar='method',
+            dest='methods',
+            action='append',
             default=None,
         )
-        methods_list = tuple(self.methods)
+        parser.add_argument(
+            '-c', '--concurrency',
+            help=f'maximum number of concurrent plugin sessions (default: 8).',
+            metavar='number',
+            type=int,
+            default=8,
+        )
+        parser.add_argument(
+            '--timeout',
+            help=f'plugin connection and per call timeout in seconds '
+                 f'(default: 30).',
+            metavar='seconds',
+            type=float,
+            default=30.0,
+        )
+        formats_list = tuple(OutputFormat.get_formats())
+        parser.add_argument(
+            '-f', '--format',
+            help=f'output format {formats_list}.',
+            metavar='format',
+            dest='output_format',
+            type=OutputFormat,
+            choices=list(OutputFormat),
+            default=OutputFormat.TABLE,
+        )
+        parser.add_argument(
+            '--plugin-output',
+            help=f'show plugins stdout and stderr.',
+            dest='plugin_output',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--zygote',
+            help=f'fork sessions of every plugin directory from a warm '
+                 f'interpreter with plugin imports already done.',
+            action='store_true',
+        )
+
+    def handle(self, namespace, **options):
+        import subprocess
+        from galaxy_swift.orchestrators import PluginOrchestrator
+
+        output = None if namespace.plugin_output else subprocess.DEVNULL
+        orchestrator = PluginOrchestrator(
+            namespace.plugin_dirs,
+            namespace.methods or self.default_methods,
+            concurrency=namespace.concurrency,
+            timeout=namespace.timeout,
+            stdout=output, stderr=output, zygote=namespace.zygote,
+        )
+        start = time.monotonic()
+        results = orchestrator.run()
+        total_time = time.monotonic() - start
+
+        if namespace.output_format is OutputFormat.JSON:
+            json.dump(
+                [dataclasses.asdict(result) for result in results],
+                self.stdout, indent=2, default=str,
+            )
+            self.stdout.write('\n')
+            return
+
+        lines = []
+        failed = 0
+        for result in results:
+            ok = not result.error and not any(
+                method_result.error for method_result in result.methods)
+            failed += not ok
+            status = 'OK' if ok else 'ERROR'
+            lines.append(
+                f'{result.name or result.plugin_dir}: {status} '
+                f'total {result.total_time:.3f}s\n')
+            if result.error:
+                lines.append(f'  error: {result.error}\n')
+            if result.connect_time is not None:
+                lines.append(f'  connect: {result.connect_time:.3f}s\n')
+            for method_result in result.methods:
+                status = 'ERROR' if method_result.error else 'OK'
+                lines.append(
+                    f'  {method_result.method}: {status} '
+                    f'{method_result.duration:.3f}s\n')
+            if result.teardown_time is not None:
+                lines.append(f'  teardown: {result.teardown_time:.3f}s\n')
+        lines.append(
+            f'{len(results)} plugins, {failed} failed, '
+            f'{total_time:.3f}s\n')
+        self.stdout.writelines(lines)
+
+
+class BenchCommand(PluginSessionCommand):
+
+    help = 'Benchmark client method throughput and latency'
+    command = 'bench'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
         parser.add_argument(
             'method',
-            choices=self.methods,
-            help=f'the client method to run {methods_list}.',
+            help=f'the client method to benchmark.',
             metavar='method',
         )
+        parser.add_argument(
+            '--params',
+            help=f'method params as JSON object (default: {{}}).',
+            metavar='json',
+            type=json.loads,
+            default=None,
+        )
+        parser.add_argument(
+            '-n', '--iterations',
+            help=f'number of measured calls (default: 1000).',
+            metavar='number',
+            type=int,
+            default=1000,
+        )
+        parser.add_argument(
+            '-w', '--warmup',
+            help=f'number of warmup calls (default: 100).',
+            metavar='number',
+            type=int,
+            default=100,
+        )
+        parser.add_argument(
+            '-c', '--concurrency',
+            help=f'number of calls in flight (default: 1).',
+            metavar='number',
+            type=int,
+            default=1,
+        )
+        formats_list = tuple(OutputFormat.get_formats())
+        parser.add_argument(
+            '-f', '--format',
+            help=f'output format {formats_list}.',
+            metavar='format',
+            dest='output_format',
+            type=OutputFormat,
+            choices=list(OutputFormat),
+            default=OutputFormat.TABLE,
+        )
 
-    @property
-    @lru_cache(1)
-    def plugin_runner(self):
-        return PluginSubprocessRunner(
-            stdout=self.stdout, stderr=self.stderr)
+    def handle(self, namespace, **options):
+        from galaxy_swift.benchmarks import MethodBenchmark
 
-    @property
-    @lru_cache(1)
-    def client_runner(self):
-        return AsyncClientStubRunner()
+        self.start_session(namespace)
+
+        benchmark = MethodBenchmark(
+            self.client_runner.client, namespace.method,
+            params=namespace.params,
+            iterations=namespace.iterations,
+            warmup=namespace.warmup,
+            concurrency=namespace.concurrency,
+        )
+        try:
+            result = benchmark.run()
+        finally:
+            self.stop_session(namespace)
+
+        if namespace.output_format is OutputFormat.JSON:
+            json.dump(dataclasses.asdict(result), self.stdout, indent=2)
+            self.stdout.write('\n')
+            return
+
+        ms = 1000
+        self.stdout.writelines([
+            f'Benchmark: {result.method}\n',
+            f' Iterations: {result.iterations}\n',
+            f' Concurrency: {result.concurrency}\n',
+            f' Errors: {result.errors}\n',
+            f' Total time: {result.total_time:.3f} s\n',
+            f' Throughput: {result.throughput:.1f} calls/s\n',
+            f' Latency mean: {result.latency_mean * ms:.3f} ms\n',
+            f' Latency p50: {result.latency_p50 * ms:.3f} ms\n',
+            f' Latency p90: {result.latency_p90 * ms:.3f} ms\n',
+            f' Latency p99: {result.latency_p99 * ms:.3f} ms\n',
+            f' Latency max: {result.latency_max * ms:.3f} ms\n',
+            f' Request size: {result.request_bytes:.1f} bytes/call\n',
+            f' Response size: {result.response_bytes:.1f} bytes/call\n',
+        ])
+
+
+class AnalyzeCommand(BaseCommand):
+
+    help = 'Analyze recorded client-plugin session'
+    command = 'analyze'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'recording',
+            help=f'session recording file.',
+            metavar='file',
+        )
+        formats_list = tuple(OutputFormat.get_formats())
+        parser.add_argument(
+            '-f', '--format',
+            help=f'output format {formats_list}.',
+            metavar='format',
+            dest='output_format',
+            type=OutputFormat,
+            choices=list(OutputFormat),
+            default=OutputFormat.TABLE,
+        )
 
     def handle(self, namespace, **options):
-        if namespace.token is None:
-            namespace.token = UUIDTokenGenerator().generate()
+        from galaxy_swift.api.recorders import (
+            read_recording, analyze_recording,
+        )
 
-        self.client_runner.bind(
-            namespace.token, namespace.port)
-        self.client_runner.start()
-        self.plugin_runner.bind(
-            self.plugin_path, namespace.token, namespace.port)
-        self.plugin_runner.start()
-        self.client_runner.wait()
+        try:
+            metrics = analyze_recording(read_recording(namespace.recording))
+        except (OSError, ValueError) as exc:
+            raise GalaxySwiftError(f'Invalid recording: {exc}')
 
-        ret = self.client_runner.execute(namespace.method)
+        if namespace.output_format is OutputFormat.JSON:
+            json.dump(metrics.snapshot(), self.stdout, indent=2)
+            self.stdout.write('\n')
+            return
 
-        self.stdout.write(f'{ret}\n')
+        self.stdout.write(metrics.format())
 
-        self.plugin_runner.terminate()
-        self.client_runner.terminate()
- 
\ No newline at end of file
+
+class ReplayCommand(PluginSessionCommand):
+
+    help = 'Replay recorded client requests against plugin'
+    command = 'replay'
+
+    # answers requests from the recording when set
+    replay_plugin = None
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            'recording',
+            help=f'session recording file.',
+            metavar='file',
+        )
+        parser.add_argument(
+            '-s', '--speed',
+            help=f'replay speed factor, 0 sends all requests at once '
+                 f'(default: 1).',
+            metavar='factor',
+            type=float,
+            default=1.0,
+        )
+        parser.add_argument(
+            '--as-plugin',
+            help=f'answer replayed requests from the recording instead of '
+                 f'running the plugin.',
+            dest='as_plugin',
+            action='store_true',
+        )
+
+    @property
+    @lru_cache(1)
+    def plugin_runner(self):
+        if self.replay_plugin is None:
+            return PluginSessionCommand.plugin_runner.fget(self)
+
+        from galaxy_swift.replays import ReplayPluginRunner
+        return ReplayPluginRunner(self.client_runner, self.replay_plugin)
+
+    def handle(self, namespace, **options):
+        from galaxy_swift.api.recorders import read_recording
+        from galaxy_swift.replays import ReplayClient, ReplayPlugin
+
+        try:
+            entries = list(read_recording(namespace.recording))
+        except (OSError, ValueError, KeyError) as exc:
+            raise GalaxySwiftError(f'Invalid recording: {exc}')
+
+        if namespace.as_plugin:
+            if (namespace.in_process or namespace.profile is not None
+                    or namespace.zygote or namespace.supervise):
+                raise GalaxySwiftError(
+                    'Replay plugin can not be combined with --in-process, '
+                    '--profile, --zygote or --supervise')
+            # there is no plugin to persist the cache of
+            namespace.cache_store = False
+            self.replay_plugin = ReplayPlugin(entries, speed=namespace.speed)
+
+        self.start_session(namespace)
+
+        replay = ReplayClient(
+            self.client_runner.client, entries, speed=namespace.speed)
+        try:
+            metrics = replay.run()
+        finally:
+            self.stop_session(namespace)
+
+        self.stdout.write(metrics.format())
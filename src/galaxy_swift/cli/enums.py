@@ -13,3 +13,13 @@ class LogLevel(Enum):
     @classmethod
     def get_levels(cls):
         return list(cls.__members__.keys())
+
+
+class OutputFormat(Enum):
+
+    TABLE = 'table'
+    JSON = 'json'
+
+    @classmethod
+    def get_formats(cls):
+        return [output_format.value for output_format in cls]
@@ -1,6 +1,7 @@
 from argparse import ArgumentParser, REMAINDER
 
 from galaxy_swift.cli.enums import LogLevel
+from galaxy_swift.jsonrpc.codecs import get_available_codecs
 
 
 class RootParser(ArgumentParser):
@@ -26,6 +27,31 @@ class RootParser(ArgumentParser):
             nargs='?',
             help=f'Set the logging output level {levels_list}.',
         )
+        self.add_argument(
+            '--log-preview-size',
+            default=None,
+            dest='log_preview_size',
+            type=int,
+            help='Truncate logged JSON-RPC payloads to size characters.',
+            metavar='size',
+        )
+        self.add_argument(
+            '--log-sample-rate',
+            default=None,
+            dest='log_sample_rate',
+            type=int,
+            help='Log only every Nth JSON-RPC message.',
+            metavar='N',
+        )
+        codecs_list = tuple(get_available_codecs())
+        self.add_argument(
+            '-j', '--json-codec',
+            default=None,
+            dest='json_codec',
+            choices=codecs_list,
+            help=f'JSON codec (default: fastest installed) {codecs_list}.',
+            metavar='codec',
+        )
         self.add_argument(
             'args',
             nargs=REMAINDER,
@@ -19,6 +19,7 @@ Environment:
 Client methods:
   shutdown          -> plugin shutdown.
   get_capabilities  -> plugin capabilities.
+  stats             -> per method call metrics.
     """
     display_banner = True
 
@@ -0,0 +1,269 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.api.methods import GalaxyMethods
+from galaxy_swift.api.models import Response
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.jsonrpc.exceptions import JsonRpcError, RequestTimeout
+from galaxy_swift.paths import get_safe_filename
+
+log = logging.getLogger(__name__)
+
+
+def get_runtime_dir():
+    base = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.path.join(base, f'galaxy-swift-{os.getuid()}')
+
+
+def check_runtime_dir(path):
+    """Create runtime dir or verify existing one is private."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise GalaxySwiftError(f'Runtime path {path} is not a directory')
+    if info.st_uid != os.getuid():
+        raise GalaxySwiftError(f'Runtime dir {path} is owned by other user')
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise GalaxySwiftError(
+            f'Runtime dir {path} is accessible by other users '
+            f'(mode {stat.S_IMODE(info.st_mode):o})')
+
+
+def get_control_path(plugin_path, runtime_dir=None):
+    guid = plugin_path.get_manifest().guid
+    return os.path.join(
+        runtime_dir or get_runtime_dir(), get_safe_filename(guid) + '.sock')
+
+
+class SessionDaemon:
+    """Serves client stub calls on a unix control socket.
+
+    Every line is a JSON request: ``{"op": "call", "method", "params",
+    "timeout"}``, ``{"op": "status"}`` or ``{"op": "stop"}``. The daemon
+    stops after ``idle_timeout`` seconds without requests or once the
+    plugin disconnects.
+    """
+
+    check_interval = 1.0
+
+    def __init__(self, client, path, idle_timeout=None):
+        self.client = client
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.calls = 0
+        self.started = None
+        self.stopped = threading.Event()
+
+        self._active_calls = 0
+        self._writers = set()
+        self._last_activity = None
+        self._check_job = None
+
+    async def start(self):
+        check_runtime_dir(os.path.dirname(self.path))
+        if os.path.exists(self.path):
+            # stale socket of a dead daemon
+            os.remove(self.path)
+        self.server = await asyncio.start_unix_server(
+            self.handle_connection, path=self.path)
+        os.chmod(self.path, 0o600)
+
+        self.started = self._last_activity = time.monotonic()
+        self._check_job = self.client.add_periodic_job(
+            self.check, self.check_interval, name='daemon')
+        log.info("Daemon listening on %s", self.path)
+
+    def stop(self):
+        if self.stopped.is_set():
+            return
+        log.info("Stopping daemon")
+        self.server.close()
+        for writer in self._writers:
+            writer.close()
+        if self._check_job is not None:
+            self.client.scheduler.remove_job(self._check_job)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.stopped.set()
+
+    def check(self):
+        if not self.client.is_connected():
+            log.info("Plugin disconnected, stopping daemon")
+            self.stop()
+            return
+
+        idle_time = time.monotonic() - self._last_activity
+        if (
+                self.idle_timeout and not self._active_calls and
+                idle_time > self.idle_timeout
+        ):
+            log.info("Daemon idle for %.1f seconds", idle_time)
+            self.stop()
+
+    async def handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'exception': 'Invalid control request'}
+                else:
+                    response = await self.handle_request(request)
+                writer.write(
+                    json.dumps(response, default=str).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def handle_request(self, request):
+        self._last_activity = time.monotonic()
+        if not isinstance(request, dict):
+            return {'exception': 'Control request must be an object'}
+        op = request.get('op')
+        if op == 'call':
+            return await self.handle_call(request)
+        if op == 'status':
+            return {
+                'pid': os.getpid(),
+                'connected': self.client.is_connected(),
+                'calls': self.calls,
+                'uptime': time.monotonic() - self.started,
+            }
+        if op == 'stop':
+            self.client.loop.call_soon(self.stop)
+            return {'stopped': True}
+        return {'exception': f'Unknown control operation {op}'}
+
+    async def handle_call(self, request):
+        method = request.get('method')
+        params = request.get('params') or {}
+        timeout = request.get('timeout')
+        if not isinstance(method, str):
+            return {'exception': 'Call method must be a string'}
+        if not isinstance(params, dict):
+            return {'exception': 'Call params must be an object'}
+        if timeout is not None and (
+                isinstance(timeout, bool) or
+                not isinstance(timeout, (int, float))
+        ):
+            return {'exception': 'Call timeout must be a number'}
+
+        self.calls += 1
+        self._active_calls += 1
+        try:
+            response = await self.client.acall(
+                method, timeout=timeout, **params)
+        except RequestTimeout as exc:
+            return {'timeout': str(exc)}
+        except (ClientError, JsonRpcError) as exc:
+            return {'exception': str(exc)}
+        finally:
+            self._active_calls -= 1
+            self._last_activity = time.monotonic()
+        return {'result': response.result, 'error': response.error}
+
+
+class DaemonClient(GalaxyMethods):
+    """Blocking Galaxy API client of a session daemon.
+
+    Connecting and control requests time out after ``control_timeout``
+    seconds, so a wedged daemon is reported as not running.
+    """
+
+    control_timeout = 5.0
+
+    def __init__(self, path, timeout=None):
+        self.path = path
+        self.timeout = timeout
+
+        self._sock = None
+        self._file = None
+
+    @classmethod
+    def for_plugin(cls, plugin_path, runtime_dir=None, **kwargs):
+        return cls(get_control_path(plugin_path, runtime_dir), **kwargs)
+
+    def is_running(self):
+        try:
+            self.status()
+        except (OSError, ClientError):
+            self.close()
+            return False
+        return True
+
+    def request(self, **request):
+        return self._request(request, self.control_timeout)
+
+    def _request(self, request, timeout):
+        if self._file is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.control_timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._sock = sock
+            self._file = sock.makefile('rwb')
+        self._sock.settimeout(timeout)
+        try:
+            self._file.write(json.dumps(request).encode('utf-8') + b'\n')
+            self._file.flush()
+            line = self._file.readline()
+        except socket.timeout:
+            # connection is out of sync with a late response
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ClientError("Daemon closed connection")
+        return json.loads(line)
+
+    def call(self, method, *, timeout=None, **params):
+        log.info("Call %s", method)
+        timeout = self.timeout if timeout is None else timeout
+        request = {
+            'op': 'call', 'method': method, 'params': params,
+            'timeout': timeout,
+        }
+        # daemon times the call out itself, socket timeout is a fallback
+        socket_timeout = None
+        if timeout is not None:
+            socket_timeout = timeout + self.control_timeout
+        try:
+            response = self._request(request, socket_timeout)
+        except socket.timeout:
+            raise RequestTimeout(f'Daemon did not answer {method}')
+        if 'timeout' in response:
+            raise RequestTimeout(response['timeout'])
+        if 'exception' in response:
+            raise ClientError(response['exception'])
+        return Response(result=response['result'], error=response['error'])
+
+    def status(self):
+        return self.request(op='status')
+
+    def stop(self):
+        return self.request(op='stop')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._sock.close()
+        self._file = self._sock = None
@@ -0,0 +1,160 @@
+import importlib
+import importlib.util
+import json
+import os
+
+CODEC_ENV_VAR = 'GALAXY_SWIFT_JSON_CODEC'
+
+
+class BaseJsonCodec:
+    """Bytes in, bytes out JSON codec.
+
+    ``decode`` accepts raw frames as read from the transport (bytes,
+    bytearray or memoryview) and ``encode_line`` returns a newline
+    terminated frame ready to be written.
+    """
+
+    name = NotImplemented
+    # optional library imported on first instantiation
+    library = None
+    decode_errors = (ValueError, )
+
+    @classmethod
+    def is_available(cls):
+        if cls.library is None:
+            return True
+        return importlib.util.find_spec(cls.library) is not None
+
+    @classmethod
+    def import_library(cls):
+        return importlib.import_module(cls.library)
+
+    def decode(self, data):
+        raise NotImplementedError
+
+    def encode(self, obj):
+        raise NotImplementedError
+
+    def encode_line(self, obj):
+        return self.encode(obj) + b"\n"
+
+
+class StdlibJsonCodec(BaseJsonCodec):
+
+    name = 'json'
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(',', ':'))
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def encode(self, obj):
+        return self._encoder.encode(obj).encode('utf-8')
+
+
+class OrjsonCodec(BaseJsonCodec):
+
+    name = 'orjson'
+    library = 'orjson'
+
+    def __init__(self):
+        orjson = self.import_library()
+        self.decode_errors = (orjson.JSONDecodeError, )
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._line_option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+    def decode(self, data):
+        return self._loads(data)
+
+    def encode(self, obj):
+        return self._dumps(obj, option=self._option)
+
+    def encode_line(self, obj):
+        return self._dumps(obj, option=self._line_option)
+
+
+class MsgspecCodec(BaseJsonCodec):
+
+    name = 'msgspec'
+    library = 'msgspec'
+
+    def __init__(self):
+        msgspec = self.import_library()
+        self.decode_errors = (msgspec.DecodeError, )
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def decode(self, data):
+        return self._decoder.decode(data)
+
+    def encode(self, obj):
+        return self._encoder.encode(obj)
+
+    def encode_line(self, obj):
+        buf = bytearray()
+        self._encoder.encode_into(obj, buf)
+        buf += b"\n"
+        return bytes(buf)
+
+
+class UjsonCodec(BaseJsonCodec):
+
+    name = 'ujson'
+    library = 'ujson'
+
+    def __init__(self):
+        ujson = self.import_library()
+        self._loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def decode(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return self._loads(data)
+
+    def encode(self, obj):
+        return self._dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+# in order of preference
+CODECS = {
+    codec_cls.name: codec_cls
+    for codec_cls in (OrjsonCodec, MsgspecCodec, UjsonCodec, StdlibJsonCodec)
+}
+
+_default_codec_name = None
+
+
+def get_available_codecs():
+    return [
+        name for name, codec_cls in CODECS.items()
+        if codec_cls.is_available()
+    ]
+
+
+def set_default_codec(name):
+    global _default_codec_name
+    if name is not None and name not in get_available_codecs():
+        raise ValueError(f'JSON codec {name} is not available')
+    _default_codec_name = name
+
+
+def get_codec(name=None):
+    """Return codec instance by name, the default one or the fastest one
+    installed."""
+    name = name or _default_codec_name or os.environ.get(CODEC_ENV_VAR)
+    if name is None:
+        name = get_available_codecs()[0]
+
+    if name not in CODECS:
+        raise ValueError(f'Unknown JSON codec {name}')
+    codec_cls = CODECS[name]
+    if not codec_cls.is_available():
+        raise ValueError(f'JSON codec {name} is not available')
+    return codec_cls()
@@ -9,6 +9,10 @@ class ParseError(JsonRpcError):
     pass
 
 
+class RequestTimeout(JsonRpcError, TimeoutError):
+    pass
+
+
 @attr.s(frozen=True)
 class InvalidRequest(JsonRpcError):
     code = attr.ib(type=int)
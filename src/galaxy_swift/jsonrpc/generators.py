@@ -1,13 +1,18 @@
+import threading
+
+
 class SeqIdGenerator:
 
     def __init__(self, start=1, step=1):
         self.start = start
         self.step = step
+        self._lock = threading.Lock()
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        res = self.start
-        self.start += self.step
+        with self._lock:
+            res = self.start
+            self.start += self.step
         return res
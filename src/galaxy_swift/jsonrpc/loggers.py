@@ -0,0 +1,114 @@
+import itertools
+import logging
+import reprlib
+from collections.abc import Iterable
+
+ANONYMISED = '****'
+
+# mirrors ``sensitive_params`` of Galaxy plugin API methods and notifications
+SENSITIVE_PARAMS = {
+    'init_authentication': ['stored_credentials'],
+    'pass_login_credentials': ['cookies', 'credentials'],
+    'store_credentials': True,
+}
+
+
+def anonymise_sensitive_params(params, sensitive_params):
+    if not isinstance(params, dict):
+        return ANONYMISED if sensitive_params is True else params
+
+    if isinstance(sensitive_params, bool):
+        if sensitive_params:
+            return {k: ANONYMISED for k in params}
+        return params
+
+    if isinstance(sensitive_params, Iterable):
+        return {
+            k: ANONYMISED if k in sensitive_params else v
+            for k, v in params.items()
+        }
+
+    return params
+
+
+class MessagePreview:
+    """Size-capped string form of a message, built only when formatted."""
+
+    def __init__(self, message, size):
+        self.message = message
+        self.size = size
+
+    def __str__(self):
+        limits = reprlib.Repr()
+        limits.maxlevel = 4
+        limits.maxdict = limits.maxlist = 16
+        limits.maxstring = limits.maxother = self.size
+        text = limits.repr(self.message)
+        if len(text) > self.size:
+            return text[:self.size] + '...'
+        return text
+
+
+class ProtocolLogger:
+    """Logs JSON-RPC traffic with redacted, truncated payload previews.
+
+    Nothing is formatted unless ``level`` is enabled for ``logger``. With
+    ``sample_rate`` N only every Nth message in each direction is logged.
+    """
+
+    preview_size = 512
+    sample_rate = 1
+
+    def __init__(
+            self, logger, level=logging.DEBUG, preview_size=None,
+            sample_rate=None, sensitive_params=None,
+    ):
+        self.logger = logger
+        self.level = level
+        if preview_size is not None:
+            self.preview_size = preview_size
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self.sensitive_params = SENSITIVE_PARAMS.copy()
+        if sensitive_params is not None:
+            self.sensitive_params.update(sensitive_params)
+
+        self._sent_counter = itertools.count()
+        self._received_counter = itertools.count()
+
+    @classmethod
+    def set_defaults(cls, preview_size=None, sample_rate=None):
+        if preview_size is not None:
+            cls.preview_size = preview_size
+        if sample_rate is not None:
+            cls.sample_rate = sample_rate
+
+    def is_enabled(self):
+        return self.logger.isEnabledFor(self.level)
+
+    def sent(self, message, peer=None):
+        if not self._sampled(self._sent_counter):
+            return
+        self.logger.log(
+            self.level, "Sent to %s: %s", peer, self.preview(message))
+
+    def received(self, message, peer=None):
+        if not self._sampled(self._received_counter):
+            return
+        self.logger.log(
+            self.level, "Received from %s: %s", peer, self.preview(message))
+
+    def preview(self, message):
+        method = message.get('method')
+        sensitive_params = self.sensitive_params.get(method, False)
+        if sensitive_params and 'params' in message:
+            message = dict(message, params=anonymise_sensitive_params(
+                message['params'], sensitive_params))
+        return MessagePreview(message, self.preview_size)
+
+    def _sampled(self, counter):
+        # count messages even when disabled to keep sampling stable
+        index = next(counter)
+        if not self.is_enabled():
+            return False
+        return index % self.sample_rate == 0
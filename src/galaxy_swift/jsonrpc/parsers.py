@@ -1,18 +1,40 @@
-import json
-
+from galaxy_swift.jsonrpc.codecs import get_codec
 from galaxy_swift.jsonrpc.exceptions import InvalidRequest, ParseError
 
 
 class JsonRpcParser:
 
+    def __init__(self, codec=None):
+        self.codec = codec or get_codec()
+
     def parse(self, data):
         try:
-            jsonrpc_request = json.loads(data, encoding="utf-8")
-            if jsonrpc_request.get("jsonrpc") != "2.0":
-                raise InvalidRequest()
-            del jsonrpc_request["jsonrpc"]
-            return jsonrpc_request
-        except json.JSONDecodeError:
+            jsonrpc_data = self.codec.decode(data)
+        except self.codec.decode_errors:
             raise ParseError()
-        except TypeError:
-            raise InvalidRequest()
+
+        # batch
+        if isinstance(jsonrpc_data, list):
+            return list(map(self._parse_batch_message, jsonrpc_data))
+
+        return self._parse_message(jsonrpc_data)
+
+    def _parse_batch_message(self, jsonrpc_message):
+        """Parse batch element, malformed ones are returned as errors.
+
+        One malformed element does not fail the rest of the batch.
+        """
+        try:
+            return self._parse_message(jsonrpc_message)
+        except InvalidRequest as exc:
+            return exc
+
+    def _parse_message(self, jsonrpc_message):
+        if not isinstance(jsonrpc_message, dict):
+            raise InvalidRequest(-32600, "Invalid Request")
+        if jsonrpc_message.get("jsonrpc") != "2.0":
+            # id of offending message, if any
+            raise InvalidRequest(
+                -32600, "Invalid Request", jsonrpc_message.get("id"))
+        del jsonrpc_message["jsonrpc"]
+        return jsonrpc_message
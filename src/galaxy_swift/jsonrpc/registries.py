@@ -0,0 +1,118 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+from galaxy_swift.jsonrpc.timers import get_timer_heap
+
+
+class PendingRequestRegistry:
+    """Table of in-flight requests keyed by JSON-RPC id.
+
+    Every registered id is mapped to a future that is resolved when the
+    response carrying the same id arrives, so many requests can share one
+    connection regardless of the order in which the plugin answers them.
+
+    Requests registered with a deadline are rejected with RequestTimeout
+    once it passes. Ids of timed out and cancelled requests are remembered
+    (up to ``abandoned_size``) so their late responses are counted and
+    dropped instead of being reported as unknown.
+    """
+
+    abandoned_size = 1024
+
+    def __init__(self, timer_heap=None):
+        self.timer_heap = timer_heap or get_timer_heap()
+        self.timeouts = 0
+        self.late_responses = 0
+
+        self._futures = {}
+        self._abandoned = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._futures)
+
+    def __contains__(self, request_id):
+        return request_id in self._futures
+
+    def register(self, request_id, deadline=None):
+        future = Future()
+        with self._lock:
+            if request_id in self._futures:
+                raise KeyError(f'Request {request_id} already pending')
+            self._futures[request_id] = future
+
+        if deadline is not None:
+            timer = self.timer_heap.schedule(
+                deadline, lambda: self.expire(request_id))
+            future.add_done_callback(lambda f: timer.cancel())
+        future.add_done_callback(
+            lambda f: f.cancelled() and self.abandon(request_id))
+        return future
+
+    def discard(self, request_id):
+        with self._lock:
+            return self._futures.pop(request_id, None)
+
+    def abandon(self, request_id):
+        """Forget request whose response is not awaited anymore."""
+        with self._lock:
+            future = self._futures.pop(request_id, None)
+            self._abandoned[request_id] = None
+            while len(self._abandoned) > self.abandoned_size:
+                self._abandoned.popitem(last=False)
+        return future
+
+    def expire(self, request_id):
+        future = self.abandon(request_id)
+        if future is None or future.done():
+            return False
+        self.timeouts += 1
+        future.set_exception(
+            RequestTimeout(f'Request {request_id} timed out'))
+        return True
+
+    def resolve(self, request_id, response):
+        """Resolve request future.
+
+        Returns False if no request with given id was ever pending.
+        """
+        future = self.discard(request_id)
+        if future is None:
+            with self._lock:
+                if request_id not in self._abandoned:
+                    return False
+                del self._abandoned[request_id]
+            self.late_responses += 1
+            return True
+        if not future.done():
+            future.set_result(response)
+        return True
+
+    def reject(self, request_id, exc):
+        future = self.discard(request_id)
+        if future is None:
+            return False
+        if not future.done():
+            future.set_exception(exc)
+        return True
+
+    def reject_all(self, exc):
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for future in futures:
+            if not future.done():
+                future.set_exception(exc)
+        return len(futures)
+
+    @staticmethod
+    def get_deadline(timeout=None, deadline=None):
+        """Return earliest of relative timeout and absolute deadline."""
+        if timeout is not None:
+            timeout_deadline = time.monotonic() + timeout
+            if deadline is None or timeout_deadline < deadline:
+                return timeout_deadline
+        return deadline
@@ -0,0 +1,118 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class Timer:
+
+    __slots__ = ('deadline', 'callback', 'cancelled', 'heap')
+
+    def __init__(self, deadline, callback, heap=None):
+        self.deadline = deadline
+        self.callback = callback
+        self.cancelled = False
+        # heap holding the timer, None once popped
+        self.heap = heap
+
+    def cancel(self):
+        if self.heap is None:
+            self.cancelled = True
+            return
+        self.heap.cancel(self)
+
+
+class TimerHeap(threading.Thread):
+    """Fires callbacks at monotonic deadlines from a single thread.
+
+    All timers share one heap and one sleeping thread no matter how many
+    are scheduled. Cancelled timers are dropped lazily when they surface,
+    or all at once when they make up more than half of the heap.
+    Callbacks run in the timer thread and must be quick and thread-safe.
+    """
+
+    # smaller heaps are not worth rebuilding
+    min_compact_size = 100
+
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True, name='TimerHeap')
+        self.cancelled = 0
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, deadline, callback):
+        timer = Timer(deadline, callback, heap=self)
+        with self._cond:
+            heapq.heappush(self._heap, (deadline, next(self._counter), timer))
+            # wake up only when the earliest deadline changed
+            if self._heap[0][2] is timer:
+                self._cond.notify()
+        return timer
+
+    def cancel(self, timer):
+        with self._cond:
+            if timer.cancelled:
+                return
+            timer.cancelled = True
+            if timer.heap is None:
+                # already popped
+                return
+            self.cancelled += 1
+            if (len(self._heap) >= self.min_compact_size and
+                    self.cancelled * 2 > len(self._heap)):
+                self._compact()
+
+    def _compact(self):
+        heap = []
+        for entry in self._heap:
+            if entry[2].cancelled:
+                entry[2].heap = None
+            else:
+                heap.append(entry)
+        heapq.heapify(heap)
+        self._heap = heap
+        self.cancelled = 0
+
+    def call_later(self, delay, callback):
+        return self.schedule(time.monotonic() + delay, callback)
+
+    def run(self):
+        while True:
+            expired = []
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                now = time.monotonic()
+                while self._heap and (
+                        self._heap[0][0] <= now or self._heap[0][2].cancelled):
+                    timer = heapq.heappop(self._heap)[2]
+                    timer.heap = None
+                    if timer.cancelled:
+                        self.cancelled -= 1
+                    expired.append(timer)
+                if not expired:
+                    self._cond.wait(self._heap[0][0] - now)
+                    continue
+
+            for timer in expired:
+                if not timer.cancelled:
+                    timer.callback()
+
+
+_timer_heap = None
+_timer_heap_lock = threading.Lock()
+
+
+def get_timer_heap():
+    """Return process wide timer heap, starting it on first use."""
+    global _timer_heap
+    with _timer_heap_lock:
+        if _timer_heap is None:
+            _timer_heap = TimerHeap()
+            _timer_heap.start()
+        return _timer_heap
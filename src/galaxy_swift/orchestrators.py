@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import subprocess
+import time
+
+from galaxy_swift.api.clients import GalaxyAsyncClientStub
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.paths import PluginPath
+from galaxy_swift.runners import AsyncPluginProcess
+from galaxy_swift.teardowns import PluginTeardown
+from galaxy_swift.tokens.generators import UUIDTokenGenerator
+from galaxy_swift.types import MethodResult, SessionResult
+from galaxy_swift.zygotes import PluginZygote
+
+log = logging.getLogger(__name__)
+
+
+class PluginOrchestrator:
+    """Runs a method set against many plugins from a single event loop.
+
+    Every session gets its own client stub on an ephemeral port and its
+    own plugin subprocess; at most ``concurrency`` sessions run at once.
+    With ``zygote`` set sessions of every plugin directory are forked from
+    a single warm plugin interpreter.
+    """
+
+    def __init__(
+            self, plugin_dirs, methods, concurrency=4, timeout=None,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            zygote=False,
+    ):
+        self.plugin_paths = list(map(PluginPath, plugin_dirs))
+        self.methods = methods
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.stdout = stdout
+        self.stderr = stderr
+        self.zygote = zygote
+
+        self.zygotes = {}
+        self._zygote_starts = {}
+
+    def run(self):
+        return asyncio.run(self.arun())
+
+    async def arun(self):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_limited(plugin_path):
+            async with semaphore:
+                return await self.run_session(plugin_path)
+
+        try:
+            return await asyncio.gather(*map(run_limited, self.plugin_paths))
+        finally:
+            for zygote in self.zygotes.values():
+                zygote.close()
+            self.zygotes = {}
+            self._zygote_starts = {}
+
+    async def get_zygote(self, plugin_path):
+        """Return started zygote of plugin directory or None."""
+        if not self.zygote:
+            return None
+
+        key = plugin_path.resolve()
+        if key not in self.zygotes:
+            zygote = PluginZygote(
+                plugin_path, stdout=self.stdout, stderr=self.stderr)
+            # start blocks until plugin imports are done
+            started = asyncio.get_running_loop().run_in_executor(
+                None, zygote.start)
+            self.zygotes[key] = zygote
+            self._zygote_starts[key] = started
+
+        try:
+            # sessions of the same plugin wait for a single start
+            await asyncio.shield(self._zygote_starts[key])
+        except GalaxySwiftError as exc:
+            log.warning("Plugin zygote failed to start: %s", exc)
+        return self.zygotes[key]
+
+    async def run_session(self, plugin_path):
+        log.info("Starting %s plugin session", plugin_path)
+        result = SessionResult(str(plugin_path))
+        start = time.monotonic()
+
+        token = UUIDTokenGenerator().generate()
+        listening = asyncio.Event()
+        connected = asyncio.Event()
+        client = GalaxyAsyncClientStub(
+            token, 0,
+            listening_cb=listening.set, connected_cb=connected.set,
+            tick_interval=0,
+        )
+        client.call_timeout = self.timeout
+        client_task = asyncio.create_task(client.run())
+        process = None
+        try:
+            manifest = plugin_path.get_manifest()
+            result.name = manifest.name
+
+            await self.wait_listening(listening, client_task)
+            process = AsyncPluginProcess(
+                plugin_path, token, client.port,
+                stdout=self.stdout, stderr=self.stderr,
+                zygote=await self.get_zygote(plugin_path),
+            )
+            await process.start()
+            await self.wait_connected(connected, process)
+            result.connect_time = time.monotonic() - start
+
+            for method in self.methods:
+                result.methods.append(await self.call(client, method))
+        except asyncio.TimeoutError:
+            result.error = (
+                f'Plugin did not connect within {self.timeout} seconds')
+        except Exception as exc:
+            log.exception("Plugin %s session failed", plugin_path)
+            result.error = str(exc) or exc.__class__.__name__
+        finally:
+            teardown = await PluginTeardown(client, process).run()
+            result.teardown_time = teardown.total_time
+            client.terminate()
+            try:
+                await client_task
+            except Exception as exc:
+                # must not abort sessions of other plugins
+                log.exception("Plugin %s client failed", plugin_path)
+                error = str(exc) or exc.__class__.__name__
+                result.error = result.error or f'Client failed: {error}'
+
+        result.total_time = time.monotonic() - start
+        log.info("Finished %s plugin session", plugin_path)
+        return result
+
+    async def wait_listening(self, listening, client_task):
+        waiting = asyncio.create_task(listening.wait())
+        try:
+            # client failing to listen fails the session right away
+            await asyncio.wait(
+                [waiting, client_task], timeout=self.timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            waiting.cancel()
+
+        if listening.is_set():
+            return
+        if client_task.done():
+            raise GalaxySwiftError(
+                f'Client failed to listen: {client_task.exception()}')
+        raise GalaxySwiftError(
+            f'Client did not listen within {self.timeout} seconds')
+
+    async def wait_connected(self, connected, process):
+        connecting = asyncio.create_task(connected.wait())
+        try:
+            # plugin crashing on start fails the session right away
+            await asyncio.wait(
+                [connecting, process.exited], timeout=self.timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            connecting.cancel()
+
+        if connected.is_set():
+            return
+        if process.exited.done():
+            raise GalaxySwiftError(
+                f'Plugin exited with status code {process.returncode}')
+        raise asyncio.TimeoutError
+
+    async def call(self, client, method):
+        start = time.monotonic()
+        try:
+            response = await client.acall(method)
+        except Exception as exc:
+            return MethodResult(
+                method, time.monotonic() - start,
+                error=str(exc) or exc.__class__.__name__,
+            )
+        return MethodResult(
+            method, time.monotonic() - start,
+            result=response.result, error=response.error or None,
+        )
@@ -1,3 +1,4 @@
+import re
 from json import loads
 from pathlib import PosixPath as Path
 
@@ -5,6 +6,11 @@ from galaxy_swift.exceptions import InvalidPlugin
 from galaxy_swift.types import Manifest
 
 
+def get_safe_filename(name):
+    """Replace characters not allowed in file names (e.g. of GUIDs)."""
+    return re.sub(r'[^\w.-]', '_', name)
+
+
 class PluginPath(Path):
 
     MANIFEST_FILENAME = 'manifest.json'
@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import concurrent.futures
+import json
+import logging
+
+from galaxy_swift.api.recorders import IN, OUT
+
+log = logging.getLogger(__name__)
+
+
+def iter_messages(message):
+    return message if isinstance(message, list) else [message]
+
+
+class ReplayPlugin:
+    """Fake plugin answering client requests from a recording.
+
+    Responses are matched by method in recorded order, get the id of the
+    actual request and are delayed by the recorded latency. Recorded
+    notifications are pushed at their original offsets from connection.
+    All delays are divided by ``speed`` (no delays when ``speed`` is 0).
+    """
+
+    def __init__(self, entries, speed=1.0):
+        self.speed = speed
+        self.responses = collections.defaultdict(collections.deque)
+        self.notifications = []
+        self.unanswered = 0
+
+        requests = {}
+        first_offset = None
+        for offset, direction, message, _ in entries:
+            if first_offset is None:
+                first_offset = offset
+            for item in iter_messages(message):
+                if direction == OUT and 'id' in item:
+                    requests[item['id']] = (item['method'], offset)
+                elif direction == IN and 'id' not in item:
+                    self.notifications.append((offset - first_offset, item))
+                elif direction == IN and item['id'] in requests:
+                    method, start = requests.pop(item['id'])
+                    self.responses[method].append((offset - start, item))
+
+    async def connect(self, host='127.0.0.1', port=None, path=None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        await self.run(reader, writer)
+
+    async def run(self, reader, writer):
+        notifier = asyncio.create_task(self._notify(writer))
+        replies = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                requests = iter_messages(json.loads(line))
+                for request in requests:
+                    if 'id' not in request:
+                        continue
+                    reply = asyncio.create_task(self._reply(writer, request))
+                    replies.add(reply)
+                    reply.add_done_callback(replies.discard)
+                if any(request.get('method') == 'shutdown'
+                       for request in requests):
+                    # like Galaxy plugins, disconnect once shutdown answered
+                    await asyncio.wait(replies)
+                    break
+        finally:
+            notifier.cancel()
+            for reply in list(replies):
+                reply.cancel()
+            writer.close()
+
+    async def _reply(self, writer, request):
+        recorded = self.responses.get(request['method'])
+        if not recorded:
+            self.unanswered += 1
+            response = {
+                'jsonrpc': '2.0', 'id': request['id'],
+                'error': {'code': -32601, 'message': 'Method not found'},
+            }
+        else:
+            latency, response = recorded.popleft()
+            response = dict(response, id=request['id'])
+            if self.speed:
+                await asyncio.sleep(latency / self.speed)
+        try:
+            self._write(writer, response)
+            await writer.drain()
+        except ConnectionError:
+            log.debug("Client disconnected before %s reply", request['method'])
+
+    async def _notify(self, writer):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            for offset, notification in self.notifications:
+                if self.speed:
+                    delay = start + offset / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                self._write(writer, notification)
+                await writer.drain()
+        except ConnectionError:
+            log.debug("Client disconnected before notifications replayed")
+
+    @staticmethod
+    def _write(writer, message):
+        message = dict(message, jsonrpc='2.0')
+        writer.write(json.dumps(message).encode('utf-8') + b'\n')
+
+
+class ReplayPluginRunner:
+    """Runs ``ReplayPlugin`` in the event loop of a client stub runner.
+
+    Drop-in for ``AsyncPluginRunner`` when no plugin should be started.
+    """
+
+    # nothing to signal at teardown
+    process = None
+
+    def __init__(self, client_runner, plugin):
+        self.client_runner = client_runner
+        self.plugin = plugin
+        self.port = None
+        self.path = None
+        self.future = None
+
+    @property
+    def loop(self):
+        return self.client_runner.client.loop
+
+    def bind(self, plugin_path, token, port, path=None):
+        log.info("Binding replay plugin on %s", path or f'port {port}')
+        self.port = port
+        self.path = path
+
+    def start(self):
+        self.future = asyncio.run_coroutine_threadsafe(
+            self.plugin.connect(port=self.port, path=self.path), self.loop)
+
+    def join(self, timeout=None):
+        if self.future is None:
+            return None
+        try:
+            self.future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            return None
+        return 0
+
+    def terminate(self):
+        if self.future is not None:
+            self.future.cancel()
+
+
+class ReplayClient:
+    """Re-sends recorded client requests to a plugin through a client stub.
+
+    Requests are sent at their recorded offsets divided by ``speed`` (all
+    at once when ``speed`` is 0) without waiting for earlier responses.
+    Timings end up in the client metrics.
+    """
+
+    def __init__(self, client, entries, speed=1.0):
+        self.client = client
+        self.speed = speed
+        self.requests = []
+        self.skipped = 0
+
+        first_offset = None
+        for offset, direction, message, _ in entries:
+            if first_offset is None:
+                first_offset = offset
+            if direction != OUT:
+                continue
+            for item in iter_messages(message):
+                if 'id' not in item:
+                    # client notifications are not replayed
+                    self.skipped += 1
+                    continue
+                self.requests.append((offset - first_offset, item))
+
+    def run(self):
+        future = asyncio.run_coroutine_threadsafe(
+            self.arun(), self.client.loop)
+        return future.result()
+
+    async def arun(self):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        calls = []
+        for offset, request in self.requests:
+            if self.speed:
+                delay = start + offset / self.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            calls.append(asyncio.create_task(self.client.acall(
+                request['method'], **(request.get('params') or {}))))
+
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for (_, request), result in zip(self.requests, results):
+            if isinstance(result, Exception):
+                log.error("Replayed %s failed: %s", request['method'], result)
+        return self.client.metrics
@@ -1,67 +1,435 @@
 import asyncio
+import concurrent.futures
+import cProfile
 import logging
+import os
+import runpy
+import socket
 import subprocess
+import sys
 import threading
 
 from galaxy_swift.api.clients import GalaxyClientStub, GalaxyAsyncClientStub
 from galaxy_swift.exceptions import GalaxySwiftError
 from galaxy_swift.paths import PluginPath
+from galaxy_swift.shims import PLACEHOLDER_PORT
 
 log = logging.getLogger(__name__)
 
 
+def get_plugin_args(manifest, token, port, path=None):
+    if path is not None:
+        return [
+            sys.executable, '-m', 'galaxy_swift.shims',
+            path, manifest.script, token,
+        ]
+    return [sys.executable, manifest.script, token, str(port)]
+
+
 class PluginSubprocessRunner(threading.Thread):
 
-    def __init__(self, stdout=None, stderr=None):
+    def __init__(self, stdout=None, stderr=None, zygote=None, exit_cb=None):
         threading.Thread.__init__(self)
         self.stdout = stdout
         self.stderr = stderr
+        # forks plugin from a warm interpreter when set
+        self.zygote = zygote
+        # called with status code from the runner thread
+        self.exit_cb = exit_cb
 
         self.proc = None
+        self.returncode = None
 
         self.plugin_path = None
         self.token = None
         self.port = None
+        self.path = None
 
-    def bind(self, plugin_path: PluginPath, token: str, port: str):
+    def bind(
+            self, plugin_path: PluginPath, token: str, port: str,
+            path: str = None,
+    ):
         log.info(
-            "Binding %s plugin directory on port %s with token %s",
-            plugin_path, port, token,
+            "Binding %s plugin directory on %s with token %s",
+            plugin_path, path or f'port {port}', token,
         )
         self.plugin_path = plugin_path
         self.token = token
         self.port = port
+        self.path = path
+
+    def get_args(self, manifest):
+        return get_plugin_args(manifest, self.token, self.port, path=self.path)
 
     def run(self):
         log.info("Starting %s plugin directory", self.plugin_path)
         if self.plugin_path is None:
             raise RuntimeError("runner.bind() not called")
 
+        self.proc = self.fork() or self.spawn()
+        statuscode = self.proc.wait()
+        self.on_exit(statuscode)
+
+        # return proc
+
+    def fork(self):
+        if self.zygote is None or not self.zygote.can_spawn(self.plugin_path):
+            return None
+
+        try:
+            return self.zygote.spawn(self.token, self.port, path=self.path)
+        except (OSError, GalaxySwiftError) as exc:
+            log.warning("Zygote fork failed, spawning plugin: %s", exc)
+            return None
+
+    def spawn(self):
         manifest = self.plugin_path.get_manifest()
 
         # TODO: add plugin dir to pythonpath
-        self.proc = subprocess.Popen(
-            ['python', manifest.script, self.token, self.port],
+        return subprocess.Popen(
+            self.get_args(manifest),
             cwd=self.plugin_path,
             stdout=self.stdout, stderr=self.stderr,
             text=True,
         )
-        statuscode = self.proc.wait()
-        self.on_exit(statuscode)
-
-        # return proc
 
     def on_exit(self, statuscode):
+        self.returncode = statuscode
         if statuscode > 0:
-            raise GalaxySwiftError(
-                f'Error while running plugin. Status code: {statuscode}')
-        log.info("Plugin stopped")
+            # raising would only end this thread, nobody joins it
+            log.error("Plugin exited with status code %s", statuscode)
+        else:
+            log.info("Plugin stopped")
+        if self.exit_cb is not None:
+            self.exit_cb(statuscode)
 
     def terminate(self):
         log.info("Terminating plugin")
+        if self.proc is None:
+            return
         self.proc.terminate()
 
 
+class AsyncPluginProcess:
+    """Plugin subprocess managed by the running event loop.
+
+    Piped stdout and stderr are read as async streams and every line is
+    passed to ``output_cb(name, line)``. ``exited`` future resolves with
+    the exit status. With ``zygote`` the plugin is forked from its warm
+    interpreter and writes to the zygote stdout and stderr instead.
+    """
+
+    # output lines longer than that are passed in parts
+    max_line_size = 64 * 1024
+
+    def __init__(
+            self, plugin_path, token, port, path=None,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, output_cb=None,
+            zygote=None,
+    ):
+        self.plugin_path = plugin_path
+        self.token = token
+        self.port = port
+        self.path = path
+        self.stdout = stdout
+        self.stderr = stderr
+        self.output_cb = output_cb or self.log_output
+        self.zygote = zygote
+
+        self.proc = None
+        self.exited = None
+        self._task = None
+
+    @property
+    def returncode(self):
+        if self.proc is None:
+            return None
+        return self.proc.returncode
+
+    async def start(self):
+        log.info("Starting %s plugin directory", self.plugin_path)
+        manifest = self.plugin_path.get_manifest()
+        self.exited = asyncio.get_running_loop().create_future()
+        self.proc = await self.fork()
+        if self.proc is None:
+            self.proc = await asyncio.create_subprocess_exec(
+                *get_plugin_args(
+                    manifest, self.token, self.port, path=self.path),
+                cwd=self.plugin_path, stdout=self.stdout, stderr=self.stderr,
+            )
+        self._task = asyncio.create_task(self._watch())
+
+    async def fork(self):
+        if self.zygote is None or not self.zygote.can_spawn(self.plugin_path):
+            return None
+
+        try:
+            return await self.zygote.aspawn(
+                self.token, self.port, path=self.path)
+        except (OSError, GalaxySwiftError) as exc:
+            log.warning("Zygote fork failed, spawning plugin: %s", exc)
+            return None
+
+    async def wait(self):
+        return await asyncio.shield(self.exited)
+
+    def terminate(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.terminate()
+
+    def kill(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+
+    def log_output(self, name, line):
+        log.info("Plugin %s: %s", name, line.rstrip())
+
+    async def _watch(self):
+        try:
+            await asyncio.gather(
+                self._read_stream('stdout', self.proc.stdout),
+                self._read_stream('stderr', self.proc.stderr),
+            )
+        finally:
+            # reader failure must not swallow the exit status
+            statuscode = await self.proc.wait()
+            if statuscode > 0:
+                log.error("Plugin exited with status code %s", statuscode)
+            else:
+                log.info("Plugin stopped")
+            self.exited.set_result(statuscode)
+
+    async def _read_stream(self, name, stream):
+        # StreamReader.readline() fails on lines over its limit, so the
+        # stream is read in chunks and longer lines are passed in parts
+        if stream is None:
+            return
+        buffer = b''
+        while True:
+            chunk = await stream.read(self.max_line_size)
+            if not chunk:
+                break
+            *lines, buffer = (buffer + chunk).split(b'\n')
+            for line in lines:
+                self._output(name, line + b'\n')
+            if len(buffer) >= self.max_line_size:
+                self._output(name, buffer)
+                buffer = b''
+        if buffer:
+            self._output(name, buffer)
+
+    def _output(self, name, line):
+        try:
+            self.output_cb(name, line.decode('utf-8', errors='replace'))
+        except Exception:
+            # keep draining the pipe so the plugin never blocks on write
+            log.exception("Unexpected exception raised in output callback")
+
+
+class AsyncPluginRunner:
+    """Runs plugin subprocess in the event loop of a client stub runner.
+
+    Drop-in for ``PluginSubprocessRunner`` without a thread per plugin.
+    """
+
+    terminate_timeout = 5
+
+    def __init__(
+            self, client_runner, stdout=None, stderr=None, zygote=None,
+            exit_cb=None,
+    ):
+        self.client_runner = client_runner
+        self.stdout = stdout
+        self.stderr = stderr
+        # forks plugin from a warm interpreter when set
+        self.zygote = zygote
+        # called with status code from the client loop thread
+        self.exit_cb = exit_cb
+
+        self.process = None
+
+    @property
+    def returncode(self):
+        return self.process and self.process.returncode
+
+    @property
+    def proc(self):
+        return self.process and self.process.proc
+
+    @property
+    def loop(self):
+        return self.client_runner.client.loop
+
+    def bind(
+            self, plugin_path: PluginPath, token: str, port: str,
+            path: str = None,
+    ):
+        log.info(
+            "Binding %s plugin directory on %s with token %s",
+            plugin_path, path or f'port {port}', token,
+        )
+        self.process = AsyncPluginProcess(
+            plugin_path, token, port, path=path, output_cb=self.write_output,
+            zygote=self.zygote,
+        )
+
+    def start(self):
+        if self.process is None:
+            raise RuntimeError("runner.bind() not called")
+        asyncio.run_coroutine_threadsafe(self._start(), self.loop).result()
+
+    async def _start(self):
+        await self.process.start()
+        self.process.exited.add_done_callback(self.on_exit)
+
+    def on_exit(self, exited):
+        if self.exit_cb is not None:
+            self.exit_cb(exited.result())
+
+    def write_output(self, name, line):
+        stream = self.stdout if name == 'stdout' else self.stderr
+        if stream is None:
+            self.process.log_output(name, line)
+            return
+        stream.write(line)
+
+    def join(self, timeout=None):
+        if self.process is None or self.process.exited is None:
+            return None
+        future = asyncio.run_coroutine_threadsafe(
+            self.process.wait(), self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            return None
+
+    def terminate(self):
+        log.info("Terminating plugin")
+        if self.process is None or self.process.exited is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._terminate(), self.loop)
+        future.result()
+
+    async def _terminate(self):
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(
+                self.process.wait(), self.terminate_timeout)
+        except asyncio.TimeoutError:
+            log.warning("Plugin did not terminate, killing it")
+            self.process.kill()
+            await self.process.wait()
+
+
+class InProcessPluginRunner(threading.Thread):
+    """Runs plugin script in a thread of this process.
+
+    The plugin connects through a socketpair, pass ``client_sock`` to the
+    client stub. ``sys.argv`` and ``asyncio.open_connection`` are replaced
+    while the plugin starts, so in-process plugins start one at a time.
+    Plugin code runs under the caller coverage tracer and, with
+    ``profile``, under its own profiler.
+    """
+
+    # serializes process wide patches of plugins starting
+    start_lock = threading.Lock()
+
+    def __init__(self, profile=False):
+        threading.Thread.__init__(self, daemon=True)
+        self.profiler = cProfile.Profile() if profile else None
+        self.client_sock, self.plugin_sock = socket.socketpair()
+
+        self.returncode = None
+        self.error = None
+
+        self.plugin_path = None
+        self.token = None
+        self.port = None
+        self.path = None
+
+        self._restore = None
+
+    def bind(
+            self, plugin_path: PluginPath, token: str, port: str = None,
+            path: str = None,
+    ):
+        log.info(
+            "Binding %s plugin directory in process with token %s",
+            plugin_path, token,
+        )
+        self.plugin_path = plugin_path
+        self.token = token
+        self.port = port
+        self.path = path
+
+    def run(self):
+        log.info("Starting %s plugin directory in process", self.plugin_path)
+        if self.plugin_path is None:
+            raise RuntimeError("runner.bind() not called")
+
+        manifest = self.plugin_path.get_manifest()
+        script = os.path.join(
+            os.path.abspath(self.plugin_path), manifest.script)
+
+        self.start_lock.acquire()
+        self.patch(script)
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            runpy.run_path(script, run_name='__main__')
+            self.returncode = 0
+        except SystemExit as exc:
+            self.returncode = exc.code if isinstance(exc.code, int) else 1
+        except BaseException as exc:
+            log.exception("Plugin raised unexpected exception")
+            self.error = exc
+            self.returncode = 1
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
+            self.unpatch()
+            self.plugin_sock.close()
+        log.info("Plugin stopped with status code %s", self.returncode)
+
+    def patch(self, script):
+        plugin_dir = os.path.dirname(script)
+        if plugin_dir not in sys.path:
+            sys.path.insert(0, plugin_dir)
+
+        argv = sys.argv
+        open_connection = asyncio.open_connection
+
+        async def open_plugin_connection(host=None, port=None, **kwargs):
+            # plugin read its arguments by now
+            self.unpatch()
+            return await open_connection(sock=self.plugin_sock, **kwargs)
+
+        def restore():
+            sys.argv = argv
+            asyncio.open_connection = open_connection
+            self.start_lock.release()
+
+        self._restore = restore
+        sys.argv = [script, self.token, PLACEHOLDER_PORT]
+        asyncio.open_connection = open_plugin_connection
+
+    def unpatch(self):
+        restore, self._restore = self._restore, None
+        if restore is not None:
+            restore()
+
+    def dump_stats(self, path):
+        self.profiler.dump_stats(path)
+
+    def terminate(self):
+        log.info("Terminating plugin")
+        try:
+            # plugin sees EOF and shuts down
+            self.plugin_sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
 class ClientStubRunner(threading.Thread):
 
     def __init__(self):
@@ -100,14 +468,29 @@ class AsyncClientStubRunner(threading.Thread):
 
         self.port = None
         self.token = None
+        self.path = None
+        self.sock = None
+        self.client_kwargs = {}
+        # exception the client stopped with
+        self.error = None
 
         self._loop = None
+        self._listening = threading.Event()
         self._connected = threading.Event()
 
-    def bind(self, token: str, port: int, loop=None):
-        log.info("Binding client on %s port with %s token", port, token)
-        self.port = int(port)
+    def bind(
+            self, token: str, port: int, loop=None, path=None, sock=None,
+            **client_kwargs,
+    ):
+        log.info(
+            "Binding client on %s with %s token",
+            path or sock or f'{port} port', token,
+        )
+        self.port = port if port is None else int(port)
         self.token = token
+        self.path = path
+        self.sock = sock
+        self.client_kwargs = client_kwargs
 
         self._loop = loop
 
@@ -116,17 +499,43 @@ class AsyncClientStubRunner(threading.Thread):
         self.client = GalaxyAsyncClientStub(
             self.token, self.port,
             connected_cb=self._connected_cb,
+            listening_cb=self._listening_cb,
+            path=self.path, sock=self.sock,
+            **self.client_kwargs,
         )
-        asyncio.run(self.client.run())
+        try:
+            asyncio.run(self.client.run())
+        except Exception as exc:
+            log.error("Client failed: %s", exc)
+            self.error = exc
+            # wake up waiters so they see the error
+            self._listening.set()
+            self._connected.set()
+
+    def _listening_cb(self):
+        # actual port when bound to port 0
+        self.port = self.client.port
+        self._listening.set()
 
     def _connected_cb(self):
         self._connected.set()
 
-    def wait(self, timeout=None):
-        self._connected.wait(timeout)
+    def wait_listening(self, timeout=None):
+        """Wait until client listens, raise error it failed with."""
+        listening = self._listening.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return listening
 
-    def execute(self, method, *args):
-        return self.client.call(method, *args)
+    def wait(self, timeout=None):
+        """Wait until plugin connects, raise error client failed with."""
+        connected = self._connected.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return connected
+
+    def execute(self, method, timeout=None, **params):
+        return self.client.call(method, timeout=timeout, **params)
 
     def terminate(self):
         log.info("Terminating client")
@@ -0,0 +1,41 @@
+"""Run a Galaxy plugin script connected to the client over a Unix socket.
+
+Galaxy plugins always connect with ``asyncio.open_connection`` to the TCP
+port given on the command line. The shim redirects that connection to a
+Unix domain socket and runs the plugin script as ``__main__``.
+
+Usage: python -m galaxy_swift.shims SOCKET_PATH SCRIPT TOKEN
+"""
+import asyncio
+import os
+import runpy
+import sys
+
+# plugins validate port argument even though it is not used
+PLACEHOLDER_PORT = '1'
+
+
+def patch_open_connection(path):
+    open_unix_connection = asyncio.open_unix_connection
+
+    async def open_connection(host=None, port=None, **kwargs):
+        return await open_unix_connection(path, **kwargs)
+
+    asyncio.open_connection = open_connection
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3:
+        sys.exit(__doc__.splitlines()[-1])
+
+    path, script, token = argv
+    patch_open_connection(path)
+
+    sys.argv = [script, token, PLACEHOLDER_PORT]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(script)))
+    runpy.run_path(script, run_name='__main__')
+
+
+if __name__ == "__main__":
+    main()
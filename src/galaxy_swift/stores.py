@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import threading
+
+from galaxy_swift.paths import get_safe_filename
+
+log = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = 'GALAXY_SWIFT_CACHE_DIR'
+
+
+def get_cache_dir():
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'galaxy-swift')
+
+
+class PluginCacheStore:
+    """Persistent plugin ``push_cache`` data.
+
+    Stored as an append-only NDJSON log: an optional snapshot line followed
+    by incremental ``{"set": {...}, "del": [...]}`` updates. The log is
+    rewritten as a single snapshot once it holds more than
+    ``compact_threshold`` updates or ends with a torn record. The data
+    holds plugin credentials, so files are readable by the owner only.
+    """
+
+    def __init__(self, path, compact_threshold=100):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self.data = None
+        self.updates = 0
+        self.torn = False
+
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_plugin(cls, plugin_path, cache_dir=None, **kwargs):
+        guid = plugin_path.get_manifest().guid
+        filename = get_safe_filename(guid) + '.ndjson'
+        return cls(
+            os.path.join(cache_dir or get_cache_dir(), filename), **kwargs)
+
+    def load(self):
+        """Return stored cache data replaying the log."""
+        with self._lock:
+            self._load()
+            return dict(self.data)
+
+    def update(self, data):
+        """Append changes from pushed cache data."""
+        with self._lock:
+            if self.data is None:
+                self._load()
+
+            changed = {
+                key: value for key, value in data.items()
+                if key not in self.data or self.data[key] != value
+            }
+            deleted = [key for key in self.data if key not in data]
+            if not changed and not deleted:
+                return
+
+            self.data = dict(data)
+            if self.updates >= self.compact_threshold:
+                self._compact()
+                return
+
+            record = {}
+            if changed:
+                record['set'] = changed
+            if deleted:
+                record['del'] = deleted
+            self._append(record)
+
+    def compact(self):
+        with self._lock:
+            if self.data is None:
+                self._load()
+            self._compact()
+
+    def clear(self):
+        with self._lock:
+            self.data = {}
+            self.updates = 0
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def handle_notification(self, notification):
+        data = notification.params.get('data')
+        if not isinstance(data, dict):
+            log.warning("Invalid push_cache data: %r", data)
+            return
+        self.update(data)
+
+    def _load(self):
+        self.data = self._read()
+        if self.torn:
+            # next record would be glued onto the torn line
+            self._compact()
+
+    def _read(self):
+        data = {}
+        self.updates = 0
+        self.torn = False
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return data
+
+        with f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    self.torn = True
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn write of the last record
+                    log.warning("Skipping corrupted cache record")
+                    self.torn = True
+                    continue
+                if 'snapshot' in record:
+                    data = record['snapshot']
+                    continue
+                data.update(record.get('set', {}))
+                for key in record.get('del', []):
+                    data.pop(key, None)
+                self.updates += 1
+        return data
+
+    def _open(self, path, flags):
+        os.makedirs(os.path.dirname(path) or '.', mode=0o700, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | flags, 0o600)
+        return os.fdopen(fd, 'wb')
+
+    def _append(self, record):
+        with self._open(self.path, os.O_APPEND) as f:
+            f.write(json.dumps(record).encode('utf-8') + b'\n')
+        self.updates += 1
+
+    def _compact(self):
+        log.debug("Compacting %s after %d updates", self.path, self.updates)
+        tmp_path = self.path + '.tmp'
+        with self._open(tmp_path, os.O_TRUNC) as f:
+            snapshot = json.dumps({'snapshot': self.data})
+            f.write(snapshot.encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.updates = 0
+        self.torn = False
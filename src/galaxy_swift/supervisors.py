@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import subprocess
+import time
+
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+from galaxy_swift.runners import AsyncPluginProcess
+from galaxy_swift.teardowns import PluginTeardown
+
+log = logging.getLogger(__name__)
+
+
+class PluginSupervisor:
+    """Keeps plugin connected to an async client stub running.
+
+    The plugin is restarted with exponential backoff when it exits, fails
+    to connect or misses ``max_missed_pings`` health pings in a row. Every
+    (re)connected plugin gets the session handshake replayed:
+    ``get_capabilities``, ``initialize_cache`` with the last pushed cache
+    and ``init_authentication`` with the last stored credentials. Calls in
+    flight fail with ClientError as soon as the plugin goes away.
+    """
+
+    terminate_timeout = 5
+
+    def __init__(
+            self, client, plugin_path, path=None,
+            ping_interval=5.0, ping_timeout=5.0, max_missed_pings=3,
+            backoff_initial=0.5, backoff_max=30.0, backoff_factor=2.0,
+            stable_time=60.0, max_restarts=None, connect_timeout=30.0,
+            stored_credentials=None, cache_store=None,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, output_cb=None,
+            zygote=None,
+    ):
+        self.client = client
+        self.plugin_path = plugin_path
+        self.path = path
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.max_missed_pings = max_missed_pings
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.backoff_factor = backoff_factor
+        # session lasting that long resets backoff
+        self.stable_time = stable_time
+        self.max_restarts = max_restarts
+        self.connect_timeout = connect_timeout
+        self.stored_credentials = stored_credentials
+        self.cache_store = cache_store
+        self.stdout = stdout
+        self.stderr = stderr
+        self.output_cb = output_cb
+        # restarts fork plugin from a warm interpreter when set
+        self.zygote = zygote
+
+        self.process = None
+        self.capabilities = None
+        self.cache = cache_store.load() if cache_store is not None else {}
+        self.restarts = 0
+        self.missed_pings = 0
+        self.failures = []
+
+        self._failure = None
+        self._ready = None
+        self._task = None
+        self._ping_job = None
+        self._stopped = False
+
+        client.notifications.subscribe('push_cache', self.on_push_cache)
+        client.notifications.subscribe(
+            'store_credentials', self.on_store_credentials)
+
+    async def start(self):
+        """Start plugin and wait until first handshake finishes."""
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self._task = asyncio.create_task(self.supervise())
+        self._ping_job = self.client.add_periodic_job(
+            self.check_health, self.ping_interval, name='health')
+        await asyncio.shield(self._ready)
+
+    async def stop(self, timeout=None):
+        """Stop supervising and tear plugin down, return TeardownResult."""
+        self._stopped = True
+        if self._ping_job is not None:
+            self.client.scheduler.remove_job(self._ping_job)
+            self._ping_job = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        return await PluginTeardown(
+            self.client, self.process, timeout=timeout).run()
+
+    async def supervise(self):
+        failures = 0
+        while not self._stopped:
+            started = time.monotonic()
+            try:
+                reason = await self.run_session()
+            except GalaxySwiftError as exc:
+                reason = str(exc)
+            self.failures.append(reason)
+            log.warning("Plugin failed: %s", reason)
+            # reject calls in flight before waiting for the process
+            self.client.disconnect()
+            await self.stop_process()
+
+            if time.monotonic() - started > self.stable_time:
+                failures = 0
+            if (
+                    self.max_restarts is not None and
+                    self.restarts >= self.max_restarts
+            ):
+                error = GalaxySwiftError(
+                    f'Plugin failed {len(self.failures)} times: {reason}')
+                if not self._ready.done():
+                    self._ready.set_exception(error)
+                log.error("%s", error)
+                return
+
+            delay = min(
+                self.backoff_initial * self.backoff_factor ** failures,
+                self.backoff_max,
+            )
+            failures += 1
+            log.info("Restarting plugin in %.1f seconds", delay)
+            await asyncio.sleep(delay)
+            self.restarts += 1
+
+    async def run_session(self):
+        """Run plugin until it fails, return failure reason."""
+        loop = asyncio.get_running_loop()
+        self._failure = loop.create_future()
+        self.missed_pings = 0
+        if self.client.cache is not None:
+            # responses of the previous plugin must not answer the new one
+            self.client.cache.invalidate()
+        self.process = AsyncPluginProcess(
+            self.plugin_path, self.client.token, self.client.port,
+            path=self.path, stdout=self.stdout, stderr=self.stderr,
+            output_cb=self.output_cb, zygote=self.zygote,
+        )
+        await self.process.start()
+        self.process.exited.add_done_callback(self.on_exit)
+
+        connecting = asyncio.ensure_future(self.client.wait_connected())
+        try:
+            await asyncio.wait(
+                [connecting, self._failure], timeout=self.connect_timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            connecting.cancel()
+        if self._failure.done():
+            return self._failure.result()
+        if not self.client.is_connected():
+            return f'no connection within {self.connect_timeout} seconds'
+
+        try:
+            await self.handshake()
+        except (ClientError, RequestTimeout, ConnectionError) as exc:
+            if self._failure.done():
+                return self._failure.result()
+            return f'handshake failed: {exc}'
+        if not self._ready.done():
+            self._ready.set_result(None)
+        return await self._failure
+
+    async def handshake(self):
+        log.info("Replaying session handshake")
+        response = await self.client.acall('get_capabilities')
+        self.capabilities = response.result
+        await self.client.acall('initialize_cache', data=self.cache)
+        if self.stored_credentials is not None:
+            await self.client.acall(
+                'init_authentication',
+                stored_credentials=self.stored_credentials,
+            )
+
+    async def check_health(self):
+        if self._failure is None or self._failure.done():
+            return
+        if not self.client.is_connected():
+            return
+
+        try:
+            # any response, even unknown method error, proves liveness
+            await self.client.acall('ping', timeout=self.ping_timeout)
+        except (ClientError, RequestTimeout, ConnectionError) as exc:
+            self.missed_pings += 1
+            log.warning(
+                "Plugin missed health ping %d/%d: %s",
+                self.missed_pings, self.max_missed_pings, exc,
+            )
+            if self.missed_pings >= self.max_missed_pings:
+                self.fail(f'missed {self.missed_pings} health pings')
+        else:
+            self.missed_pings = 0
+
+    async def stop_process(self):
+        if self.process is None or self.process.exited is None:
+            return
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(
+                self.process.wait(), self.terminate_timeout)
+        except asyncio.TimeoutError:
+            log.warning("Plugin did not terminate, killing it")
+            self.process.kill()
+            await self.process.wait()
+
+    def fail(self, reason):
+        if self._failure is not None and not self._failure.done():
+            self._failure.set_result(reason)
+
+    def on_exit(self, exited):
+        self.fail(f'exited with status code {exited.result()}')
+
+    def on_push_cache(self, notification):
+        self.cache = notification.params.get('data', {})
+        if self.cache_store is not None:
+            self.cache_store.handle_notification(notification)
+
+    def on_store_credentials(self, notification):
+        self.stored_credentials = notification.params
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+from galaxy_swift.types import TeardownResult
+
+log = logging.getLogger(__name__)
+
+
+def format_teardown(result):
+    stages = ', '.join(
+        f'{stage} {duration * 1000:.1f}ms'
+        for stage, duration in result.timings.items()
+    )
+    return (
+        f'Teardown: {stages} (stopped by {result.stage}, '
+        f'total {result.total_time * 1000:.1f}ms, '
+        f'exit {result.returncode})\n'
+    )
+
+
+class PluginTeardown:
+    """Stops a plugin session with escalating stages.
+
+    ``shutdown`` RPC is sent first, then the plugin gets ``timeout``
+    seconds to close the connection and exit. Only a plugin still running
+    after that is sent SIGTERM and, after another ``timeout``, SIGKILL.
+    ``process`` (an ``AsyncPluginProcess``) is optional; without it the
+    teardown ends once the plugin closes the connection.
+    """
+
+    timeout = 1.0
+
+    def __init__(self, client, process=None, timeout=None):
+        self.client = client
+        if process is not None and process.exited is None:
+            # never started
+            process = None
+        self.process = process
+        if timeout is not None:
+            self.timeout = timeout
+
+    async def run(self):
+        """Tear session down, return ``TeardownResult``."""
+        result = TeardownResult()
+        start = time.monotonic()
+        stages = [('shutdown', self.shutdown), ('eof', self.wait_eof)]
+        if self.process is not None:
+            stages += [('terminate', self.terminate), ('kill', self.kill)]
+
+        for stage, step in stages:
+            stage_start = time.monotonic()
+            stopped = await step()
+            result.timings[stage] = time.monotonic() - stage_start
+            if stopped:
+                result.stage = stage
+                break
+
+        result.total_time = time.monotonic() - start
+        if self.process is not None:
+            result.returncode = self.process.returncode
+        log.info(
+            "Plugin stopped by %s in %.3f seconds",
+            result.stage, result.total_time,
+        )
+        return result
+
+    async def shutdown(self):
+        if not self.client.is_connected():
+            return False
+
+        log.info("Sending shutdown")
+        try:
+            await self.client.acall('shutdown', timeout=self.timeout)
+        except (ClientError, ConnectionError):
+            # plugin may close connection before answering
+            pass
+        except RequestTimeout:
+            log.warning("Plugin did not answer shutdown")
+        return False
+
+    async def wait_eof(self):
+        waiters = [self.client.wait_disconnected()]
+        if self.process is not None:
+            waiters.append(self.process.wait())
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiters), self.timeout)
+        except asyncio.TimeoutError:
+            log.warning(
+                "Plugin did not stop within %.1f seconds", self.timeout)
+            return False
+        return True
+
+    async def terminate(self):
+        self.process.terminate()
+        try:
+            await asyncio.wait_for(self.process.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            log.warning("Plugin did not terminate, killing it")
+            return False
+        return True
+
+    async def kill(self):
+        self.process.kill()
+        await self.process.wait()
+        return True
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -16,3 +16,84 @@ class Manifest():
     email: str
     url: str
     script: str
+
+
+@dataclass
+class MethodResult():
+    """Outcome of a single client method call.
+    :param method: JSON-RPC method name
+    :param duration: call round-trip time in seconds
+    :param result: response result
+    :param error: response error or exception message
+    """
+    method: str
+    duration: float
+    result: object = None
+    error: object = None
+
+
+@dataclass
+class SessionResult():
+    """Outcome of a plugin session run by an orchestrator.
+    :param plugin_dir: plugin directory
+    :param name: plugin name from the manifest
+    :param connect_time: seconds from plugin start to connection
+    :param total_time: seconds from session start to teardown
+    :param teardown_time: seconds the plugin took to stop
+    :param methods: called methods results
+    :param error: session error message
+    """
+    plugin_dir: str
+    name: str = None
+    connect_time: float = None
+    total_time: float = None
+    teardown_time: float = None
+    methods: list = field(default_factory=list)
+    error: str = None
+
+
+@dataclass
+class BenchmarkResult():
+    """Client method benchmark summary. Latencies are in seconds.
+    :param method: JSON-RPC method name
+    :param iterations: number of measured calls
+    :param concurrency: number of calls kept in flight
+    :param errors: number of failed calls
+    :param total_time: measured calls wall time
+    :param throughput: calls per second
+    :param latency_mean: mean call round-trip time
+    :param latency_p50: median call round-trip time
+    :param latency_p90: 90th percentile call round-trip time
+    :param latency_p99: 99th percentile call round-trip time
+    :param latency_max: slowest call round-trip time
+    :param request_bytes: average request size
+    :param response_bytes: average response size
+    """
+    method: str
+    iterations: int
+    concurrency: int
+    errors: int
+    total_time: float
+    throughput: float
+    latency_mean: float
+    latency_p50: float
+    latency_p90: float
+    latency_p99: float
+    latency_max: float
+    request_bytes: float
+    response_bytes: float
+
+
+@dataclass
+class TeardownResult():
+    """Outcome of a plugin session teardown. Times are in seconds.
+    :param stage: stage that stopped the plugin (shutdown, eof, terminate
+        or kill)
+    :param returncode: plugin exit status, None when unknown
+    :param timings: time spent in every run stage
+    :param total_time: teardown wall time
+    """
+    stage: str = None
+    returncode: int = None
+    timings: dict = field(default_factory=dict)
+    total_time: float = None
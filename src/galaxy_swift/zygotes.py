@@ -0,0 +1,417 @@
+"""Warm plugin interpreter forking a plugin process per session.
+
+The zygote runs the plugin script once under a non ``__main__`` name, which
+imports ``galaxy.api`` and all plugin dependencies without starting the
+plugin. Each spawn request forks the zygote and runs the script as
+``__main__`` with the session token and port, reusing imported modules.
+
+Usage: python -m galaxy_swift.zygotes CONTROL_PATH SCRIPT
+"""
+import asyncio
+import json
+import logging
+import os
+import runpy
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.paths import PluginPath
+
+log = logging.getLogger(__name__)
+
+PRELOAD_RUN_NAME = '__galaxy_swift_zygote__'
+
+
+def get_fork_error():
+    """Return reason forking is unsafe on this platform or None."""
+    if not hasattr(os, 'fork'):
+        return 'fork is not supported on this platform'
+    if sys.platform == 'darwin':
+        return 'fork is unsafe on macOS'
+    return None
+
+
+class BaseZygoteProcess:
+    """Plugin process forked by the zygote, signaled by pid."""
+
+    # forked plugins inherit zygote stdio
+    stdout = None
+    stderr = None
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = None
+
+    def send_signal(self, sig):
+        if self.returncode is not None:
+            return
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+
+class ZygoteProcess(BaseZygoteProcess):
+    """Popen-like handle of a plugin process forked by the zygote."""
+
+    def __init__(self, pid, sock, buffer=b''):
+        super().__init__(pid)
+        self._sock = sock
+        self._buffer = buffer
+
+    def poll(self):
+        try:
+            return self.wait(0)
+        except subprocess.TimeoutExpired:
+            return None
+
+    def wait(self, timeout=None):
+        if self.returncode is not None:
+            return self.returncode
+
+        self._sock.settimeout(timeout)
+        try:
+            while b'\n' not in self._buffer:
+                chunk = self._sock.recv(4096)
+                if not chunk:
+                    raise GalaxySwiftError('Plugin zygote exited')
+                self._buffer += chunk
+        except (socket.timeout, BlockingIOError):
+            raise subprocess.TimeoutExpired(
+                f'zygote child {self.pid}', timeout)
+
+        line, _, self._buffer = self._buffer.partition(b'\n')
+        self.returncode = json.loads(line)['exit']
+        self._sock.close()
+        return self.returncode
+
+
+class AsyncZygoteProcess(BaseZygoteProcess):
+    """``asyncio.subprocess.Process``-like handle of a forked plugin."""
+
+    def __init__(self, pid, reader, writer):
+        super().__init__(pid)
+        self._reader = reader
+        self._writer = writer
+
+    async def wait(self):
+        if self.returncode is not None:
+            return self.returncode
+
+        line = await self._reader.readline()
+        self._writer.close()
+        if not line:
+            # exit status got lost with the zygote
+            log.error("Plugin zygote exited before plugin %d", self.pid)
+            self.returncode = 1
+        else:
+            self.returncode = json.loads(line)['exit']
+        return self.returncode
+
+
+class PluginZygote:
+    """Starts plugin zygote and spawns plugin processes through it."""
+
+    def __init__(
+            self, plugin_path, stdout=None, stderr=None, runtime_dir=None,
+    ):
+        self.plugin_path = plugin_path
+        self.stdout = stdout
+        self.stderr = stderr
+        self.runtime_dir = runtime_dir
+
+        self.proc = None
+        self.control_path = None
+        self.can_fork = False
+        self.fork_error = None
+        self._tmp_dir = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self, timeout=30):
+        self.fork_error = get_fork_error()
+        if self.fork_error is not None:
+            log.warning("Plugin zygote disabled: %s", self.fork_error)
+            return
+
+        manifest = self.plugin_path.get_manifest()
+        self._tmp_dir = tempfile.TemporaryDirectory(
+            prefix='galaxy-swift-zygote-', dir=self.runtime_dir)
+        self.control_path = os.path.join(self._tmp_dir.name, 'zygote.sock')
+        self.proc = subprocess.Popen(
+            [
+                sys.executable, '-m', 'galaxy_swift.zygotes',
+                self.control_path, manifest.script,
+            ],
+            cwd=self.plugin_path,
+            stdout=self.stdout, stderr=self.stderr,
+        )
+
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                status = self.request({'op': 'status'})
+                break
+            except OSError:
+                if self.proc.poll() is not None:
+                    self.close()
+                    raise GalaxySwiftError(
+                        f'Plugin zygote exited with {self.proc.returncode}')
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise GalaxySwiftError('Plugin zygote did not start')
+                time.sleep(0.01)
+
+        self.fork_error = status['fork_error']
+        self.can_fork = self.fork_error is None
+        if not self.can_fork:
+            log.warning("Plugin zygote disabled: %s", self.fork_error)
+            self.close()
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.control_path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def request(self, request):
+        with self.connect() as sock:
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            return json.loads(sock.makefile('rb').readline())
+
+    def can_spawn(self, plugin_path):
+        """Whether plugin can be forked instead of started from scratch."""
+        if not self.can_fork:
+            return False
+        if (
+                PluginPath(self.plugin_path).resolve() !=
+                PluginPath(plugin_path).resolve()
+        ):
+            log.warning("Zygote preloaded other plugin, spawning plugin")
+            return False
+        return True
+
+    def spawn(self, token, port, path=None):
+        """Fork plugin process connecting to port (or unix socket path)."""
+        if not self.can_fork:
+            raise GalaxySwiftError(
+                f'Plugin zygote disabled: {self.fork_error}')
+
+        sock = self.connect()
+        request = {'op': 'spawn', 'token': token, 'port': port, 'path': path}
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        buffer = b''
+        while b'\n' not in buffer:
+            chunk = sock.recv(4096)
+            if not chunk:
+                sock.close()
+                raise GalaxySwiftError('Plugin zygote exited')
+            buffer += chunk
+        line, _, buffer = buffer.partition(b'\n')
+        pid = json.loads(line)['pid']
+        log.info("Plugin process %d forked by zygote", pid)
+        return ZygoteProcess(pid, sock, buffer)
+
+    async def aspawn(self, token, port, path=None):
+        """Fork plugin process like ``spawn`` from a running event loop."""
+        if not self.can_fork:
+            raise GalaxySwiftError(
+                f'Plugin zygote disabled: {self.fork_error}')
+
+        reader, writer = await asyncio.open_unix_connection(self.control_path)
+        request = {'op': 'spawn', 'token': token, 'port': port, 'path': path}
+        writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        line = await reader.readline()
+        if not line:
+            writer.close()
+            raise GalaxySwiftError('Plugin zygote exited')
+        pid = json.loads(line)['pid']
+        log.info("Plugin process %d forked by zygote", pid)
+        return AsyncZygoteProcess(pid, reader, writer)
+
+    def close(self):
+        self.can_fork = False
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            self.proc.wait()
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+
+class ZygoteServer:
+    """Zygote side, single threaded so forking stays safe."""
+
+    def __init__(self, control_path, script):
+        self.control_path = control_path
+        self.script = os.path.abspath(script)
+        self.fork_error = None
+
+        self.children = {}
+        self.selector = selectors.DefaultSelector()
+        self.sock = None
+        self._wakeup = None
+
+    def preload(self):
+        sys.path.insert(0, os.path.dirname(self.script))
+        sys.argv = [self.script]
+        runpy.run_path(self.script, run_name=PRELOAD_RUN_NAME)
+        self.fork_error = get_fork_error()
+        if threading.active_count() > 1:
+            # forked child would inherit locks held by other threads
+            self.fork_error = 'plugin imports started threads'
+
+    def serve(self):
+        self._wakeup = socket.socketpair()
+        for wakeup_sock in self._wakeup:
+            wakeup_sock.setblocking(False)
+        signal.set_wakeup_fd(self._wakeup[1].fileno())
+        # handler needed for wakeup fd to be written
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.control_path)
+        self.sock.listen()
+        self.selector.register(self.sock, selectors.EVENT_READ, self.accept)
+        self.selector.register(
+            self._wakeup[0], selectors.EVENT_READ, self.reap)
+
+        while True:
+            for key, _ in self.selector.select():
+                key.data(key.fileobj)
+
+    def accept(self, sock):
+        conn, _ = sock.accept()
+        self.selector.register(conn, selectors.EVENT_READ, self.handle)
+
+    def handle(self, conn):
+        # control requests are single short lines
+        data = conn.recv(65536)
+        if not data:
+            self.selector.unregister(conn)
+            conn.close()
+            return
+
+        request = json.loads(data.split(b'\n', 1)[0])
+        if request['op'] == 'status':
+            self.reply(
+                conn, {'pid': os.getpid(), 'fork_error': self.fork_error})
+            return
+
+        if request['op'] == 'spawn':
+            self.selector.unregister(conn)
+            pid = self.fork(request, conn)
+            self.children[pid] = conn
+            conn.sendall(json.dumps({'pid': pid}).encode('utf-8') + b'\n')
+
+    def reply(self, conn, response):
+        conn.sendall(json.dumps(response).encode('utf-8') + b'\n')
+        self.selector.unregister(conn)
+        conn.close()
+
+    def reap(self, wakeup_sock):
+        try:
+            while wakeup_sock.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            conn = self.children.pop(pid, None)
+            if conn is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            try:
+                conn.sendall(
+                    json.dumps({'exit': code}).encode('utf-8') + b'\n')
+            except OSError:
+                pass
+            conn.close()
+
+    def fork(self, request, conn):
+        pid = os.fork()
+        if pid:
+            return pid
+
+        code = 1
+        try:
+            conn.close()
+            self.reset_child()
+            self.run_child(request)
+            code = 0
+        except SystemExit as exc:
+            if exc.code is None:
+                code = 0
+            elif isinstance(exc.code, int):
+                code = exc.code
+            else:
+                sys.stderr.write(f'{exc.code}\n')
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def reset_child(self):
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+        self.selector.close()
+        for conn in self.children.values():
+            conn.close()
+        for wakeup_sock in self._wakeup:
+            wakeup_sock.close()
+
+    def run_child(self, request):
+        from galaxy_swift.shims import PLACEHOLDER_PORT, patch_open_connection
+
+        port = str(request['port'])
+        if request['path'] is not None:
+            patch_open_connection(request['path'])
+            port = PLACEHOLDER_PORT
+        sys.argv = [self.script, request['token'], port]
+        runpy.run_path(self.script, run_name='__main__')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit(__doc__.splitlines()[-1])
+
+    server = ZygoteServer(*argv)
+    server.preload()
+    server.serve()
+
+
+if __name__ == "__main__":
+    main()
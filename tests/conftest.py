@@ -1,8 +1,92 @@
+import json
 import logging
+import os
+import socket
+import sys
+import threading
+import time
 
 import pytest
 
+from galaxy_swift.paths import PluginPath
+from galaxy_swift.runners import AsyncClientStubRunner
+
 
 @pytest.fixture(autouse=True)
 def my_caplog(caplog):
     caplog.set_level(logging.DEBUG)
+
+
+class FakePlugin(threading.Thread):
+    """Plugin stand-in answering requests with a user supplied handler."""
+
+    def __init__(self, port, handler):
+        threading.Thread.__init__(self, daemon=True)
+        self.port = port
+        self.handler = handler
+        self.received = []
+
+    def run(self):
+        with self.connect() as sock:
+            rfile = sock.makefile('rb')
+            wfile = sock.makefile('wb', buffering=0)
+            self.handler(self, rfile, wfile)
+
+    def connect(self, attempts=50):
+        for _ in range(attempts):
+            try:
+                return socket.create_connection(('127.0.0.1', self.port))
+            except ConnectionRefusedError:
+                time.sleep(0.05)
+        raise ConnectionRefusedError(self.port)
+
+    def read_message(self, rfile):
+        message = json.loads(rfile.readline())
+        self.received.append(message)
+        return message
+
+    @staticmethod
+    def write_message(wfile, message):
+        wfile.write((json.dumps(message) + '\n').encode('utf-8'))
+
+
+@pytest.fixture
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def fake_plugin_factory():
+    return FakePlugin
+
+
+@pytest.fixture
+def client_runner():
+    runner = AsyncClientStubRunner()
+    runner.bind('token', 0)
+    runner.start()
+    runner.wait_listening(5)
+    yield runner
+    runner.terminate()
+
+
+@pytest.fixture
+def plugin_path_factory(tmp_path, monkeypatch):
+    """Return factory writing plugin directory with script and files."""
+    # plugin subprocesses import galaxy_swift shims
+    monkeypatch.setenv('PYTHONPATH', os.pathsep.join(sys.path))
+
+    def factory(script, **files):
+        (tmp_path / 'manifest.json').write_text(json.dumps({
+            'name': 'Test plugin', 'platform': 'generic', 'guid': 'TEST',
+            'version': '0.1', 'description': '', 'author': '', 'email': '',
+            'url': '', 'script': 'plugin.py',
+        }))
+        (tmp_path / 'plugin.py').write_text(script)
+        for name, content in files.items():
+            (tmp_path / name).write_text(content)
+        return PluginPath(tmp_path)
+
+    return factory
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from galaxy_swift.benchmarks import MethodBenchmark, percentile
+from galaxy_swift.runners import AsyncClientStubRunner
+
+
+def echo(plugin, rfile, wfile):
+    while True:
+        line = rfile.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        plugin.write_message(wfile, {
+            'jsonrpc': '2.0', 'id': request['id'], 'result': 'pong',
+        })
+
+
+class TestPercentile:
+
+    @pytest.mark.parametrize('percent,expected', [
+        (50, 50), (90, 90), (99, 99), (100, 100), (1, 1),
+    ])
+    def test_nearest_rank(self, percent, expected):
+        assert percentile(list(range(1, 101)), percent) == expected
+
+    def test_empty(self):
+        assert percentile([], 50) == 0.0
+
+
+class TestMethodBenchmark:
+
+    def test_run(self, fake_plugin_factory):
+        runner = AsyncClientStubRunner()
+        runner.bind('token', 0, tick_interval=0)
+        runner.start()
+        runner.wait_listening(5)
+        plugin = fake_plugin_factory(runner.port, echo)
+        plugin.start()
+        runner.wait(5)
+
+        result = MethodBenchmark(
+            runner.client, 'ping', iterations=200, warmup=20, concurrency=4,
+        ).run()
+
+        assert result.iterations == 200
+        assert result.errors == 0
+        assert result.throughput > 0
+        assert 0 < result.latency_p50 <= result.latency_p99
+        assert result.latency_p99 <= result.latency_max
+        assert result.request_bytes > 0
+        assert result.response_bytes > 0
+        runner.terminate()
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import socket
+from unittest import mock
+
+from galaxy_swift.api.caches import ResponseCache
+from galaxy_swift.api.clients import GalaxyAsyncClientStub
+from galaxy_swift.api.models import Notification, Response
+
+
+class TestResponseCache:
+
+    def test_hit_miss(self):
+        cache = ResponseCache()
+        response = Response(result={'games': []}, id=1)
+
+        assert cache.get('import_owned_games', {}) is None
+        cache.put('import_owned_games', {}, response)
+
+        assert cache.get('import_owned_games', {}) is response
+        assert cache.stats() == {
+            'size': 1, 'hits': 1, 'misses': 1, 'evictions': 0}
+
+    def test_canonical_params(self):
+        cache = ResponseCache(ttls={'method': 10})
+        response = Response(result=1, id=1)
+        cache.put('method', {'a': 1, 'b': 2}, response)
+
+        assert cache.get('method', {'b': 2, 'a': 1}) is response
+        assert cache.get('method', {'a': 2, 'b': 1}) is None
+
+    def test_not_cacheable(self):
+        cache = ResponseCache()
+        cache.put('ping', {}, Response(result='pong', id=1))
+        cache.put(
+            'get_capabilities', {}, Response(id=2, error={'code': -1}))
+
+        assert len(cache) == 0
+        assert cache.get('ping', {}) is None
+        assert cache.misses == 0
+
+    def test_ttl(self):
+        cache = ResponseCache(ttls={'method': 10})
+        cache.put('method', {}, Response(result=1, id=1))
+
+        with mock.patch('time.monotonic', return_value=10 ** 9):
+            assert cache.get('method', {}) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(ttls={'method': 10}, maxsize=2)
+        for value in range(3):
+            cache.put('method', {'v': value}, Response(result=value, id=1))
+            cache.get('method', {'v': 0})
+
+        assert cache.get('method', {'v': 0}).result == 0
+        assert cache.get('method', {'v': 1}) is None
+        assert cache.evictions == 1
+
+    def test_invalidation(self):
+        cache = ResponseCache()
+        cache.put('import_owned_games', {}, Response(result=[], id=1))
+        cache.put('get_capabilities', {}, Response(result=[], id=2))
+        generation = cache.generation
+
+        cache.handle_notification(Notification('owned_game_added'))
+        cache.put(
+            'import_owned_games', {}, Response(result=[], id=3),
+            generation=generation,
+        )
+
+        assert cache.get('import_owned_games', {}) is None
+        assert cache.get('get_capabilities', {}) is not None
+
+
+class TestClientCache:
+
+    def test_cached_call(self):
+        async def main():
+            client_sock, plugin_sock = socket.socketpair()
+            connected = asyncio.Event()
+            client = GalaxyAsyncClientStub(
+                'token', None, sock=client_sock, connected_cb=connected.set,
+                tick_interval=0, cache=ResponseCache(),
+            )
+            client_task = asyncio.create_task(client.run())
+            reader, writer = await asyncio.open_connection(sock=plugin_sock)
+            await connected.wait()
+
+            async def respond(result):
+                request = json.loads(await reader.readline())
+                writer.write(json.dumps({
+                    'jsonrpc': '2.0', 'id': request['id'], 'result': result,
+                }).encode('utf-8') + b'\n')
+
+            call = asyncio.create_task(client.aio.import_owned_games())
+            await respond('first')
+            first = await call
+            cached = await client.aio.import_owned_games()
+            client.notifications.dispatch(Notification('update_game'))
+            call = asyncio.create_task(client.aio.import_owned_games())
+            await respond('second')
+            responses = [first, cached, await call]
+
+            writer.close()
+            client.terminate()
+            await client_task
+            return client, responses
+
+        client, responses = asyncio.run(main())
+
+        assert [response.result for response in responses] == [
+            'first', 'first', 'second']
+        assert client.cache.hits == 1
+        assert client.cache.misses == 2
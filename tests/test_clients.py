@@ -0,0 +1,393 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+from galaxy_swift.api.clients import GalaxyAsyncClientStub, GalaxyClientStub
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+from galaxy_swift.runners import AsyncClientStubRunner
+
+
+def respond_reversed(count):
+    def handler(plugin, rfile, wfile):
+        requests = [plugin.read_message(rfile) for _ in range(count)]
+        plugin.write_message(
+            wfile, {'jsonrpc': '2.0', 'id': 999, 'result': {}})
+        for request in reversed(requests):
+            plugin.write_message(wfile, {
+                'jsonrpc': '2.0',
+                'id': request['id'],
+                'result': {'method': request['method']},
+            })
+        rfile.readline()
+    return handler
+
+
+class RecordingWriter:
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data_bytes):
+        self.chunks.append(data_bytes)
+        # give other writers a chance to queue behind this one
+        time.sleep(0.0001)
+
+
+@pytest.fixture
+def sync_client():
+    client = GalaxyClientStub('token', 0)
+    client.writer = RecordingWriter()
+    yield client
+    client.server_close()
+
+
+class TestSyncClientWrite:
+
+    def test_interleaved_writers(self, sync_client):
+        def write_many(index):
+            for number in range(200):
+                sync_client.write(f'{index}-{number}\n'.encode('utf-8'))
+
+        threads = [
+            threading.Thread(target=write_many, args=(index,))
+            for index in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        lines = b''.join(sync_client.writer.chunks).splitlines()
+        assert len(lines) == len(set(lines)) == 8 * 200
+        assert not sync_client._outgoing
+        assert not sync_client._flushing
+
+    def test_write_after_queue_drained(self, sync_client):
+        flush = sync_client._flush
+        late = threading.Thread(target=sync_client.write, args=(b'b\n',))
+
+        def slow_flush():
+            flush()
+            if late.ident is None:
+                # lands after the queue was found empty
+                late.start()
+                late.join(5)
+
+        sync_client._flush = slow_flush
+        sync_client.write(b'a\n')
+
+        assert sync_client.writer.chunks == [b'a\n', b'b\n']
+        assert not sync_client._outgoing
+
+
+class TestEphemeralPort:
+
+    def test_parallel_sessions(self):
+        runners = [AsyncClientStubRunner() for _ in range(3)]
+        for runner in runners:
+            runner.bind('token', 0)
+            runner.start()
+        for runner in runners:
+            runner.wait_listening(5)
+
+        ports = {runner.port for runner in runners}
+
+        assert len(ports) == 3
+        assert 0 not in ports
+        for runner in runners:
+            runner.terminate()
+
+    def test_port_in_use(self):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            sock.listen()
+            runner = AsyncClientStubRunner()
+            runner.bind('token', sock.getsockname()[1])
+            runner.start()
+
+            with pytest.raises(OSError):
+                runner.wait_listening()
+            with pytest.raises(OSError):
+                runner.wait()
+        runner.join(5)
+        assert not runner.is_alive()
+
+
+class TestPendingRequests:
+
+    def test_concurrent_calls(self, client_runner, fake_plugin_factory):
+        plugin = fake_plugin_factory(client_runner.port, respond_reversed(3))
+        plugin.start()
+        client_runner.wait(5)
+        client = client_runner.client
+
+        futures = [
+            client.submit('import_owned_games'),
+            client.submit('ping'),
+            client.submit('ping'),
+        ]
+        wait(futures, timeout=5)
+
+        results = [future.result() for future in futures]
+        assert [result.result['method'] for result in results] == [
+            'import_owned_games', 'ping', 'ping',
+        ]
+        assert [result.id for result in results] == [
+            request['id'] for request in plugin.received
+        ]
+        assert len(client.pending) == 0
+        assert client.receive().id == 999
+        for _ in range(50):
+            stats = client.stats()['methods']
+            if stats.get('ping', {}).get('calls') == 2:
+                break
+            time.sleep(0.01)
+        assert stats['ping']['calls'] == 2
+        assert stats['import_owned_games']['response_bytes'] > 0
+
+    def test_disconnect_rejects_pending(
+            self, client_runner, fake_plugin_factory):
+        def handler(plugin, rfile, wfile):
+            plugin.read_message(rfile)
+
+        plugin = fake_plugin_factory(client_runner.port, handler)
+        plugin.start()
+        client_runner.wait(5)
+
+        future = client_runner.client.submit('ping')
+
+        with pytest.raises(ClientError):
+            future.result(timeout=5)
+
+
+class TestAsyncClient:
+
+    def test_awaitable_methods(self, free_port):
+        async def plugin():
+            reader, writer = await asyncio.open_connection(
+                '127.0.0.1', free_port)
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                response = {
+                    'jsonrpc': '2.0',
+                    'id': request['id'],
+                    'result': {'method': request['method']},
+                }
+                writer.write((json.dumps(response) + '\n').encode('utf-8'))
+            writer.close()
+
+        async def main():
+            connected = asyncio.Event()
+            client = GalaxyAsyncClientStub(
+                'token', free_port, connected_cb=connected.set)
+            client_task = asyncio.create_task(client.run())
+            await asyncio.sleep(0.1)
+            plugin_task = asyncio.create_task(plugin())
+            await connected.wait()
+
+            results = await asyncio.gather(
+                client.aio.get_capabilities(),
+                client.aio.import_owned_games(),
+                *(client.acall('ping') for _ in range(100)),
+            )
+
+            with pytest.raises(ClientError):
+                client.call('ping')
+
+            client.writer.close()
+            client.terminate()
+            await asyncio.gather(client_task, plugin_task)
+            return results
+
+        results = asyncio.run(main())
+
+        assert len(results) == 102
+        assert results[0].result == {'method': 'get_capabilities'}
+        assert results[1].result == {'method': 'import_owned_games'}
+        assert len({result.id for result in results}) == 102
+
+
+class TestBatchRequests:
+
+    def respond(self, plugin, rfile, wfile):
+        line = rfile.readline()
+        plugin.lines.append(line)
+        requests = json.loads(line)
+        if isinstance(requests, dict):
+            requests = [requests] + [
+                plugin.read_message(rfile) for _ in range(2)]
+            for request in requests:
+                plugin.write_message(wfile, {
+                    'jsonrpc': '2.0', 'id': request['id'],
+                    'result': request['method'],
+                })
+        else:
+            plugin.write_message(wfile, [
+                {'jsonrpc': '2.0', 'id': request['id'],
+                 'result': request['method']}
+                for request in reversed(requests)
+            ])
+        rfile.readline()
+
+    @pytest.mark.parametrize('batch', [True, False])
+    def test_call_many(self, batch, client_runner, fake_plugin_factory):
+        plugin = fake_plugin_factory(client_runner.port, self.respond)
+        plugin.lines = []
+        plugin.start()
+        client_runner.wait(5)
+
+        responses = client_runner.client.call_many([
+            ('ping', {}),
+            ('get_capabilities', {}),
+            ('initialize_cache', {'data': {}}),
+        ], batch=batch)
+
+        assert [response.result for response in responses] == [
+            'ping', 'get_capabilities', 'initialize_cache',
+        ]
+        assert isinstance(json.loads(plugin.lines[0]), list) is batch
+
+    def test_malformed_batch_element(self, client_runner, fake_plugin_factory):
+        def respond(plugin, rfile, wfile):
+            requests = plugin.read_message(rfile)
+            plugin.write_message(wfile, [
+                {'jsonrpc': '2.0', 'id': requests[0]['id'], 'result': 'pong'},
+                {'id': requests[1]['id'], 'result': 'pong'},
+                'garbage',
+                {'jsonrpc': '2.0', 'id': requests[2]['id'], 'result': 'pong'},
+            ])
+            rfile.readline()
+
+        fake_plugin_factory(client_runner.port, respond).start()
+        client_runner.wait(5)
+
+        futures = client_runner.client.submit_many(
+            [('ping', {})] * 3, batch=True, timeout=5)
+
+        assert futures[0].result(5).result == 'pong'
+        with pytest.raises(ClientError, match='Invalid response'):
+            futures[1].result(5)
+        assert futures[2].result(5).result == 'pong'
+
+
+PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import sys
+
+
+async def main():
+    reader, writer = await asyncio.open_connection('127.0.0.1', sys.argv[2])
+    request = json.loads(await reader.readline())
+    response = {'jsonrpc': '2.0', 'id': request['id'], 'result': sys.argv[1]}
+    writer.write((json.dumps(response) + '\\n').encode('utf-8'))
+    await writer.drain()
+    await reader.readline()
+
+
+asyncio.run(main())
+'''
+
+
+class TestTransports:
+
+    def test_socketpair(self):
+        async def main():
+            client_sock, plugin_sock = socket.socketpair()
+            connected = asyncio.Event()
+            client = GalaxyAsyncClientStub(
+                'token', None, sock=client_sock, connected_cb=connected.set)
+            client_task = asyncio.create_task(client.run())
+            reader, writer = await asyncio.open_connection(sock=plugin_sock)
+            await connected.wait()
+
+            call = asyncio.create_task(client.aio.ping())
+            request = json.loads(await reader.readline())
+            writer.write(json.dumps({
+                'jsonrpc': '2.0', 'id': request['id'], 'result': 'pong',
+            }).encode('utf-8') + b'\n')
+            response = await call
+
+            writer.close()
+            client.terminate()
+            await client_task
+            return response
+
+        assert asyncio.run(main()).result == 'pong'
+
+    def test_unix_socket_shim(self, tmp_path):
+        script = tmp_path / 'plugin.py'
+        script.write_text(PLUGIN_SCRIPT)
+        path = str(tmp_path / 'plugin.sock')
+        runner = AsyncClientStubRunner()
+        runner.bind('token', None, path=path)
+        runner.start()
+
+        while not os.path.exists(path):
+            time.sleep(0.01)
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'galaxy_swift.shims',
+             path, str(script), 'secret'],
+            env=env,
+        )
+        runner.wait(5)
+
+        assert runner.execute('ping').result == 'secret'
+
+        runner.client.writer.close()
+        assert proc.wait(5) == 0
+        runner.terminate()
+
+
+class TestTimeouts:
+
+    def test_call_timeout(self, client_runner, fake_plugin_factory):
+        def handler(plugin, rfile, wfile):
+            request = plugin.read_message(rfile)
+            plugin.read_message(rfile)
+            # late response to the first, timed out request
+            plugin.write_message(wfile, {
+                'jsonrpc': '2.0', 'id': request['id'], 'result': 'late',
+            })
+            rfile.readline()
+
+        plugin = fake_plugin_factory(client_runner.port, handler)
+        plugin.start()
+        client_runner.wait(5)
+        client = client_runner.client
+
+        with pytest.raises(RequestTimeout):
+            client.call('import_owned_games', timeout=0.1)
+        future = client.submit('ping', timeout=0.1)
+        with pytest.raises(RequestTimeout):
+            future.result(5)
+
+        for _ in range(50):
+            if client.pending.late_responses:
+                break
+            time.sleep(0.01)
+        assert len(client.pending) == 0
+        assert client.pending.timeouts == 2
+        assert client.pending.late_responses == 1
+        assert client.responses.empty()
+        assert client._response_sizes == {}
+
+    def test_session_deadline(self, client_runner):
+        client = client_runner.client
+        client.set_session_timeout(0)
+
+        with pytest.raises(RequestTimeout):
+            client.submit('ping')
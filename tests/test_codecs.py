@@ -0,0 +1,42 @@
+import pytest
+
+from galaxy_swift.jsonrpc.codecs import get_available_codecs, get_codec
+from galaxy_swift.jsonrpc.exceptions import InvalidRequest, ParseError
+from galaxy_swift.jsonrpc.parsers import JsonRpcParser
+
+
+@pytest.fixture(params=get_available_codecs())
+def codec(request):
+    return get_codec(request.param)
+
+
+class TestJsonCodecs:
+
+    def test_round_trip(self, codec):
+        message = {'jsonrpc': '2.0', 'id': 1, 'result': {'title': 'Ś'}}
+
+        line = codec.encode_line(message)
+
+        assert line.endswith(b'\n')
+        assert line.count(b'\n') == 1
+        assert codec.decode(line) == message
+        assert codec.decode(memoryview(line)) == message
+
+    def test_parser(self, codec):
+        parser = JsonRpcParser(codec)
+
+        assert parser.parse(b'{"jsonrpc": "2.0", "id": 1, "result": 2}\n') == {
+            'id': 1, 'result': 2,
+        }
+        assert parser.parse(b'[{"jsonrpc": "2.0", "id": 1}]') == [{'id': 1}]
+        assert parser.parse(b'[{"jsonrpc": "2.0", "id": 1}, {"id": 2}]') == [
+            {'id': 1}, InvalidRequest(-32600, "Invalid Request", 2),
+        ]
+        with pytest.raises(ParseError):
+            parser.parse(b'{')
+        with pytest.raises(InvalidRequest):
+            parser.parse(b'{"id": 1}')
+
+    def test_unknown(self):
+        with pytest.raises(ValueError):
+            get_codec('unknown')
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import time
+
+import pytest
+
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.daemons import (
+    DaemonClient, SessionDaemon, check_runtime_dir,
+)
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.jsonrpc.exceptions import RequestTimeout
+from galaxy_swift.runners import AsyncClientStubRunner
+
+
+def respond_pong(plugin, rfile, wfile):
+    while True:
+        try:
+            request = plugin.read_message(rfile)
+        except ValueError:
+            return
+        plugin.write_message(wfile, {
+            'jsonrpc': '2.0', 'id': request['id'], 'result': 'pong'})
+
+
+@pytest.fixture
+def daemon_factory(tmp_path, fake_plugin_factory):
+    runners = []
+
+    def factory(**kwargs):
+        runner = AsyncClientStubRunner()
+        runner.bind('token', 0, tick_interval=0)
+        runner.start()
+        runner.wait_listening(5)
+        fake_plugin_factory(runner.port, respond_pong).start()
+        runner.wait(5)
+        runners.append(runner)
+
+        client = runner.client
+        daemon = SessionDaemon(
+            client, str(tmp_path / 'run' / 'plugin.sock'), **kwargs)
+        daemon.check_interval = 0.05
+        asyncio.run_coroutine_threadsafe(daemon.start(), client.loop).result()
+        return daemon
+
+    yield factory
+    for runner in runners:
+        runner.terminate()
+
+
+class TestSessionDaemon:
+
+    def test_call_and_stop(self, daemon_factory):
+        daemon = daemon_factory()
+        client = DaemonClient(daemon.path)
+
+        assert client.is_running()
+        assert client.ping().result == 'pong'
+        assert client.call('ping').result == 'pong'
+        assert client.status()['calls'] == 2
+
+        client.stop()
+
+        assert daemon.stopped.wait(5)
+        assert not os.path.exists(daemon.path)
+        assert not DaemonClient(daemon.path).is_running()
+
+    def test_idle_timeout(self, daemon_factory):
+        daemon = daemon_factory(idle_timeout=0.2)
+        client = DaemonClient(daemon.path)
+        start = time.monotonic()
+
+        assert client.ping().result == 'pong'
+        assert daemon.stopped.wait(5)
+        assert time.monotonic() - start >= 0.2
+        with pytest.raises((OSError, ClientError)):
+            client.ping()
+
+    def test_malformed_requests(self, daemon_factory):
+        daemon = daemon_factory()
+        requests = [
+            [1, 2],
+            {'op': 'call'},
+            {'op': 'call', 'method': 'ping', 'params': [1]},
+            {'op': 'call', 'method': 'ping', 'timeout': 'soon'},
+            {'op': 'call', 'method': 'ping'},
+        ]
+
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.connect(daemon.path)
+            f = sock.makefile('rwb')
+            for request in requests:
+                f.write(json.dumps(request).encode('utf-8') + b'\n')
+            f.flush()
+            responses = [json.loads(f.readline()) for _ in requests]
+
+        assert ['exception' in response for response in responses] == [
+            True, True, True, True, False]
+        assert responses[-1]['result'] == 'pong'
+
+
+class TestDaemonClient:
+
+    def test_wedged_daemon(self, tmp_path):
+        path = str(tmp_path / 'plugin.sock')
+        with socket.socket(socket.AF_UNIX) as server:
+            # connections are queued but never answered
+            server.bind(path)
+            server.listen()
+            client = DaemonClient(path, timeout=0.1)
+            client.control_timeout = 0.1
+            start = time.monotonic()
+
+            assert not client.is_running()
+            with pytest.raises(RequestTimeout):
+                client.ping()
+
+        assert time.monotonic() - start < 2
+
+
+class TestRuntimeDir:
+
+    def test_private_dir(self, tmp_path):
+        path = tmp_path / 'run'
+        check_runtime_dir(str(path))
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o700
+
+    def test_shared_dir(self, tmp_path):
+        path = tmp_path / 'run'
+        path.mkdir()
+        os.chmod(path, 0o755)
+
+        with pytest.raises(GalaxySwiftError, match='accessible by other'):
+            check_runtime_dir(str(path))
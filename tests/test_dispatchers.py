@@ -0,0 +1,48 @@
+import asyncio
+
+from galaxy_swift.api.dispatchers import NotificationDispatcher
+from galaxy_swift.api.models import Notification
+
+
+class TestNotificationDispatcher:
+
+    def test_callbacks(self):
+        dispatcher = NotificationDispatcher()
+        received = []
+        dispatcher.subscribe('owned_game_added', received.append)
+        dispatcher.subscribe(None, received.append)
+
+        dispatcher.dispatch(Notification('owned_game_added', {'id': 1}))
+        dispatcher.dispatch(Notification('push_cache', {'data': {}}))
+
+        assert [n.method for n in received] == [
+            'owned_game_added', 'owned_game_added', 'push_cache',
+        ]
+        assert dispatcher.counts['push_cache'] == 1
+
+    def test_stream_overflow(self):
+        async def main():
+            dispatcher = NotificationDispatcher()
+            stream = dispatcher.stream('game_time_updated', maxsize=3)
+            for i in range(5):
+                dispatcher.dispatch(Notification('game_time_updated', i))
+            dispatcher.dispatch(Notification('owned_game_added', {}))
+            stream.close()
+            return stream, [n.params async for n in stream]
+
+        stream, params = asyncio.run(main())
+
+        assert params == [2, 3, 4]
+        assert stream.received == 5
+        assert stream.overflows == 2
+
+    def test_stream_outside_loop(self, client_runner):
+        client = client_runner.client
+        stream = client.notifications.stream('push_cache')
+
+        client.notifications.dispatch(Notification('push_cache', 1))
+        notification = asyncio.run_coroutine_threadsafe(
+            stream.__anext__(), client.loop).result(5)
+
+        assert notification.params == 1
+        stream.close()
@@ -0,0 +1,47 @@
+import logging
+
+from galaxy_swift.jsonrpc.loggers import ProtocolLogger
+
+log = logging.getLogger(__name__)
+
+
+class TestProtocolLogger:
+
+    def test_redacts_sensitive_params(self, caplog):
+        protocol_logger = ProtocolLogger(log)
+
+        protocol_logger.sent({
+            'id': 1,
+            'method': 'pass_login_credentials',
+            'params': {
+                'step': 'step1',
+                'credentials': {'password': 'secret'},
+                'cookies': [{'name': 'session', 'value': 'secret'}],
+            },
+        })
+
+        assert 'step1' in caplog.text
+        assert 'secret' not in caplog.text
+
+    def test_truncates_preview(self, caplog):
+        protocol_logger = ProtocolLogger(log, preview_size=50)
+
+        protocol_logger.received({'id': 1, 'result': 'x' * 10000})
+
+        assert len(caplog.records[0].getMessage()) < 100
+
+    def test_disabled_level(self, caplog):
+        caplog.set_level(logging.INFO)
+        protocol_logger = ProtocolLogger(log)
+
+        protocol_logger.received({'id': 1, 'result': {}})
+
+        assert not caplog.records
+
+    def test_sampling(self, caplog):
+        protocol_logger = ProtocolLogger(log, sample_rate=10)
+
+        for i in range(25):
+            protocol_logger.received({'id': i, 'result': {}})
+
+        assert len(caplog.records) == 3
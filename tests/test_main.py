@@ -1,8 +1,37 @@
+import json
 from unittest import mock
 import os
+import subprocess
+import sys
+
+import pytest
 
 from galaxy_swift.__main__ import main
 
+DUMMY_PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__)) + '/data/dummy'
+# seconds, about 5 times the measured CLI import time to tolerate noisy
+# machines while catching eager heavy imports (IPython alone takes more)
+IMPORT_TIME_BUDGET = 0.15
+
+
+def get_import_times(*args):
+    """Run CLI with -X importtime and return top level imports times."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'galaxy_swift', *args],
+        cwd=DUMMY_PLUGIN_DIR, env=env, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (
+            int(cumulative) / 1000000, not name[1:].startswith(' '))
+    return modules
+
 
 @mock.patch(
     'os.getcwd',
@@ -34,3 +63,105 @@ class TestDummyPlugin:
             " Script: plugin.py\n"
         )
         assert err == ""
+
+    def test_multi_run_invalid_plugin(self, capfd):
+        args = ["multi-run", "/nonexistent", "--format", "json"]
+        main(args=args)
+
+        out, err = capfd.readouterr()
+        results = json.loads(out)
+        assert len(results) == 1
+        assert results[0]['plugin_dir'] == '/nonexistent'
+        assert results[0]['error'] == '/nonexistent directory does not exist'
+        assert results[0]['methods'] == []
+
+    def test_analyze(self, capfd, tmp_path):
+        recording = tmp_path / 'session.ndjson'
+        recording.write_bytes(
+            b'{"t":0.0,"d":"out","s":42,"m":{"jsonrpc":"2.0","id":"1",'
+            b'"method":"ping"}}\n'
+            b'{"t":0.5,"d":"in","s":42,"m":{"jsonrpc":"2.0","id":"1",'
+            b'"result":"pong"}}\n'
+        )
+        args = ["analyze", str(recording), "--format", "json"]
+        main(args=args)
+
+        out, err = capfd.readouterr()
+        stats = json.loads(out)
+        assert stats['methods']['ping']['calls'] == 1
+        assert stats['methods']['ping']['latency_max'] == pytest.approx(
+            0.5, rel=0.01)
+
+    @pytest.mark.parametrize('speed', ['10', '0'])
+    def test_replay_as_plugin(self, speed, capfd, tmp_path):
+        recording = tmp_path / 'session.ndjson'
+        recording.write_bytes(
+            b'{"t":0.0,"d":"out","s":42,"m":{"jsonrpc":"2.0","id":"1",'
+            b'"method":"ping"}}\n'
+            b'{"t":0.1,"d":"in","s":42,"m":{"jsonrpc":"2.0","id":"1",'
+            b'"result":"pong"}}\n'
+        )
+        args = [
+            "replay", str(recording), "--as-plugin", "--speed", speed,
+            "--tick-interval", "0", "--timeout", "5",
+        ]
+        main(args=args)
+
+        out, err = capfd.readouterr()
+        ping, = [line for line in out.splitlines() if 'ping' in line]
+        assert ping.split()[1:3] == ['1', '0']
+
+
+ECHO_PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import sys
+
+
+async def main(port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    async for line in reader:
+        request = json.loads(line)
+        response = {'jsonrpc': '2.0', 'id': request['id'], 'result': 'pong'}
+        writer.write((json.dumps(response) + '\\n').encode('utf-8'))
+        if request['method'] == 'shutdown':
+            break
+
+
+if __name__ == '__main__':
+    asyncio.run(main(sys.argv[2]))
+'''
+
+
+class TestMultiRun:
+
+    def test_plugin_session(self, capfd, plugin_path_factory):
+        plugin_path = plugin_path_factory(ECHO_PLUGIN_SCRIPT)
+        args = [
+            "multi-run", str(plugin_path), "--method", "ping",
+            "--format", "json",
+        ]
+        main(args=args)
+
+        out, err = capfd.readouterr()
+        result, = json.loads(out)
+        assert result['name'] == 'Test plugin'
+        assert result['error'] is None
+        assert [method['result'] for method in result['methods']] == ['pong']
+        assert result['teardown_time'] < 1
+
+
+class TestStartupTime:
+
+    @pytest.mark.parametrize('args', [['info'], ['run', '--help']])
+    def test_lazy_imports(self, args):
+        modules = get_import_times(*args)
+
+        assert 'IPython' not in modules
+        assert 'asyncio' not in modules
+        assert 'galaxy_swift.runners' not in modules
+        total = sum(
+            cumulative for name, (cumulative, top_level) in modules.items()
+            if top_level and name.startswith('galaxy_swift')
+        )
+        assert 0 < total < IMPORT_TIME_BUDGET
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from galaxy_swift.api.metrics import LatencyHistogram, MetricsRegistry
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        values = sorted(random.uniform(0.0001, 2) for _ in range(10000))
+        for value in values:
+            histogram.record(value)
+
+        for percent in (50, 90, 99):
+            expected = values[int(percent / 100 * len(values)) - 1]
+            assert histogram.percentile(percent) == pytest.approx(
+                expected, rel=0.02)
+        assert histogram.max == int(values[-1] * 1000000)
+        assert histogram.mean == pytest.approx(
+            sum(values) / len(values), rel=0.001)
+
+    def test_fixed_memory(self):
+        histogram = LatencyHistogram()
+        size = len(histogram.counts)
+
+        histogram.record(10 ** 6)
+
+        assert len(histogram.counts) == size
+        assert histogram.percentile(100) == 3600
+
+
+class TestMetricsRegistry:
+
+    def test_snapshot(self):
+        metrics = MetricsRegistry()
+        metrics.record_call('ping', 0.001, request_size=50, response_size=40)
+        metrics.record_call('ping', 0.003, error=True, timeout=True)
+        metrics.record_notification('owned_game_added', 120)
+
+        snapshot = metrics.snapshot()
+
+        ping = snapshot['methods']['ping']
+        assert ping['calls'] == 2
+        assert ping['errors'] == 1
+        assert ping['timeouts'] == 1
+        assert ping['request_bytes'] == 50
+        assert ping['latency_max'] == pytest.approx(0.003)
+        assert snapshot['notifications']['owned_game_added']['count'] == 1
+        assert 'ping' in metrics.format()
@@ -0,0 +1,87 @@
+import asyncio
+from unittest import mock
+
+from galaxy_swift.api.protocols import JsonRpcLineProtocol
+
+
+def feed(protocol, data, chunk_size):
+    offset = 0
+    while offset < len(data):
+        buf = protocol.get_buffer(-1)
+        chunk = data[offset:offset + min(chunk_size, len(buf))]
+        buf[:len(chunk)] = chunk
+        del buf
+        protocol.buffer_updated(len(chunk))
+        offset += len(chunk)
+
+
+class TestJsonRpcLineProtocol:
+
+    def create_protocol(self, **kwargs):
+        frames = []
+        protocol = JsonRpcLineProtocol(
+            lambda frame: frames.append(frame.tobytes()), **kwargs)
+
+        async def connect():
+            protocol.connection_made(self.create_transport())
+
+        asyncio.run(connect())
+        return protocol, frames
+
+    def create_transport(self):
+        transport = mock.Mock()
+        transport.get_write_buffer_limits.return_value = (16384, 65536)
+        transport.get_write_buffer_size.return_value = 0
+        transport.is_closing.return_value = False
+        return transport
+
+    def test_large_frames(self):
+        protocol, frames = self.create_protocol()
+        large = b'x' * (3 * 1024 * 1024)
+        data = b'{}\n' + large + b'\n\n' + b'[1]\n' + b'tail'
+
+        feed(protocol, data, 60000)
+
+        assert frames == [b'{}', large, b'', b'[1]']
+
+    def test_max_frame_size(self):
+        protocol, frames = self.create_protocol(max_frame_size=1024)
+
+        feed(protocol, b'a' * 512 + b'\n' + b'b' * 2048, 512)
+
+        assert frames == [b'a' * 512]
+        protocol.transport.close.assert_called_once_with()
+
+    def test_write_coalescing(self):
+        protocol = JsonRpcLineProtocol(mock.Mock())
+
+        async def main():
+            protocol.connection_made(self.create_transport())
+            for _ in range(3):
+                protocol.write(b'{}\n')
+            buffered_bytes = protocol.buffered_bytes
+            await asyncio.sleep(0)
+            return buffered_bytes
+
+        buffered_bytes = asyncio.run(main())
+
+        assert buffered_bytes == 9
+        assert protocol.writes == 3
+        assert protocol.flushes == 1
+        protocol.transport.writelines.assert_called_once_with(
+            [b'{}\n'] * 3)
+
+    def test_drain_waits_for_resume(self):
+        protocol = JsonRpcLineProtocol(mock.Mock())
+
+        async def main():
+            protocol.connection_made(self.create_transport())
+            protocol.pause_writing()
+            drain = asyncio.create_task(protocol.drain())
+            await asyncio.sleep(0)
+            paused = not drain.done()
+            protocol.resume_writing()
+            await drain
+            return paused
+
+        assert asyncio.run(main())
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import socket
+
+import pytest
+
+from galaxy_swift.api.clients import GalaxyAsyncClientStub
+from galaxy_swift.api.recorders import (
+    SessionRecorder, read_recording, analyze_recording,
+)
+from galaxy_swift.replays import ReplayPlugin, ReplayClient
+
+RECORDING = [
+    (0.0, 'out', {'jsonrpc': '2.0', 'id': '1', 'method': 'ping'}, 0),
+    (0.05, 'in', {'jsonrpc': '2.0', 'method': 'achievement_unlocked'}, 0),
+    (0.1, 'in', {'jsonrpc': '2.0', 'id': '1', 'result': 'pong'}, 0),
+    (0.1, 'out', {'jsonrpc': '2.0', 'id': '2', 'method': 'get_capabilities',
+                  'params': {}}, 0),
+    (0.3, 'in', {'jsonrpc': '2.0', 'id': '2', 'error': {
+        'code': -32601, 'message': 'Method not found'}}, 0),
+    (0.3, 'out', {'jsonrpc': '2.0', 'id': '3', 'method': 'shutdown'}, 0),
+]
+
+
+async def connect_replay(plugin, **client_kwargs):
+    client_sock, plugin_sock = socket.socketpair()
+    connected = asyncio.Event()
+    client = GalaxyAsyncClientStub(
+        'token', None, sock=client_sock, connected_cb=connected.set,
+        tick_interval=0, **client_kwargs)
+    client_task = asyncio.create_task(client.run())
+    reader, writer = await asyncio.open_connection(sock=plugin_sock)
+    plugin_task = asyncio.create_task(plugin.run(reader, writer))
+    await connected.wait()
+    return client, client_task, plugin_task
+
+
+class TestSessionRecorder:
+
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / 'session.ndjson'
+        recorder = SessionRecorder(path)
+        recorder.record_out(b'{"jsonrpc":"2.0","id":"1","method":"ping"}\n')
+        recorder.record_in(
+            b'{"jsonrpc":"2.0","id":"1","result":"pong"}\n'
+            b'{"jsonrpc":"2.0","method":"tick"}\n'
+        )
+        recorder.close()
+
+        entries = list(read_recording(path))
+
+        assert recorder.records == 3
+        assert [entry[1] for entry in entries] == ['out', 'in', 'in']
+        assert entries[0][2] == {'jsonrpc': '2.0', 'id': '1', 'method': 'ping'}
+        assert entries[0][3] == len(
+            b'{"jsonrpc":"2.0","id":"1","method":"ping"}')
+        assert entries[0][0] <= entries[1][0]
+
+    def test_invalid_frame(self, tmp_path):
+        path = tmp_path / 'session.ndjson'
+
+        async def main():
+            client_sock, plugin_sock = socket.socketpair()
+            connected = asyncio.Event()
+            client = GalaxyAsyncClientStub(
+                'token', None, sock=client_sock, connected_cb=connected.set,
+                tick_interval=0, recorder=SessionRecorder(path))
+            client_task = asyncio.create_task(client.run())
+            await connected.wait()
+            plugin_sock.sendall(
+                b'Traceback "oops"\n{"id":"1"}\n'
+                b'{"jsonrpc":"2.0","method":"tick"}\n')
+            while client.recorder.records < 3:
+                await asyncio.sleep(0.01)
+            client.recorder.close()
+            client.terminate()
+            await client_task
+            plugin_sock.close()
+
+        asyncio.run(main())
+
+        records = [json.loads(line) for line in path.read_bytes().splitlines()]
+        entries = list(read_recording(path))
+        assert records[0]['r'] == 'Traceback "oops"'
+        assert records[0]['s'] == len(b'Traceback "oops"')
+        assert [entry[2] for entry in entries] == [
+            {'id': '1'}, {'jsonrpc': '2.0', 'method': 'tick'}]
+
+    def test_analyze(self):
+        snapshot = analyze_recording(RECORDING).snapshot()
+
+        methods = snapshot['methods']
+        assert methods['ping']['calls'] == 1
+        assert abs(methods['ping']['latency_max'] - 0.1) < 0.01
+        assert methods['get_capabilities']['errors'] == 1
+        assert methods['shutdown']['timeouts'] == 1
+        assert snapshot['notifications']['achievement_unlocked']['count'] == 1
+
+
+class TestReplay:
+
+    @pytest.mark.parametrize('speed', [10, 0])
+    def test_plugin_replay(self, speed, tmp_path):
+        path = tmp_path / 'session.ndjson'
+
+        async def main():
+            plugin = ReplayPlugin(RECORDING, speed=speed)
+            client, client_task, plugin_task = await connect_replay(
+                plugin, recorder=SessionRecorder(path))
+            stream = client.notifications.stream('achievement_unlocked')
+
+            ping = await client.acall('ping')
+            capabilities = await client.acall('get_capabilities')
+            unknown = await client.acall('import_owned_games')
+            notification = await asyncio.wait_for(stream.__anext__(), 1)
+
+            client.recorder.close()
+            client.terminate()
+            await client_task
+            await plugin_task
+            return ping, capabilities, unknown, notification, plugin
+
+        ping, capabilities, unknown, notification, plugin = asyncio.run(main())
+
+        assert ping.result == 'pong'
+        assert capabilities.error['code'] == -32601
+        assert unknown.error['code'] == -32601
+        assert plugin.unanswered == 1
+        assert notification.method == 'achievement_unlocked'
+        directions = [entry[1] for entry in read_recording(path)]
+        assert directions.count('out') == 3
+
+    def test_client_replay(self):
+        async def main():
+            plugin = ReplayPlugin(RECORDING, speed=2)
+            client, client_task, plugin_task = await connect_replay(plugin)
+            client.call_timeout = 5
+
+            replay = ReplayClient(client, RECORDING, speed=0)
+            metrics = await replay.arun()
+
+            client.terminate()
+            await client_task
+            await plugin_task
+            return metrics.snapshot()
+
+        snapshot = asyncio.run(main())
+
+        methods = snapshot['methods']
+        assert methods['ping']['calls'] == 1
+        assert methods['ping']['errors'] == 0
+        assert methods['get_capabilities']['errors'] == 1
+        assert methods['shutdown']['calls'] == 1
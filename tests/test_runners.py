@@ -0,0 +1,154 @@
+import asyncio
+import pstats
+import sys
+import time
+
+import pytest
+
+from galaxy_swift.orchestrators import PluginOrchestrator
+from galaxy_swift.runners import (
+    AsyncClientStubRunner, AsyncPluginProcess, AsyncPluginRunner,
+    InProcessPluginRunner,
+)
+
+PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import sys
+
+
+async def handle_requests(token, port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        response = {'jsonrpc': '2.0', 'id': request['id'], 'result': token}
+        writer.write((json.dumps(response) + '\\n').encode('utf-8'))
+        await writer.drain()
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'crash':
+        print('starting')
+        sys.exit('crashed')
+    if sys.argv[1] == 'verbose':
+        print('x' * 200000)
+        print('done')
+        sys.exit(3)
+    # like Galaxy plugins, arguments are read before connecting
+    asyncio.run(handle_requests(sys.argv[1], sys.argv[2]))
+'''
+
+
+@pytest.fixture
+def plugin_path(plugin_path_factory):
+    return plugin_path_factory(PLUGIN_SCRIPT)
+
+
+def start_session(plugin_path, **runner_kwargs):
+    runner = InProcessPluginRunner(**runner_kwargs)
+    client_runner = AsyncClientStubRunner()
+    client_runner.bind('token', None, sock=runner.client_sock)
+    client_runner.start()
+    client_runner.wait_listening(5)
+
+    runner.bind(plugin_path, 'secret')
+    runner.start()
+    assert client_runner.wait(5)
+    return runner, client_runner
+
+
+class TestInProcessPluginRunner:
+
+    def test_session(self, plugin_path):
+        argv = sys.argv
+        open_connection = asyncio.open_connection
+
+        runner, client_runner = start_session(plugin_path)
+        results = [client_runner.execute('ping').result for _ in range(3)]
+        runner.terminate()
+        runner.join(5)
+        client_runner.terminate()
+
+        assert results == ['secret'] * 3
+        assert runner.returncode == 0
+        assert runner.error is None
+        assert sys.argv is argv
+        assert asyncio.open_connection is open_connection
+
+    def test_profile(self, plugin_path, tmp_path):
+        runner, client_runner = start_session(plugin_path, profile=True)
+        client_runner.execute('ping')
+        runner.terminate()
+        runner.join(5)
+        client_runner.terminate()
+
+        runner.dump_stats(str(tmp_path / 'plugin.prof'))
+        stats = pstats.Stats(str(tmp_path / 'plugin.prof'))
+        functions = {name for _, _, name in stats.stats}
+        assert 'handle_requests' in functions
+
+
+class TestAsyncPluginProcess:
+
+    def test_output_and_exit(self, plugin_path):
+        lines = []
+
+        async def main():
+            process = AsyncPluginProcess(
+                plugin_path, 'crash', 0,
+                output_cb=lambda name, line: lines.append((name, line)),
+            )
+            await process.start()
+            return await process.wait()
+
+        assert asyncio.run(main()) == 1
+        assert lines == [('stdout', 'starting\n'), ('stderr', 'crashed\n')]
+
+    def test_long_output_line(self, plugin_path):
+        lines = []
+
+        async def main():
+            process = AsyncPluginProcess(
+                plugin_path, 'verbose', 0,
+                output_cb=lambda name, line: lines.append(line),
+            )
+            await process.start()
+            return await asyncio.wait_for(process.wait(), 10)
+
+        assert asyncio.run(main()) == 3
+        assert ''.join(lines) == 'x' * 200000 + '\ndone\n'
+        assert lines[-1] == 'done\n'
+
+    def test_runner_session(self, plugin_path, client_runner):
+        runner = AsyncPluginRunner(client_runner)
+        runner.bind(plugin_path, 'secret', client_runner.port)
+        runner.start()
+
+        assert client_runner.wait(5)
+        assert client_runner.execute('ping').result == 'secret'
+        runner.terminate()
+        assert runner.proc.returncode is not None
+
+    def test_runner_exit_cb(self, plugin_path, client_runner):
+        exited = []
+        runner = AsyncPluginRunner(client_runner, exit_cb=exited.append)
+        runner.bind(plugin_path, 'crash', client_runner.port)
+        runner.start()
+
+        assert runner.join(5) == 1
+        assert exited == [1]
+        assert runner.returncode == 1
+
+    def test_orchestrator_plugin_crash(self, plugin_path):
+        (plugin_path / 'plugin.py').write_text('import sys\nsys.exit(3)\n')
+        orchestrator = PluginOrchestrator(
+            [str(plugin_path)], ['ping'], timeout=30)
+        start = time.monotonic()
+
+        result, = orchestrator.run()
+
+        assert result.error == 'Plugin exited with status code 3'
+        assert time.monotonic() - start < 10
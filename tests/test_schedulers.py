@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import pytest
+
+from galaxy_swift.api.enums import ScheduleMode
+from galaxy_swift.api.schedulers import TickScheduler
+
+
+def run_for(scheduler, seconds):
+    async def main():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(seconds)
+        scheduler.stop()
+        await task
+
+    asyncio.run(main())
+
+
+class TestTickScheduler:
+
+    def test_fixed_rate(self):
+        scheduler = TickScheduler()
+        calls = []
+        job = scheduler.add_job(lambda: calls.append(1), 0.05)
+
+        run_for(scheduler, 0.28)
+
+        assert 4 <= job.runs <= 6
+        assert job.overruns == 0
+
+    def test_fixed_rate_grid(self):
+        scheduler = TickScheduler()
+        job = scheduler.add_job(lambda: None, 0.05)
+        start = job.next_run - job.interval
+        # blocking job makes the scheduler wake up late
+        scheduler.add_job(lambda: time.sleep(0.013), 0.02)
+
+        run_for(scheduler, 0.5)
+
+        assert job.runs >= 5
+        periods = (job.next_run - start) / job.interval
+        assert periods == pytest.approx(round(periods), abs=1e-6)
+
+    def test_overrun(self):
+        scheduler = TickScheduler()
+        job = scheduler.add_job(lambda: time.sleep(0.03), 0.02)
+
+        run_for(scheduler, 0.1)
+
+        assert job.runs >= 1
+        assert job.overruns == job.runs
+
+    def test_coroutine_job_overrun(self):
+        scheduler = TickScheduler()
+
+        async def health_ping():
+            await asyncio.sleep(0.07)
+
+        job = scheduler.add_job(health_ping, 0.05)
+
+        run_for(scheduler, 0.2)
+
+        assert job.runs >= 1
+        assert job.overruns >= 1
+
+    def test_fixed_delay_coroutine(self):
+        scheduler = TickScheduler(mode=ScheduleMode.FIXED_DELAY)
+
+        async def flush():
+            await asyncio.sleep(0.03)
+
+        job = scheduler.add_job(flush, 0.02)
+
+        run_for(scheduler, 0.2)
+
+        # each run takes 0.03s followed by 0.02s delay
+        assert 3 <= job.runs <= 5
+        assert job.overruns == job.runs or job.overruns == job.runs - 1
+
+    def test_no_jobs_stops(self):
+        scheduler = TickScheduler()
+
+        run_for(scheduler, 0.01)
+
+        assert scheduler.jobs == []
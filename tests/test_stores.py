@@ -0,0 +1,78 @@
+import json
+import os
+import stat
+
+from galaxy_swift.api.models import Notification
+from galaxy_swift.paths import PluginPath
+from galaxy_swift.stores import PluginCacheStore
+
+DUMMY_PLUGIN_DIR = __file__.rsplit('/', 1)[0] + '/data/dummy'
+
+
+class TestPluginCacheStore:
+
+    def test_incremental_updates(self, tmp_path):
+        path = str(tmp_path / 'cache.ndjson')
+        store = PluginCacheStore(path)
+        store.update({'token': 'a', 'catalog': '[]'})
+        store.update({'token': 'b', 'catalog': '[]'})
+        store.update({'token': 'b', 'catalog': '[]'})
+        store.update({'token': 'b'})
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        assert records == [
+            {'set': {'token': 'a', 'catalog': '[]'}},
+            {'set': {'token': 'b'}},
+            {'del': ['catalog']},
+        ]
+        assert PluginCacheStore(path).load() == {'token': 'b'}
+
+    def test_compaction(self, tmp_path):
+        path = str(tmp_path / 'cache.ndjson')
+        store = PluginCacheStore(path, compact_threshold=3)
+        for value in range(5):
+            store.update({'counter': str(value)})
+
+        with open(path) as f:
+            lines = f.readlines()
+        assert len(lines) == 2
+        assert json.loads(lines[0]) == {'snapshot': {'counter': '3'}}
+        assert PluginCacheStore(path).load() == {'counter': '4'}
+
+    def test_torn_record(self, tmp_path):
+        path = tmp_path / 'cache.ndjson'
+        path.write_text('{"set": {"token": "a"}}\n{"set": {"tok')
+
+        assert PluginCacheStore(str(path)).load() == {'token': 'a'}
+
+    def test_update_after_torn_record(self, tmp_path):
+        path = tmp_path / 'cache.ndjson'
+        path.write_text('{"set": {"token": "a"}}\n{"set": {"tok')
+
+        PluginCacheStore(str(path)).update({'token': 'a', 'user': 'b'})
+
+        assert path.read_text().endswith('\n')
+        data = PluginCacheStore(str(path)).load()
+        assert data == {'token': 'a', 'user': 'b'}
+
+    def test_private_files(self, tmp_path):
+        path = tmp_path / 'cache' / 'cache.ndjson'
+        store = PluginCacheStore(str(path), compact_threshold=1)
+        store.update({'token': 'a'})
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+        store.update({'token': 'b'})
+        store.update({'token': 'c'})
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+
+    def test_push_cache_notification(self, tmp_path):
+        store = PluginCacheStore.for_plugin(
+            PluginPath(DUMMY_PLUGIN_DIR), cache_dir=str(tmp_path))
+        store.handle_notification(
+            Notification('push_cache', {'data': {'token': 'a'}}))
+
+        assert store.path == str(tmp_path / 'UNIQUE-GUID.ndjson')
+        assert PluginCacheStore(store.path).load() == {'token': 'a'}
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from galaxy_swift.api.caches import ResponseCache
+from galaxy_swift.api.exceptions import ClientError
+from galaxy_swift.exceptions import GalaxySwiftError
+from galaxy_swift.supervisors import PluginSupervisor
+
+PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import os
+import sys
+
+
+def send(writer, message):
+    message['jsonrpc'] = '2.0'
+    writer.write((json.dumps(message) + '\\n').encode('utf-8'))
+
+
+async def handle_requests(run, port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        with open('calls.ndjson', 'a') as f:
+            f.write(json.dumps([run, request['method'], request['params']]))
+            f.write('\\n')
+        if request['method'] == 'crash':
+            os._exit(3)
+        if request['method'] == 'hang':
+            await asyncio.sleep(3600)
+        if request['method'] == 'get_capabilities' and run == 0:
+            send(writer, {
+                'method': 'push_cache', 'params': {'data': {'k': 'v'}}})
+            send(writer, {'method': 'store_credentials', 'params': {'t': 1}})
+        send(writer, {'id': request['id'], 'result': run})
+        await writer.drain()
+
+
+if __name__ == '__main__':
+    run = int(open('runs').read()) if os.path.exists('runs') else 0
+    with open('runs', 'w') as f:
+        f.write(str(run + 1))
+    asyncio.run(handle_requests(run, sys.argv[2]))
+'''
+
+
+@pytest.fixture
+def plugin_path(plugin_path_factory):
+    return plugin_path_factory(PLUGIN_SCRIPT)
+
+
+def start_supervisor(client_runner, plugin_path, **kwargs):
+    client = client_runner.client
+    supervisor = PluginSupervisor(
+        client, plugin_path, backoff_initial=0.01, **kwargs)
+    asyncio.run_coroutine_threadsafe(
+        supervisor.start(), client.loop).result(10)
+    return supervisor
+
+
+def stop_supervisor(client_runner, supervisor):
+    asyncio.run_coroutine_threadsafe(
+        supervisor.stop(), client_runner.client.loop).result(10)
+
+
+def wait_restarted(client_runner, supervisor, restarts=1):
+    deadline = time.monotonic() + 10
+    while True:
+        if (
+                supervisor.restarts >= restarts and
+                client_runner.client.is_connected()
+        ):
+            try:
+                return client_runner.execute('echo', timeout=1).result
+            except ClientError:
+                pass
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def read_calls(plugin_path):
+    with open(plugin_path / 'calls.ndjson') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestPluginSupervisor:
+
+    def test_crash_restart_resumes_session(self, client_runner, plugin_path):
+        supervisor = start_supervisor(client_runner, plugin_path)
+
+        with pytest.raises(ClientError):
+            client_runner.execute('crash', timeout=10)
+        assert wait_restarted(client_runner, supervisor) == 1
+        stop_supervisor(client_runner, supervisor)
+
+        assert supervisor.failures[0] == 'exited with status code 3'
+        handshake = [call for call in read_calls(plugin_path) if call[0] == 1]
+        assert handshake[:3] == [
+            [1, 'get_capabilities', {}],
+            [1, 'initialize_cache', {'data': {'k': 'v'}}],
+            [1, 'init_authentication', {'stored_credentials': {'t': 1}}],
+        ]
+        assert supervisor.process.returncode is not None
+
+    def test_restart_invalidates_cache(self, client_runner, plugin_path):
+        client_runner.client.cache = ResponseCache()
+        supervisor = start_supervisor(client_runner, plugin_path)
+
+        assert client_runner.execute('get_capabilities').result == 0
+        with pytest.raises(ClientError):
+            client_runner.execute('crash', timeout=10)
+        assert wait_restarted(client_runner, supervisor) == 1
+        capabilities = client_runner.execute('get_capabilities').result
+        stop_supervisor(client_runner, supervisor)
+
+        assert capabilities == 1
+        assert [1, 'get_capabilities', {}] in read_calls(plugin_path)
+
+    def test_hang_detected_by_pings(self, client_runner, plugin_path):
+        supervisor = start_supervisor(
+            client_runner, plugin_path,
+            ping_interval=0.1, ping_timeout=0.1, max_missed_pings=2,
+        )
+        start = time.monotonic()
+
+        with pytest.raises(ClientError):
+            client_runner.execute('hang')
+        assert time.monotonic() - start < 5
+        assert wait_restarted(client_runner, supervisor) == 1
+        stop_supervisor(client_runner, supervisor)
+
+        assert supervisor.failures[0] == 'missed 2 health pings'
+
+    def test_max_restarts(self, client_runner, plugin_path):
+        (plugin_path / 'plugin.py').write_text('import sys\nsys.exit(2)\n')
+        client = client_runner.client
+        supervisor = PluginSupervisor(
+            client, plugin_path, backoff_initial=0.01, max_restarts=2)
+
+        future = asyncio.run_coroutine_threadsafe(
+            supervisor.start(), client.loop)
+        with pytest.raises(GalaxySwiftError, match='Plugin failed 3 times'):
+            future.result(10)
+        assert supervisor.restarts == 2
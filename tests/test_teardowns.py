@@ -0,0 +1,89 @@
+import asyncio
+import signal
+
+import pytest
+
+from galaxy_swift.api.clients import GalaxyAsyncClientStub
+from galaxy_swift.runners import AsyncPluginProcess
+from galaxy_swift.teardowns import PluginTeardown, format_teardown
+
+PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import signal
+import sys
+
+
+async def handle_requests(mode, port):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        response = {'jsonrpc': '2.0', 'id': request['id'], 'result': None}
+        writer.write((json.dumps(response) + '\\n').encode('utf-8'))
+        await writer.drain()
+        if request['method'] == 'shutdown' and mode == 'graceful':
+            writer.close()
+            return
+    # like a plugin stuck in cleanup
+    await asyncio.sleep(3600)
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'stubborn':
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    asyncio.run(handle_requests(sys.argv[1], sys.argv[2]))
+'''
+
+
+@pytest.fixture
+def plugin_path(plugin_path_factory):
+    return plugin_path_factory(PLUGIN_SCRIPT)
+
+
+def run_teardown(plugin_path, mode):
+    async def main():
+        listening = asyncio.Event()
+        client = GalaxyAsyncClientStub(
+            mode, 0, listening_cb=listening.set, tick_interval=0)
+        client_task = asyncio.create_task(client.run())
+        await listening.wait()
+
+        process = AsyncPluginProcess(plugin_path, mode, client.port)
+        await process.start()
+        await asyncio.wait_for(client.wait_connected(), 10)
+        result = await PluginTeardown(client, process, timeout=0.5).run()
+
+        client.terminate()
+        await client_task
+        return result
+
+    return asyncio.run(main())
+
+
+class TestPluginTeardown:
+
+    def test_graceful(self, plugin_path):
+        result = run_teardown(plugin_path, 'graceful')
+
+        assert result.stage == 'eof'
+        assert result.returncode == 0
+        assert list(result.timings) == ['shutdown', 'eof']
+        assert result.total_time < 0.5
+
+    def test_terminate(self, plugin_path):
+        result = run_teardown(plugin_path, 'hanging')
+
+        assert result.stage == 'terminate'
+        assert result.returncode == -signal.SIGTERM
+        assert list(result.timings) == ['shutdown', 'eof', 'terminate']
+
+    def test_kill(self, plugin_path):
+        result = run_teardown(plugin_path, 'stubborn')
+
+        assert result.stage == 'kill'
+        assert result.returncode == -signal.SIGKILL
+        assert result.total_time < 3
+        assert 'stopped by kill' in format_teardown(result)
@@ -0,0 +1,33 @@
+import threading
+import time
+
+from galaxy_swift.jsonrpc.registries import PendingRequestRegistry
+from galaxy_swift.jsonrpc.timers import TimerHeap
+
+
+class TestTimerHeap:
+
+    def test_fire_and_cancel(self):
+        heap = TimerHeap()
+        heap.start()
+        fired = threading.Event()
+        cancelled = heap.call_later(0.01, fired.set)
+        cancelled.cancel()
+        heap.call_later(0.02, fired.set)
+
+        assert fired.wait(5)
+        time.sleep(0.05)
+        assert len(heap) == 0
+        assert heap.cancelled == 0
+
+    def test_compact_cancelled(self):
+        heap = TimerHeap()
+        registry = PendingRequestRegistry(timer_heap=heap)
+        deadline = time.monotonic() + 60
+
+        for request_id in range(1000):
+            registry.register(request_id, deadline=deadline)
+            registry.resolve(request_id, None)
+
+        assert len(heap) < TimerHeap.min_compact_size
+        assert heap.cancelled == len(heap)
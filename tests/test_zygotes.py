@@ -0,0 +1,154 @@
+import asyncio
+import os
+import signal
+import sys
+
+import pytest
+
+from galaxy_swift.orchestrators import PluginOrchestrator
+from galaxy_swift.runners import (
+    AsyncPluginProcess, AsyncPluginRunner, PluginSubprocessRunner,
+)
+from galaxy_swift.zygotes import AsyncZygoteProcess, PluginZygote
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork') or sys.platform == 'darwin',
+    reason='fork not supported',
+)
+
+HEAVY_MODULE = '''
+import os
+
+with open('imports.log', 'a') as f:
+    f.write(f'{os.getpid()}\\n')
+'''
+
+PLUGIN_SCRIPT = '''
+import asyncio
+import json
+import sys
+import time
+
+import heavy
+
+
+async def main():
+    reader, writer = await asyncio.open_connection('127.0.0.1', sys.argv[2])
+    request = json.loads(await reader.readline())
+    response = {'jsonrpc': '2.0', 'id': request['id'], 'result': sys.argv[1]}
+    writer.write((json.dumps(response) + '\\n').encode('utf-8'))
+    await writer.drain()
+    await reader.readline()
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'sleep':
+        time.sleep(60)
+    if sys.argv[1] == 'exit':
+        sys.exit(int(sys.argv[2]))
+    asyncio.run(main())
+'''
+
+
+@pytest.fixture
+def plugin_path(plugin_path_factory):
+    return plugin_path_factory(PLUGIN_SCRIPT, **{'heavy.py': HEAVY_MODULE})
+
+
+@pytest.fixture
+def zygote(plugin_path):
+    with PluginZygote(plugin_path) as zygote:
+        yield zygote
+
+
+class TestPluginZygote:
+
+    def test_exit_codes(self, zygote, plugin_path):
+        assert zygote.can_fork
+
+        procs = [zygote.spawn('exit', code) for code in (0, 3)]
+
+        assert [proc.wait(5) for proc in procs] == [0, 3]
+        # plugin imports are done once by the zygote
+        imports = (plugin_path / 'imports.log').read_text().split()
+        assert imports == [str(zygote.proc.pid)]
+        assert procs[0].pid != zygote.proc.pid
+
+    def test_terminate(self, zygote):
+        proc = zygote.spawn('sleep', 0)
+
+        assert proc.poll() is None
+        proc.terminate()
+        assert proc.wait(5) == -signal.SIGTERM
+
+    def test_runner_session(self, zygote, plugin_path, client_runner):
+        runner = PluginSubprocessRunner(zygote=zygote)
+        runner.bind(plugin_path, 'secret', client_runner.port)
+        runner.start()
+        assert client_runner.wait(5)
+
+        assert client_runner.execute('ping').result == 'secret'
+        assert runner.proc.pid != zygote.proc.pid
+
+        client_runner.terminate()
+        runner.join(5)
+        runner.terminate()
+        assert runner.proc.returncode == 0
+
+    def test_unsafe_fork(self, plugin_path):
+        (plugin_path / 'heavy.py').write_text(
+            'import threading, time\n'
+            'threading.Thread(target=time.sleep, args=(60,), daemon=True)'
+            '.start()\n'
+        )
+
+        with PluginZygote(plugin_path) as zygote:
+            runner = PluginSubprocessRunner(zygote=zygote)
+
+            assert not zygote.can_fork
+            assert zygote.fork_error == 'plugin imports started threads'
+            assert runner.fork() is None
+
+
+class TestAsyncZygoteProcess:
+
+    def test_exit_and_terminate(self, zygote):
+        async def main():
+            exiting = AsyncPluginProcess(
+                zygote.plugin_path, 'exit', 3, zygote=zygote)
+            sleeping = AsyncPluginProcess(
+                zygote.plugin_path, 'sleep', 0, zygote=zygote)
+            await exiting.start()
+            await sleeping.start()
+            sleeping.terminate()
+            return [exiting, sleeping], [
+                await exiting.wait(), await sleeping.wait()]
+
+        processes, codes = asyncio.run(main())
+
+        for process in processes:
+            assert isinstance(process.proc, AsyncZygoteProcess)
+        assert codes == [3, -signal.SIGTERM]
+
+    def test_runner_session(self, zygote, plugin_path, client_runner):
+        runner = AsyncPluginRunner(client_runner, zygote=zygote)
+        runner.bind(plugin_path, 'secret', client_runner.port)
+        runner.start()
+        assert client_runner.wait(5)
+
+        assert client_runner.execute('ping').result == 'secret'
+        assert runner.proc.pid != zygote.proc.pid
+        runner.terminate()
+
+    def test_orchestrator(self, plugin_path):
+        orchestrator = PluginOrchestrator(
+            [str(plugin_path)] * 2, ['ping'], timeout=30, zygote=True)
+
+        results = orchestrator.run()
+
+        for result in results:
+            assert result.error is None
+            assert result.methods[0].error is None
+        imports = (plugin_path / 'imports.log').read_text().split()
+        assert len(imports) == 1
+        assert orchestrator.zygotes == {}